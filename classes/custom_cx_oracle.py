@@ -1,9 +1,200 @@
 # Import cx_oracle package: This is Python API for Oracle DB connection and Transaction
+import collections
+import functools
+import os
 import sys
+import threading
+import time
 import cx_oracle
-from tabulate import tabulate
+# Retry with backoff and failover across DSNs for the transient errors of the error map
+from oracle_resilience import RetryPolicy, call_with_retry, new_retry_metrics, retry_metrics_snapshot
 # Import the configuration file to read th attributes and values utilized in the class
 import db_conf
+# Note: tabulate is imported by db_print_tabular_data itself, it is only needed when printing
+
+# The Oracle Client libraries can only be loaded once per process, these track that it was done
+_oracle_client_initialized = False
+_oracle_client_lock = threading.Lock()
+
+
+def _init_oracle_client_once():
+    '''
+    Load the oracle client on the first call in the process, later calls are a no-op
+    Arguments to this function: None
+    '''
+    global _oracle_client_initialized
+    # Double checked locking, so only the very first instantiation pays for the lock and the client load
+    if not _oracle_client_initialized:
+        with _oracle_client_lock:
+            if not _oracle_client_initialized:
+                # use the 'orcl_client_path' path from configuration file
+                # since the 64bit client is kept in that location
+                cx_oracle.init_oracle_client(lib_dir=db_conf.ora_client_config['orcl_client_path'])
+                _oracle_client_initialized = True
+
+
+def _bulk_row_chunks(rows, batch_size):
+    '''
+    Split the rows of a bulk DML in to lists of at most batch_size rows, ready for executemany
+    Arguments to this function: rows and the batch size
+    rows can be an iterable of tuples / dicts, a pandas DataFrame, a pyarrow Table or RecordBatch,
+    or an iterable of DataFrames / RecordBatches (like a chunked read_csv or a stream of Arrow batches)
+    '''
+    # A single DataFrame or Arrow object is handled as a stream of one
+    if hasattr(rows, 'itertuples') or hasattr(rows, 'to_batches') or hasattr(rows, 'num_columns'):
+        rows = [rows]
+    pending = []
+    for item in rows:
+        # pandas DataFrame: NaN / NaT are turned in to None, so they are bound as NULL
+        if hasattr(item, 'itertuples'):
+            for start in range(0, len(item), batch_size):
+                chunk = item.iloc[start:start + batch_size]
+                chunk = chunk.astype(object).where(chunk.notna(), None)
+                yield from _flush_pending(pending)
+                yield list(chunk.itertuples(index=False, name=None))
+        # pyarrow Table or RecordBatch: converted column by column, nulls are already None
+        elif hasattr(item, 'to_batches') or hasattr(item, 'num_columns'):
+            batches = item.to_batches(max_chunksize=batch_size) if hasattr(item, 'to_batches') else [item]
+            for batch in batches:
+                for start in range(0, batch.num_rows, batch_size):
+                    chunk = batch.slice(start, batch_size)
+                    yield from _flush_pending(pending)
+                    yield list(zip(*[column.to_pylist() for column in chunk.columns]))
+        # Plain row (tuple, list or dict for named binds)
+        else:
+            pending.append(item)
+            if len(pending) == batch_size:
+                yield from _flush_pending(pending)
+    yield from _flush_pending(pending)
+
+
+def _flush_pending(pending):
+    '''
+    Yield the plain rows collected so far as one chunk, and empty the list
+    Arguments to this function: the list of pending rows
+    '''
+    if pending:
+        yield pending[:]
+        pending.clear()
+
+
+class _RecordMixin:
+    '''
+    Key access for the record classes of db_record_class, on top of the attribute and index access of a namedtuple
+    record['PICKUP_ZONE'], record.PICKUP_ZONE and record[8] all return the same value
+    '''
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        # Column names are looked up in the (class level) name to position map, positions and slices as for any tuple
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._column_index[key])
+        return tuple.__getitem__(self, key)
+
+    def as_dict(self):
+        # Column name to value dictionary of the record, with the original column names
+        return dict(zip(self._column_names, self))
+
+
+@functools.lru_cache(maxsize=256)
+def db_record_class(column_names):
+    '''
+    Get the compact record class of a query shape, created once per distinct tuple of column names
+    Arguments to this function: tuple of column names (as in cursor.description)
+    Note: Records are tuples with __slots__ = (), so a row costs one tuple and no per row dictionary,
+          the column names are stored once on the class instead of being repeated in every row
+    '''
+    # rename=True turns column names that are not valid identifiers (like COUNT(1)) in to _0, _1, ...
+    # those columns are still reachable by their original name through record['COUNT(1)']
+    base = collections.namedtuple('Record', column_names, rename=True)
+    return type('Record', (_RecordMixin, base), {'__slots__': (),
+                                                 '_column_names': column_names,
+                                                 '_column_index': {name: idx for idx, name in enumerate(column_names)}})
+
+
+def _arrow_type_of_column(column_description):
+    '''
+    Map a column of cursor.description to the pyarrow type it is unloaded as
+    Arguments to this function: one entry of cursor.description (name, type, display_size, internal_size, precision, scale, null_ok)
+    Note: NUMBER columns without decimals (and at most 18 digits) become int64, wider NUMBER(p, s) columns decimal128(p, s)
+          and NUMBER(p, s) with at most 15 digits float64. A NUMBER declared without precision (scale -127) holds any
+          value, so it is unloaded as its exact decimal text; FLOAT stays float64.
+          DATE and TIMESTAMP become timestamps, BLOB and RAW become binary, everything else (CLOB included) is text
+    '''
+    import pyarrow as pa
+    _, db_type, _, _, precision, scale, _ = column_description
+    db_types = _driver_types()
+    if db_type is None:
+        return pa.string()
+    if db_type == db_types['DB_TYPE_NUMBER']:
+        if scale == -127:
+            return pa.float64() if precision else pa.string()
+        if scale == 0 and precision and precision <= 18:
+            return pa.int64()
+        if precision and 0 <= scale <= precision <= 38 and (scale == 0 or precision > 15):
+            return pa.decimal128(precision, scale)
+        return pa.float64()
+    if db_type in (db_types['DB_TYPE_BINARY_DOUBLE'], db_types['DB_TYPE_BINARY_FLOAT']):
+        return pa.float64()
+    if db_type == db_types['DB_TYPE_BINARY_INTEGER']:
+        return pa.int64()
+    if db_type == db_types['DB_TYPE_DATE']:
+        return pa.timestamp('s')
+    if db_type in (db_types['DB_TYPE_TIMESTAMP'], db_types['DB_TYPE_TIMESTAMP_TZ'], db_types['DB_TYPE_TIMESTAMP_LTZ']):
+        return pa.timestamp('us')
+    if db_type in (db_types['DB_TYPE_RAW'], db_types['DB_TYPE_LONG_RAW'], db_types['DB_TYPE_BLOB']):
+        return pa.binary()
+    return pa.string()
+
+
+def _driver_types():
+    '''
+    Get the driver database types used by the unload, looked up by name
+    Arguments to this function: None
+    Note: Drivers without some of the types (older cx_Oracle) get None for them, so those types are never matched
+    '''
+    return {name: getattr(cx_oracle, name, None) for name in ('DB_TYPE_NUMBER', 'DB_TYPE_BINARY_DOUBLE', 'DB_TYPE_BINARY_FLOAT',
+                                                              'DB_TYPE_BINARY_INTEGER', 'DB_TYPE_DATE', 'DB_TYPE_TIMESTAMP',
+                                                              'DB_TYPE_TIMESTAMP_TZ', 'DB_TYPE_TIMESTAMP_LTZ', 'DB_TYPE_RAW',
+                                                              'DB_TYPE_LONG_RAW', 'DB_TYPE_BLOB', 'DB_TYPE_CLOB', 'DB_TYPE_NCLOB',
+                                                              'DB_TYPE_LONG')}
+
+
+def _unload_output_type_handler(cursor, name, default_type, size, precision, scale):
+    '''
+    Output type handler of the unload cursor, fetching every column as the Python type its Arrow type accepts
+    Arguments to this function: the cursor and the column metadata, as passed by the driver
+    Note: CLOB / NCLOB and BLOB are fetched as str and bytes instead of LOB locators (pa.array rejects locators),
+          NUMBER without precision as its exact text and wide NUMBER(p, s) as Decimal, so no digit goes through a float.
+          None keeps the default fetch type
+    '''
+    import decimal
+    import pyarrow as pa
+    db_types = _driver_types()
+    if default_type in (db_types['DB_TYPE_CLOB'], db_types['DB_TYPE_NCLOB']):
+        return cursor.var(db_types['DB_TYPE_LONG'], arraysize=cursor.arraysize)
+    if default_type == db_types['DB_TYPE_BLOB']:
+        return cursor.var(db_types['DB_TYPE_LONG_RAW'], arraysize=cursor.arraysize)
+    if default_type == db_types['DB_TYPE_NUMBER']:
+        arrow_type = _arrow_type_of_column((name, default_type, None, size, precision, scale, None))
+        if arrow_type == pa.string():
+            return cursor.var(str, 128, arraysize=cursor.arraysize)
+        if pa.types.is_decimal(arrow_type):
+            return cursor.var(decimal.Decimal, arraysize=cursor.arraysize)
+    return None
+
+
+def _format_table_cell(value, width):
+    '''
+    Format a value for a fixed width column of db_print_tabular_data_streaming
+    Arguments to this function: value and the column width
+    Note: Numbers are right aligned, other values left aligned, NULL is shown empty, and values longer
+          than the width are cut with a trailing '~' so every row keeps the same layout
+    '''
+    text = '' if value is None else str(value).replace('\n', ' ')
+    if len(text) > width:
+        text = text[:width - 1] + '~'
+    return text.rjust(width) if isinstance(value, (int, float)) and not isinstance(value, bool) else text.ljust(width)
 
 
 # Class definitions should use CamelCase convention based on pep-8 guidelines
@@ -12,6 +203,9 @@ class CustomCxOracle:
     # Create an Error Code Map as Class Variable to be used in any of the custom methods
     _oracle_error_map = {955: 'Table Already Exists',
                          1109: 'Error: Database Is not Open',
+                         3113: 'Error: End-of-file on communication channel. The session was lost',
+                         3114: 'Error: Not connected to Oracle',
+                         3135: 'Error: Connection lost contact',
                          12153: 'Error: Not currently connected to a remote host. Please check connection',
                          12154: 'Error: Could not resolve the connect identifier specified',
                          12236: 'Error: Protocol support not loaded',
@@ -33,9 +227,8 @@ class CustomCxOracle:
         **Key word argument (has three params, user, password and the dsn)
         '''
 
-        # use the 'orcl_client_path' path from configuration file
-        # since the 64bit client is kept in that location
-        cx_oracle.init_oracle_client(lib_dir=db_conf.ora_client_config['orcl_client_path'])
+        # Load the oracle client, only the first object created in the process actually does it
+        _init_oracle_client_once()
         # get the client version and assign it to initialization attribute
         self.client_version = cx_oracle.clientversion()
         # assign the user provided db_user to initialization method, for reuse across all methods
@@ -45,21 +238,33 @@ class CustomCxOracle:
         # use __ to mangle the variable, so that the instantiated object cannot see this variable and its value
         self.__db_password = connection_params.get('password')
         # assign the user provided connection_dsn to initialization method, for reuse across all methods
-        self.connection_dsn = connection_params.get('dsn')
+        # dsn can also be a list of DSNs (primary first, then standbys), connections fail over to the next one
+        # of the list when the current one keeps failing with transient errors
+        _dsn = connection_params.get('dsn')
+        self.connection_dsn_list = list(_dsn) if isinstance(_dsn, (list, tuple)) else [_dsn]
+        self.connection_dsn = self.connection_dsn_list[0]
+        # retry_policy (oracle_resilience.RetryPolicy) sets how often and how long transient errors are retried
+        self.retry_policy = connection_params.get('retry_policy') or RetryPolicy()
+        # Retry counts and latencies of connection acquisition, retried reads and retried loads, see db_retry_metrics
+        self.retry_metrics = new_retry_metrics()
+        # One pool per DSN, created the first time connections fail over to it
+        self._pools = {}
         '''
         By default, connection pools are ‘homogeneous’, meaning that all connections use the same database credentials. 
         However, if the pool option homogeneous is False at the time of pool creation, then a ‘heterogeneous’ pool will 
         be created. This allows different credentials to be used each time a connection is acquired from the pool with 
         acquire(). This approach makes the class more flexible to be used with different instantiated objects
         '''
-        self.pool = cx_oracle.SessionPool(dsn=self.connection_dsn, homogeneous=False)
+        self.pool = self._pool_of_dsn(self.connection_dsn)
+        self.db_auto_connect = None
         try:
             '''
             When a heterogeneous pool is created by setting homogeneous to False and no credentials are supplied during pool
             creation, then a user name and password may be passed to acquire():
+            Transient errors (listener down, timeouts...) are retried with backoff before giving up
             '''
-            self.db_auto_connect = self.pool.acquire(user=self._db_user, password=self.__db_password)
-        # In Case Database Error occurs
+            self._retry(self._acquire_connection)
+        # In Case Database Error occurs (not transient, or still failing after all the retries)
         except cx_oracle.DatabaseError as _errors:
             # Capture the errors in a variable
             _error, = _errors.args
@@ -72,6 +277,53 @@ class CustomCxOracle:
                 # user will be provided with error brief and code will exit without execute any more statements
                 sys.exit()
 
+    def _pool_of_dsn(self, dsn):
+        '''
+        Get the session pool of a DSN, created on first use
+        Arguments to this method: the DSN
+        '''
+        if dsn not in self._pools:
+            self._pools[dsn] = cx_oracle.SessionPool(dsn=dsn, homogeneous=False)
+        return self._pools[dsn]
+
+    def _acquire_connection(self):
+        '''
+        Acquire a connection from the pool of the current DSN, unless one is held already
+        Arguments to this method: None
+        '''
+        if self.db_auto_connect is None:
+            self.db_auto_connect = self.pool.acquire(user=self._db_user, password=self.__db_password)
+        return self.db_auto_connect
+
+    def _fail_over(self, _errors, attempt):
+        '''
+        Drop the (most likely dead) connection and switch to the next DSN of the list, called before every retry
+        Arguments to this method: the transient error and the attempt number
+        '''
+        # Print the mapped message, so the blip is visible in the job log even when the retry succeeds
+        _error, = _errors.args
+        print(f"{CustomCxOracle._oracle_error_map.get(_error.code, _error.message)} (attempt {attempt}, retrying)")
+        if self.db_auto_connect is not None:
+            # drop() closes the connection instead of returning it to the pool, errors of a dead session are ignored
+            try:
+                self.pool.drop(self.db_auto_connect)
+            except Exception:
+                pass
+            self.db_auto_connect = None
+        if len(self.connection_dsn_list) > 1:
+            self.connection_dsn = self.connection_dsn_list[(self.connection_dsn_list.index(self.connection_dsn) + 1)
+                                                           % len(self.connection_dsn_list)]
+            self.pool = self._pool_of_dsn(self.connection_dsn)
+            with self.retry_metrics['lock']:
+                self.retry_metrics['failovers'] += 1
+
+    def _retry(self, operation):
+        '''
+        Run an operation with the retry policy of the object, failing over between retries
+        Arguments to this method: a function without arguments
+        '''
+        return call_with_retry(operation, self.retry_policy, cx_oracle.DatabaseError, self.retry_metrics, self._fail_over)
+
     def chk_db_object_existence(self, db_schema_name, db_obj_name):
         '''
         Method to check Existence of a Database Object
@@ -116,12 +368,118 @@ class CustomCxOracle:
             else:
                 print('Method- create_db_object_auto_commit: Unmapped Errod Code, Please update error mapping for the class')
 
+    def db_bulk_execute_dml(self, _sql_dml_or_sql_variable, rows, batch_size=10000, input_sizes=None, commit_every=1,
+                            retry_batches=False):
+        '''
+        Method to execute an insert, update, delete or merge statement for many rows with array binds
+        Arguments to this Method: SQL DML or SQL Variable, rows, batch size, input sizes, commit frequency and batch retry
+        rows: iterable of tuples (positional binds :1, :2) or dicts (named binds), a pandas DataFrame,
+              a pyarrow Table / RecordBatch, or an iterable of DataFrames / RecordBatches
+        batch_size: number of rows sent to the database in one executemany call (one round trip)
+        input_sizes: list (positional) or dict (named) passed to cursor.setinputsizes, e.g. [None, 50] or {'name': 50}
+        commit_every: commit after this many batches, 0 commits only once at the end
+        retry_batches: commit every batch, and retry a batch failing with a transient error (see retry_policy) on a new
+                       connection, failing over to the next DSN; the batches already committed are not sent again
+        Note: Rows failing on their own (constraint violations, bad values) do not stop the load, they are
+              reported in failed_rows with their index (0 based, across all the rows) and the Oracle error message
+              A batch whose commit was interrupted by a lost connection may or may not have been committed, it is
+              sent again and listed in uncertain_batches: use a MERGE, or a key on the table (duplicates then show
+              up in failed_rows), for such a batch not to be applied twice
+        Returns a dictionary with the number of rows, per batch timings and failed rows
+        '''
+        result = {'rows': 0, 'batches': [], 'failed_rows': []}
+        if retry_batches:
+            commit_every = 1
+            result['uncertain_batches'] = []
+        row_offset = 0
+
+        def execute_batch(batch_idx, chunk, commit_started):
+            # Declare the bind types / maximum string lengths upfront, so the driver allocates the bind
+            # buffers once for the whole array instead of growing them row by row
+            with self._acquire_connection().cursor() as cursor:
+                if isinstance(input_sizes, dict):
+                    cursor.setinputsizes(**input_sizes)
+                elif input_sizes:
+                    cursor.setinputsizes(*input_sizes)
+                # One round trip for the whole batch, batcherrors=True keeps the rows without error
+                cursor.executemany(_sql_dml_or_sql_variable, chunk, batcherrors=True)
+                batch_errors = cursor.getbatcherrors()
+            if commit_every and (batch_idx + 1) % commit_every == 0:
+                commit_started[0] = True
+                self.db_commit()
+            return batch_errors
+
+        try:
+            for batch_idx, chunk in enumerate(_bulk_row_chunks(rows, batch_size)):
+                start = time.perf_counter()
+                if retry_batches:
+                    commit_started = [False]
+
+                    def retry_batch(_errors, attempt):
+                        # The batch is sent again on a new connection, note it when its commit may have happened
+                        if commit_started[0] and batch_idx not in result['uncertain_batches']:
+                            result['uncertain_batches'].append(batch_idx)
+                        commit_started[0] = False
+                        self._fail_over(_errors, attempt)
+
+                    batch_errors = call_with_retry(lambda: execute_batch(batch_idx, chunk, commit_started), self.retry_policy,
+                                                   cx_oracle.DatabaseError, self.retry_metrics, retry_batch)
+                else:
+                    batch_errors = execute_batch(batch_idx, chunk, [False])
+                for batch_error in batch_errors:
+                    result['failed_rows'].append((row_offset + batch_error.offset, batch_error.message))
+                result['batches'].append({'batch': batch_idx, 'rows': len(chunk), 'failed_rows': len(batch_errors),
+                                          'seconds': time.perf_counter() - start})
+                row_offset += len(chunk)
+                result['rows'] = row_offset
+            # Commit the rows of the last (partial) commit interval, retried loads have committed every batch already
+            if not retry_batches:
+                self.db_commit()
+        # In Case Database Error occurs, the batches already committed are kept
+        except cx_oracle.DatabaseError as _errors:
+            # Capture the errors in a variable
+            _error, = _errors.args
+            # Check if the encountered error is defined in the error map
+            # If its defined, print the custom message based on the mapped key and value
+            if _error.code in CustomCxOracle._oracle_error_map.keys():
+                print(CustomCxOracle._oracle_error_map[_error.code])
+            else:
+                print(f'Method- db_bulk_execute_dml: {_error.message}')
+            result['error'] = _error.message
+        return result
+
+    def db_bulk_insert_rows(self, table_name, column_names, rows, batch_size=10000, input_sizes=None, commit_every=1,
+                           retry_batches=False):
+        '''
+        Method to insert many rows in to a table with array binds
+        Arguments to this Method: table name, column names, rows, batch size, input sizes, commit frequency and batch retry
+        Table name can be provided as standalone table name or with the schema.table_name
+        See db_bulk_execute_dml for rows, batch_size, input_sizes, commit_every, retry_batches and the returned dictionary
+        '''
+        with self.db_auto_connect.cursor() as cursor:
+            try:
+                # Assert the table name (see db_get_row_cnt_of_table) and the column names, to avoid sql injection
+                asserted_table_name = cursor.callfunc('sys.dbms_assert.sql_object_name', cx_oracle.STRING, [table_name])
+                asserted_columns = [cursor.callfunc('sys.dbms_assert.simple_sql_name', cx_oracle.STRING, [column_name])
+                                    for column_name in column_names]
+            except cx_oracle.DatabaseError as _errors:
+                _error, = _errors.args
+                if _error.code in (44002, 44003):
+                    return 'Invalid SQL Object Name, Please verify Object and Column Names provided....'
+                raise
+        # Positional binds :1, :2, ... in the order of the column names
+        _sql_dml = (f"Insert into {asserted_table_name} ({', '.join(asserted_columns)}) "
+                    f"values ({', '.join(f':{idx}' for idx in range(1, len(asserted_columns) + 1))})")
+        return self.db_bulk_execute_dml(_sql_dml, rows, batch_size, input_sizes, commit_every, retry_batches)
+
     def db_close_conn_pool(self):
         '''
         Method to close the connection pool
         Argument to this method:- None
+        Note: The pools of every DSN connections failed over to are closed too
         '''
-        self.pool.close()
+        for pool in self._pools.values():
+            pool.close()
 
     def db_commit(self):
         '''
@@ -320,6 +678,50 @@ class CustomCxOracle:
         # return type of this method is tuple (default behavior)
         return results
 
+    def db_execute_sql_fetch_all_as_records(self, _sql_query_or_sql_variable):
+        '''
+        Method to execute a sql query or a query stored in a variable & fetch all results as compact records
+        Argument to this method is: SQL Query or Variable containing the SQL query
+        Note: Records give the same access as the dictionaries of db_execute_sql_fetch_all_as_dict (record['COLUMN']),
+              plus attribute access (record.COLUMN), for a fraction of the memory and construction time per row
+        '''
+        # Open the cursor as 'with' so, it's automatically closed upon task completion
+        with self.db_auto_connect.cursor() as cursor:
+            # See db_execute_sql_fetch_all_as_dict for the arraysize tuning
+            cursor.arraysize = 500
+            # Execute the SQL Query or Variable containing the SQL query
+            execute = cursor.execute(_sql_query_or_sql_variable)
+            # The record class is cached by the column names, so repeated queries of the same shape reuse it
+            # and the class itself is the rowfactory (no lambda, no intermediate tuple per row)
+            execute.rowfactory = db_record_class(tuple(row[0] for row in execute.description))
+            # FetchALL the rows from cursor in to results
+            results = execute.fetchall()
+        # return type of this method is a list of records
+        return results
+
+    def db_execute_sql_fetch_all_as_columns(self, _sql_query_or_sql_variable, _batch_size=10000):
+        '''
+        Method to execute a sql query or a query stored in a variable & fetch all results column by column
+        Argument to this method is: SQL Query or Variable containing the SQL query, and the fetch batch size
+        Note: Returns one list per column instead of one object per row, which is the most compact form for
+              large results and can be handed directly to pandas.DataFrame or pyarrow.table
+        '''
+        # Open the cursor as 'with' so, it's automatically closed upon task completion
+        with self.db_auto_connect.cursor() as cursor:
+            # Large results: fetch (and transpose) in batches of _batch_size rows, one round trip per batch
+            cursor.arraysize = _batch_size
+            # Execute the SQL Query or Variable containing the SQL query
+            execute = cursor.execute(_sql_query_or_sql_variable)
+            columns = [row[0] for row in execute.description]
+            results = {column: [] for column in columns}
+            column_lists = [results[column] for column in columns]
+            # fetchmany returns an empty list once all rows are fetched
+            for rows in iter(execute.fetchmany, []):
+                for column_list, values in zip(column_lists, zip(*rows)):
+                    column_list.extend(values)
+        # return type of this method is a dictionary of column name to list of values
+        return results
+
     def db_execute_sql_fetch_last_row_as_dict_m2(self, _sql_query_or_sql_variable):
         '''
         Method to fetch last row of sql output
@@ -981,11 +1383,43 @@ class CustomCxOracle:
         '''
         self.pool.release(self.db_auto_connect)
 
+    def db_execute_read_with_retry(self, read_method, *args):
+        '''
+        Method to run one of the read methods of this class, retrying it on transient errors
+        Arguments to this method: the read method (e.g. obj.db_execute_sql_fetch_all_as_tuples) followed by its arguments
+        Example: obj.db_execute_read_with_retry(obj.db_execute_sql_fetch_all_as_dict, 'select * from taxi_trips')
+        Note: On a transient error the connection is replaced (failing over to the next DSN when there is one)
+              and the whole read runs again. Replacing the connection loses its uncommitted changes, so the read
+              is not retried while the connection has a transaction in progress (DML not yet committed)
+        '''
+        def read():
+            self._acquire_connection()
+            return read_method(*args)
+
+        def retry_read(_errors, attempt):
+            # transaction_in_progress is only known to recent drivers, older ones are assumed to have none
+            if getattr(self.db_auto_connect, 'transaction_in_progress', False):
+                raise _errors
+            self._fail_over(_errors, attempt)
+
+        return call_with_retry(read, self.retry_policy, cx_oracle.DatabaseError, self.retry_metrics, retry_read)
+
+    def db_retry_metrics(self):
+        '''
+        Method to get the retry counts and latencies of the connection acquisitions, retried reads and retried loads
+        Argument to this method:- None
+        Returns a dictionary: operations, attempts, retries, failovers, failed_operations, errors_by_code,
+        total / average / max seconds per operation and the seconds spent backing off
+        '''
+        return retry_metrics_snapshot(self.retry_metrics)
+
     def db_print_tabular_data(self, _sql_query_or_sql_variable):
         '''
         Method to print data in tabular format for a given query
         Argument to this method: SQL Query or Variable containing the SQL query
         '''
+        # tabulate is only imported when data is actually printed
+        from tabulate import tabulate
         # Open the cursor as 'with' so, it's automatically closed upon task completion
         with self.db_auto_connect.cursor(scrollable=True) as cursor:
             # 'arraysize' attribute of cursor is a performance tuning parameter
@@ -997,8 +1431,8 @@ class CustomCxOracle:
             cursor.arraysize = 500
             # Execute the SQL Query or Variable containing the SQL query
             execute = cursor.execute(_sql_query_or_sql_variable)
-            # Get the column names of the table by using another method in the same class
-            columns = self.db_get_column_names_of_table_by_sql_qry(_sql_query_or_sql_variable)
+            # Get the column names from the same cursor, instead of executing the query a second time
+            columns = [row[0] for row in execute.description]
             # FetchALL the rows from cursor in to results
             results = execute.fetchall()
             # return type of this method is tabular data
@@ -1008,6 +1442,64 @@ class CustomCxOracle:
             # valid values for tablefmt are:- psql, grid, pipe, html
             return tabulate(results, headers=columns, tablefmt='psql')
 
+    def db_print_tabular_data_streaming(self, _sql_query_or_sql_variable, _max_rows=None, _page_rows=500, _sample_rows=1000,
+                                        _max_column_width=60, _output_file=None):
+        '''
+        Method to print data in tabular format (psql style) for a given query, page by page as the rows are fetched
+        Arguments to this method: SQL Query or Variable containing the SQL query, the maximum number of rows to print
+        (None for all), rows per page, rows sampled to size the columns, the maximum column width and an optional
+        output file path (stdout by default)
+        Note: Unlike db_print_tabular_data, the first page is printed as soon as it is fetched and memory stays at one
+              page plus the sample, whatever the size of the result. Column widths come from the header and the first
+              _sample_rows rows, later longer values are cut (see _format_table_cell)
+        Returns the number of rows printed
+        '''
+        output = open(_output_file, 'w') if _output_file else sys.stdout
+        printed = 0
+        try:
+            # Open the cursor as 'with' so, it's automatically closed upon task completion
+            with self.db_auto_connect.cursor() as cursor:
+                # One round trip per page
+                cursor.arraysize = _page_rows
+                # Execute the SQL Query or Variable containing the SQL query
+                execute = cursor.execute(_sql_query_or_sql_variable)
+                # Headers from the same cursor, the query is executed only once
+                columns = [row[0] for row in execute.description]
+                # The sample is the first rows of the result, it is printed first so no row is fetched twice
+                sample_size = _sample_rows if _max_rows is None else min(_sample_rows, _max_rows)
+                sample = execute.fetchmany(sample_size) if sample_size else []
+                widths = [min(max([len(column)] + [len('' if row[idx] is None else str(row[idx])) for row in sample]), _max_column_width)
+                          for idx, column in enumerate(columns)]
+                separator = '+' + '+'.join('-' * (width + 2) for width in widths) + '+\n'
+                output.write(separator)
+                output.write('| ' + ' | '.join(column.ljust(width)[:width] for column, width in zip(columns, widths)) + ' |\n')
+                output.write(separator)
+
+                def write_page(rows):
+                    # Format and write a page of rows in one call, then flush so it shows up immediately
+                    output.write(''.join('| ' + ' | '.join(_format_table_cell(value, width) for value, width in zip(row, widths)) + ' |\n'
+                                         for row in rows))
+                    output.flush()
+
+                for start in range(0, len(sample), _page_rows):
+                    write_page(sample[start:start + _page_rows])
+                printed = len(sample)
+                del sample
+                while _max_rows is None or printed < _max_rows:
+                    rows = execute.fetchmany(_page_rows if _max_rows is None else min(_page_rows, _max_rows - printed))
+                    if not rows:
+                        break
+                    write_page(rows)
+                    printed += len(rows)
+                output.write(separator)
+                output.write(f"({printed} rows{', limited to ' + str(_max_rows) if _max_rows is not None and printed == _max_rows else ''})\n")
+                output.flush()
+        finally:
+            if _output_file:
+                output.close()
+        # return type of this method is the number of rows printed
+        return printed
+
     def db_get_row_cnt_of_table(self, table_name):
         '''
         Method to get the row count in a given table
@@ -1043,6 +1535,39 @@ class CustomCxOracle:
                 if _error.code == 44002:
                     return 'Invalid SQL Object Name, Please verify Object Name provided....'
 
+    def db_get_row_cnt_of_table_from_stats(self, table_name):
+        '''
+        Method to get the estimated row count of a given table from its optimizer statistics, without scanning it
+        Argument to this method is: Name of the table
+        Argument can be provided as standalone table name or with the schema.table_name
+        Note: The estimate is NUM_ROWS of the last statistics gathering plus the inserts minus the deletes recorded
+              since in ALL_TAB_MODIFICATIONS. Returns None when the table has no statistics or they are stale,
+              use db_get_row_cnt_of_table for an exact count in that case
+        '''
+        # Open the cursor as 'with' so, it's automatically closed upon task completion
+        with self.db_auto_connect.cursor() as cursor:
+            # A single row is expected, see db_get_row_cnt_of_table
+            cursor.arraysize = 1
+            cursor.prefetchrows = 2
+            try:
+                # Assert the table name, see db_get_row_cnt_of_table
+                asserted_table_name = cursor.callfunc('sys.dbms_assert.sql_object_name', cx_oracle.STRING, [table_name])
+            except cx_oracle.DatabaseError as _errors:
+                _error, = _errors.args
+                if _error.code == 44002:
+                    return 'Invalid SQL Object Name, Please verify Object Name provided....'
+                raise
+            # The dictionary views hold upper case names, the owner defaults to the connected schema
+            owner, _, table = asserted_table_name.upper().rpartition('.')
+            _sql_query = ("Select s.num_rows + nvl(m.inserts, 0) - nvl(m.deletes, 0) "
+                          "from all_tab_statistics s left join all_tab_modifications m "
+                          "on m.table_owner = s.owner and m.table_name = s.table_name and m.partition_name is null "
+                          "where s.owner = nvl(:owner, user) and s.table_name = :table_name and s.partition_name is null "
+                          "and s.num_rows is not null and s.stale_stats = 'NO' and nvl(m.truncated, 'NO') = 'NO'")
+            execute = cursor.execute(_sql_query, owner=owner or None, table_name=table).fetchone()
+        # return type of this method is an integer, or None if the statistics cannot be used
+        return None if execute is None else execute[0]
+
     def db_get_column_names_of_table_by_sql_qry(self, _sql_query_or_sql_variable):
         '''
         Method to get the column names based on the sql query or sql variable
@@ -1064,6 +1589,93 @@ class CustomCxOracle:
         # return type of this method is a list
         return columns
 
+    def db_unload_sql_to_file(self, _sql_query_or_sql_variable, file_path, file_format='parquet', compression=None,
+                              _batch_size=100000, max_rows_per_file=None):
+        '''
+        Method to unload the result of a sql query to Parquet or compressed CSV files, streaming batch by batch
+        Arguments to this method: SQL Query or Variable containing the SQL query, output file path, file format
+        ('parquet' or 'csv'), compression (Parquet: snappy, zstd, gzip, lz4 - CSV: gzip, zstd, bz2, lz4 - None for
+        snappy Parquet / plain CSV), fetch batch size and the maximum rows per file
+        Note: Only one batch is held in memory at a time. Column names are lowercased and the Arrow schema is derived
+              from cursor.description, so every batch (and file) has the same column types. With max_rows_per_file
+              the files are named <file_path without extension>_00000.parquet, _00001 ...
+              Parquet output can be read back with read_parquet_data_to_df of etl_csv_file_to_oracle core_engine
+        Returns a dictionary with the files written, rows, bytes, seconds, rows per second and MB per second
+        '''
+        # pyarrow is only imported when data is actually unloaded
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+        start = time.perf_counter()
+        metrics = {'files': [], 'rows': 0, 'bytes': 0}
+        root, extension = os.path.splitext(file_path)
+        if file_format == 'csv' and compression:
+            # Keep the codec visible in the file name, like taxi_trips.csv.gz
+            extension += {'gzip': '.gz', 'zstd': '.zst', 'bz2': '.bz2', 'lz4': '.lz4'}.get(compression, '')
+
+        # Open the cursor as 'with' so, it's automatically closed upon task completion
+        with self.db_auto_connect.cursor() as cursor:
+            # One round trip per batch, and the batch is the unit of memory
+            cursor.arraysize = _batch_size
+            cursor.prefetchrows = _batch_size + 1
+            # LOBs are fetched as str / bytes and exact numbers without a float conversion, see _unload_output_type_handler
+            cursor.outputtypehandler = _unload_output_type_handler
+            # Execute the SQL Query or Variable containing the SQL query
+            execute = cursor.execute(_sql_query_or_sql_variable)
+            # The schema comes from the cursor itself, not from the values of the first batch
+            schema = pa.schema([pa.field(column[0].lower(), _arrow_type_of_column(column)) for column in execute.description])
+            sink = writer = None
+            file_rows = 0
+
+            def open_file():
+                # Start the next output file, named with its part number when the output is split
+                nonlocal sink, writer, file_rows
+                part_path = f"{root}_{len(metrics['files']):05d}{extension}" if max_rows_per_file else f"{root}{extension}"
+                metrics['files'].append(part_path)
+                sink = pa.OSFile(part_path, 'wb')
+                if file_format == 'parquet':
+                    writer = pq.ParquetWriter(sink, schema, compression=compression or 'snappy')
+                else:
+                    # Closing the compressed stream also closes the file underneath
+                    sink = pa.CompressedOutputStream(sink, compression) if compression else sink
+                    writer = pa_csv.CSVWriter(sink, schema)
+                file_rows = 0
+
+            def close_file():
+                # Close the current file and add its size to the metrics
+                writer.close()
+                sink.close()
+                metrics['bytes'] += os.path.getsize(metrics['files'][-1])
+
+            # The first file is opened upfront, so an empty result still gives a file with the header / schema
+            open_file()
+            try:
+                # fetchmany returns an empty list once all rows are fetched
+                for rows in iter(execute.fetchmany, []):
+                    # A batch crossing max_rows_per_file is sliced at the limit, its remaining rows start the next file
+                    row_idx = 0
+                    while row_idx < len(rows):
+                        if max_rows_per_file and file_rows >= max_rows_per_file:
+                            close_file()
+                            open_file()
+                        piece = rows[row_idx:row_idx + max_rows_per_file - file_rows] if max_rows_per_file else rows
+                        batch = pa.RecordBatch.from_arrays([pa.array(values, type=field.type) for values, field in zip(zip(*piece), schema)],
+                                                           schema=schema)
+                        writer.write_batch(batch)
+                        row_idx += len(piece)
+                        file_rows += len(piece)
+                        metrics['rows'] += len(piece)
+            finally:
+                close_file()
+
+        metrics['seconds'] = time.perf_counter() - start
+        metrics['rows_per_second'] = metrics['rows'] / metrics['seconds'] if metrics['seconds'] else 0.0
+        metrics['mb_per_second'] = metrics['bytes'] / 1048576 / metrics['seconds'] if metrics['seconds'] else 0.0
+        print(f"Unloaded {metrics['rows']} rows in to {len(metrics['files'])} file(s), {metrics['bytes']} bytes, "
+              f"{metrics['rows_per_second']:.0f} rows/s, {metrics['mb_per_second']:.1f} MB/s")
+        # return type of this method is a dictionary of metrics
+        return metrics
+
     def db_version(self):
         '''
         Method to get the DB version of the connected DB
@@ -0,0 +1,248 @@
+# Resilience layer for Oracle connections: retry with exponential backoff and failover across DSNs
+# The driver (cx_oracle by default) is passed in, so a fake driver raising injected errors can be used for tests
+import random
+import threading
+import time
+
+# ORA / TNS codes of errors that are worth retrying: network blips, listener restarts and lost sessions
+# 12154 (could not resolve the connect identifier) is a configuration error and is deliberately not retried
+transient_error_codes = frozenset({1033, 1034, 1089, 1109, 3113, 3114, 3135, 12153, 12157, 12170, 12223, 12224, 12225,
+                                   12230, 12231, 12233, 12235, 12236, 12514, 12516, 12518, 12520, 12521, 12528, 12537, 12541, 12543})
+
+
+def oracle_error_code(exception):
+    '''
+    Get the ORA code of a driver exception
+    Arguments to this function: the exception raised by the driver
+    Note: cx_oracle / oracledb errors carry an error object with a 'code' in args[0], None is returned otherwise
+    '''
+    if exception.args and hasattr(exception.args[0], 'code'):
+        return exception.args[0].code
+    return getattr(exception, 'code', None)
+
+
+class RetryPolicy:
+    '''
+    How transient errors are retried
+    max_attempts: attempts of one operation in total (first attempt included), on every DSN together
+    base_delay / max_delay: seconds waited before the first retry / at most, the delay grows by multiplier per retry
+    jitter: fraction of the delay randomized, so many clients do not reconnect at the same instant
+    retryable_codes: ORA codes retried, transient_error_codes by default
+    '''
+
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=30.0, multiplier=2.0, jitter=0.2, retryable_codes=transient_error_codes):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.retryable_codes = frozenset(retryable_codes)
+
+    def delay(self, retry_number):
+        '''
+        Seconds to wait before the given retry (1 for the first retry)
+        Arguments to this method: the retry number
+        '''
+        delay = min(self.base_delay * self.multiplier ** (retry_number - 1), self.max_delay)
+        return delay * (1 - self.jitter + 2 * self.jitter * random.random())
+
+    def is_retryable(self, exception):
+        '''
+        Check if an exception is a transient Oracle error
+        Arguments to this method: the exception
+        '''
+        return oracle_error_code(exception) in self.retryable_codes
+
+
+def new_retry_metrics():
+    '''
+    Create the counters updated by call_with_retry
+    Arguments to this function: None
+    Note: One metrics dictionary can be shared by many calls (and threads), see retry_metrics_snapshot to read it
+    '''
+    return {'operations': 0, 'attempts': 0, 'retries': 0, 'failovers': 0, 'failed_operations': 0, 'errors_by_code': {},
+            'total_seconds': 0.0, 'max_seconds': 0.0, 'backoff_seconds': 0.0, 'lock': threading.Lock()}
+
+
+def retry_metrics_snapshot(metrics):
+    '''
+    Copy of the retry metrics, without the lock
+    Arguments to this function: the metrics dictionary of new_retry_metrics
+    '''
+    with metrics['lock']:
+        snapshot = {key: value for key, value in metrics.items() if key != 'lock'}
+        snapshot['errors_by_code'] = dict(metrics['errors_by_code'])
+    snapshot['average_seconds'] = snapshot['total_seconds'] / snapshot['operations'] if snapshot['operations'] else 0.0
+    return snapshot
+
+
+def call_with_retry(operation, retry_policy, error_class, metrics=None, on_retry=None, sleep=time.sleep):
+    '''
+    Run an operation, retrying it with exponential backoff while it fails with a transient Oracle error
+    Arguments to this function: a function without arguments, the RetryPolicy, the driver error class (DatabaseError),
+    optional metrics (new_retry_metrics), optional on_retry(exception, attempt) called before every retry
+    (to reconnect or fail over) and the sleep function (injectable, so tests do not wait)
+    Note: Errors that are not transient, and the error of the last attempt, are raised as is
+    '''
+    metrics = metrics if metrics is not None else new_retry_metrics()
+    with metrics['lock']:
+        metrics['operations'] += 1
+    start = time.perf_counter()
+    attempt = 0
+    try:
+        while True:
+            attempt += 1
+            with metrics['lock']:
+                metrics['attempts'] += 1
+            try:
+                return operation()
+            except error_class as _errors:
+                code = oracle_error_code(_errors)
+                retry = retry_policy.is_retryable(_errors) and attempt < retry_policy.max_attempts
+                delay = retry_policy.delay(attempt) if retry else 0.0
+                with metrics['lock']:
+                    metrics['errors_by_code'][code] = metrics['errors_by_code'].get(code, 0) + 1
+                    if retry:
+                        metrics['retries'] += 1
+                        metrics['backoff_seconds'] += delay
+                    else:
+                        metrics['failed_operations'] += 1
+                if not retry:
+                    raise
+                if on_retry is not None:
+                    on_retry(_errors, attempt)
+                sleep(delay)
+    finally:
+        elapsed = time.perf_counter() - start
+        with metrics['lock']:
+            metrics['total_seconds'] += elapsed
+            metrics['max_seconds'] = max(metrics['max_seconds'], elapsed)
+
+
+class ResilientOracleConnection:
+    '''
+    Standalone connection to Oracle that survives transient errors, for scripts not going through a session pool
+    A transient error drops the connection, moves on to the next DSN of the list and retries the operation
+    with exponential backoff; the next attempt connects again
+    Read queries are retried as a whole, loads are retried chunk by chunk, committed chunks are never redone
+    '''
+
+    def __init__(self, user, password, dsn_list, driver=None, retry_policy=None, sleep=time.sleep):
+        # The driver module: anything with connect(user=, password=, dsn=) and DatabaseError, like cx_oracle or oracledb
+        if driver is None:
+            import cx_oracle as driver
+        self.driver = driver
+        self._user = user
+        self.__password = password
+        # A single DSN can be given as a string
+        self.dsn_list = [dsn_list] if isinstance(dsn_list, str) else list(dsn_list)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = new_retry_metrics()
+        self._sleep = sleep
+        self._dsn_idx = 0
+        self.connection = None
+
+    @property
+    def current_dsn(self):
+        # The DSN connections are currently opened on
+        return self.dsn_list[self._dsn_idx]
+
+    def _fail_over(self, _errors, attempt):
+        # The connection is most likely dead already, so errors while closing it are ignored
+        self.close()
+        if len(self.dsn_list) > 1:
+            self._dsn_idx = (self._dsn_idx + 1) % len(self.dsn_list)
+            with self.metrics['lock']:
+                self.metrics['failovers'] += 1
+
+    def _retry(self, operation):
+        return call_with_retry(operation, self.retry_policy, self.driver.DatabaseError, self.metrics, self._fail_over, self._sleep)
+
+    def _connection(self):
+        if self.connection is None:
+            self.connection = self.driver.connect(user=self._user, password=self.__password, dsn=self.current_dsn)
+        return self.connection
+
+    def connect(self):
+        '''
+        Open the connection on the first DSN that answers, retrying transient errors with backoff
+        Arguments to this method: None
+        Returns the driver connection
+        '''
+        return self._retry(self._connection)
+
+    def run_read(self, read):
+        '''
+        Run a read-only operation, retried as a whole on a transient error
+        Arguments to this method: a function taking the connection and returning the result of the read
+        Note: The function may run several times, so it must not have side effects
+        '''
+        return self._retry(lambda: read(self._connection()))
+
+    def fetch_all(self, _sql_query_or_sql_variable, parameters=None):
+        '''
+        Execute a read query and fetch all rows, retrying transient errors
+        Arguments to this method: SQL Query or Variable containing the SQL query and optional bind parameters
+        '''
+        def read(connection):
+            cursor = connection.cursor()
+            try:
+                cursor.execute(_sql_query_or_sql_variable, parameters or {})
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        return self.run_read(read)
+
+    def run_load_chunks(self, chunks, load_chunk, is_chunk_committed=None):
+        '''
+        Load chunks in one transaction each, retrying only the chunk that failed
+        Arguments to this method: iterable of chunks, load_chunk(connection, chunk) running the DML of a chunk without
+        committing, and optionally is_chunk_committed(connection, chunk_idx)
+        Note: A connection lost during the commit leaves it unknown whether the chunk was committed. is_chunk_committed
+              is asked before such a chunk is retried (e.g. a lookup in a load control table); without it load_chunk
+              must be idempotent (like a MERGE) for the chunk not to be applied twice
+        Returns the number of chunks loaded
+        '''
+        loaded = 0
+        for chunk_idx, chunk in enumerate(chunks):
+            commit_started = [False]
+
+            def load():
+                connection = self._connection()
+                if commit_started[0] and is_chunk_committed is not None and is_chunk_committed(connection, chunk_idx):
+                    return
+                commit_started[0] = False
+                try:
+                    load_chunk(connection, chunk)
+                except self.driver.DatabaseError:
+                    # Undo the partial chunk if the session is still alive, the retry starts the chunk over
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    raise
+                commit_started[0] = True
+                connection.commit()
+
+            self._retry(load)
+            loaded += 1
+        return loaded
+
+    def metrics_snapshot(self):
+        '''
+        Retry counts and latencies of the operations run so far
+        Arguments to this method: None
+        '''
+        return retry_metrics_snapshot(self.metrics)
+
+    def close(self):
+        '''
+        Close the connection, ignoring errors of an already dead connection
+        Arguments to this method: None
+        '''
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
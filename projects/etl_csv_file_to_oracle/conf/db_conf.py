@@ -1,9 +1,44 @@
-import oracledb
-from secret_vault.db_credentials import ora_db_local 
-from sqlalchemy import create_engine  
+from threading import Lock
 
 ora_db_conf = {'host': 'localhost', 'port': 1521, 'service_name': 'ORCLPDB'}
-ora_db_dsn = oracledb.makedsn(ora_db_conf['host'], ora_db_conf['port'], service_name=ora_db_conf['service_name'])
-ora_user = ora_db_local['username']
-ora_password = ora_db_local['password']
-ora_engine = create_engine(f"oracle+oracledb://{ora_user}:{ora_password}@{ora_db_dsn}")
\ No newline at end of file
+# Connections shared by all validation jobs running in parallel (see execution/orchestrator.py)
+ora_pool_size = 8
+ora_max_overflow = 4
+# Pooled connections idle for longer than this are pinged before reuse (see execution/connection_engine.py)
+ora_pool_ping_idle_seconds = 60
+
+# oracledb, SQLAlchemy and the credentials are only loaded when the engine is first used,
+# so importing this module (and every entry point importing it) stays cheap
+_ora_engine = None
+_ora_engine_lock = Lock()
+
+def get_ora_engine():
+    """
+    Get the SQLAlchemy engine of the Oracle database, creating it on first use.
+
+    Returns:
+        sqlalchemy.engine.Engine: The engine shared by the whole process.
+    """
+    global _ora_engine
+    if _ora_engine is None:
+        with _ora_engine_lock:
+            if _ora_engine is None:
+                import oracledb
+                from sqlalchemy import create_engine
+                from secret_vault.db_credentials import ora_db_local
+                from etl_csv_file_to_oracle.execution.connection_engine import attach_liveness_check, attach_pool_metrics
+                ora_db_dsn = oracledb.makedsn(ora_db_conf['host'], ora_db_conf['port'], service_name=ora_db_conf['service_name'])
+                engine = create_engine(f"oracle+oracledb://{ora_db_local['username']}:{ora_db_local['password']}@{ora_db_dsn}",
+                                       pool_size=ora_pool_size, max_overflow=ora_max_overflow)
+                attach_liveness_check(engine, ora_pool_ping_idle_seconds)
+                attach_pool_metrics(engine)
+                _ora_engine = engine
+    return _ora_engine
+
+def __getattr__(name):
+    """
+    Keep 'from etl_csv_file_to_oracle.conf.db_conf import ora_engine' working, the engine is created at that point.
+    """
+    if name == 'ora_engine':
+        return get_ora_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,23 @@ from etl_csv_file_to_oracle.conf.proj_conf import get_input_path
 
 input_file_name = 'taxi_trip_data.csv'
 desired_columns = ['pick_up_time', 'drop_off_time', 'trip_distance', 'trip_fare', 'payment_method', 'cab_color', 'pickup_location', 'pickup_zone', 'dropoff_location', 'dropoff_zone']
+numeric_columns = ['trip_distance', 'trip_fare']
+categorical_columns = ['payment_method', 'cab_color', 'pickup_zone']
+# Type normalization before comparison: decimals numeric values are compared on, and the canonical format of
+# time of day columns and of other date/time columns
+time_columns = ['pick_up_time', 'drop_off_time']
+numeric_decimals = 2
+time_format = '%H:%M:%S'
+datetime_format = '%Y-%m-%d %H:%M:%S'
+# Fail-fast validation: data validation is skipped when the row counts differ by more than count_gate_tolerance rows
+# (None, the default, disables the count gate), and the sorted comparison stops after fail_fast_max_mismatches unmatched rows, or when
+# more than fail_fast_max_mismatch_rate of the first fail_fast_window_rows rows compared do not match (None disables)
+count_gate_tolerance = None
+fail_fast_max_mismatches = None
+fail_fast_max_mismatch_rate = None
+fail_fast_window_rows = 100000
+# Columns uniquely identifying a row; when set, data validation compares by key and reports the differing columns
+key_columns = []
 
 def get_input_file(input_file_name):
     """
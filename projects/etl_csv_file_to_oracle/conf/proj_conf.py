@@ -1,6 +1,16 @@
 import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from time import time
 
+# Environment variables overriding the project directories for a whole process
+input_path_env = 'ETL_CSV_FILE_TO_ORACLE_INPUT_PATH'
+output_path_env = 'ETL_CSV_FILE_TO_ORACLE_OUTPUT_PATH'
+# Per job overrides, set through path_roots
+_input_root = ContextVar('input_root', default=None)
+_output_root = ContextVar('output_root', default=None)
+
 def timer(func):
     """
     Decorator that measures and tracks the execution time of a function.
@@ -24,40 +34,54 @@ def timer(func):
     total = 0
     return wrapper
 
+@lru_cache(maxsize=None)
 def get_proj_home():
     """
     Get the project home directory path.
     
-    This function determines the project home directory by:
-    1. Finding the directory containing the current file
-    2. Converting backslashes to forward slashes for cross-platform compatibility
-    3. Changing the current working directory to the config directory
-    4. Moving up one directory level to reach the project root
-    5. Retrieving and normalizing the absolute path
+    The project home is the parent of the directory containing this file. It is derived from
+    this file's path alone (the process working directory is neither read nor changed), so it
+    is computed once per process and is safe to call from any number of threads.
     
     Returns:
         str: The absolute path to the project home directory with forward slashes.
     """
-    proj_path = os.path.dirname(os.path.abspath(__file__))
-    set_cwdproj_path = proj_path.replace('\\', '/')
-    os.chdir(set_cwdproj_path) 
-    os.chdir('..')
-    proj_home = os.getcwd().replace('\\', '/')
-    return proj_home
+    proj_home = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return proj_home.replace('\\', '/')
+
+@contextmanager
+def path_roots(input_root=None, output_root=None):
+    """
+    Override the input and/or output directory for the code running inside the 'with' block.
+
+    Overrides are held in context variables, so each thread (or asyncio task) running a job
+    sees only its own roots and parallel jobs can use different directories in one interpreter.
+
+    Args:
+        input_root (str, optional): Directory returned by get_input_path inside the block.
+        output_root (str, optional): Directory returned by get_output_path inside the block.
+    """
+    input_token = _input_root.set(input_root)
+    output_token = _output_root.set(output_root)
+    try:
+        yield
+    finally:
+        _input_root.reset(input_token)
+        _output_root.reset(output_token)
 
 def get_output_path():
     """
     Retrieve the output directory path for the project.
 
     Constructs the output directory path by joining the project home directory
-    with an 'output' subdirectory. Path separators are normalized to forward slashes.
+    with an 'output' subdirectory, unless overridden by path_roots or the output path
+    environment variable. Path separators are normalized to forward slashes.
 
     Returns:
         str: The absolute path to the project's output directory with forward slashes.
     """
-    proj_home = get_proj_home()
-    output_path = os.path.join(proj_home, 'output').replace('\\', '/')
-    return output_path
+    output_path = _output_root.get() or os.environ.get(output_path_env) or os.path.join(get_proj_home(), 'output')
+    return output_path.replace('\\', '/')
 
 
 def get_input_path():
@@ -65,11 +89,11 @@ def get_input_path():
     Retrieve the input directory path for the project.
 
     Constructs the input directory path by joining the project home directory
-    with an 'input' subdirectory. Path separators are normalized to forward slashes.
+    with an 'input' subdirectory, unless overridden by path_roots or the input path
+    environment variable. Path separators are normalized to forward slashes.
 
     Returns:
         str: The absolute path to the project's input directory with forward slashes.
     """
-    proj_home = get_proj_home()
-    input_path = os.path.join(proj_home, 'input').replace('\\', '/')
-    return input_path
\ No newline at end of file
+    input_path = _input_root.get() or os.environ.get(input_path_env) or os.path.join(get_proj_home(), 'input')
+    return input_path.replace('\\', '/')
\ No newline at end of file
@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from itertools import islice
+from etl_csv_file_to_oracle.conf.proj_conf import get_output_path
+from etl_csv_file_to_oracle.conf.input_file import desired_columns
+
+"""
+Durable progress of long running loads and validations, kept in a local SQLite file.
+
+A checkpoint is one committed unit of work (a chunk of a load, a job of a validation manifest)
+within a scope (the load of a file in to a table, a manifest run), saved only after the work it
+records was committed. Each checkpoint carries the signature of its input, and checkpoints with
+a different signature are ignored, so a changed source file starts over instead of resuming.
+Every call opens its own SQLite connection, so parallel jobs can record progress concurrently.
+"""
+
+checkpoint_file_name = 'checkpoints.sqlite'
+
+def get_checkpoint_file():
+    """
+    Get the default checkpoint store of the project, in the output directory.
+
+    Returns:
+        str: The path to the SQLite checkpoint file.
+    """
+    return f"{get_output_path()}/{checkpoint_file_name}"
+
+def _connect(checkpoint_file):
+    os.makedirs(os.path.dirname(checkpoint_file) or '.', exist_ok=True)
+    connection = sqlite3.connect(checkpoint_file, timeout=60, isolation_level=None)
+    # synchronous=FULL: a checkpoint reported as saved survives a crash or power loss
+    connection.execute('PRAGMA synchronous=FULL')
+    connection.execute("""CREATE TABLE IF NOT EXISTS checkpoints (
+                              scope TEXT NOT NULL,
+                              unit TEXT NOT NULL,
+                              signature TEXT NOT NULL,
+                              position INTEGER,
+                              state TEXT,
+                              committed_at TEXT NOT NULL,
+                              PRIMARY KEY (scope, unit))""")
+    return connection
+
+def file_signature(file_path):
+    """
+    Signature of a source file, changing whenever the file is rewritten.
+
+    Args:
+        file_path (str): The path to the file.
+    Returns:
+        str: Size and modification time of the file.
+    """
+    stat = os.stat(file_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def save_checkpoint(checkpoint_file, scope, unit, signature, position=None, state=None):
+    """
+    Record a committed unit of work, replacing any earlier checkpoint of the same unit.
+
+    Args:
+        checkpoint_file (str): The path to the SQLite checkpoint file.
+        scope (str): What is being processed, like 'load:taxi_trips_data_5:taxi_trip_data.csv'.
+        unit (str or int): The committed unit within the scope, like a chunk number or a job name.
+        signature (str): Signature of the input the unit was processed from.
+        position (int, optional): Where to resume after this unit, like the byte offset following a chunk.
+        state (dict, optional): JSON serializable details of the unit.
+    """
+    with closing(_connect(checkpoint_file)) as connection:
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO checkpoints (scope, unit, signature, position, state, committed_at) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (scope, str(unit), signature, position, json.dumps(state, default=str),
+                                datetime.now().isoformat(timespec='seconds')))
+
+def load_checkpoints(checkpoint_file, scope, signature):
+    """
+    Read the committed units of a scope processed from the same input.
+
+    Args:
+        checkpoint_file (str): The path to the SQLite checkpoint file.
+        scope (str): The scope, as given to save_checkpoint.
+        signature (str): Signature of the current input, checkpoints of any other input are ignored.
+    Returns:
+        dict: unit -> (position, state) of every checkpoint.
+    """
+    if not os.path.exists(checkpoint_file):
+        return {}
+    with closing(_connect(checkpoint_file)) as connection:
+        rows = connection.execute("SELECT unit, position, state FROM checkpoints WHERE scope = ? AND signature = ?",
+                                  (scope, signature)).fetchall()
+    return {unit: (position, json.loads(state)) for unit, position, state in rows}
+
+def clear_checkpoints(checkpoint_file, scope):
+    """
+    Forget the progress of a scope, so its next run starts from the beginning.
+
+    Args:
+        checkpoint_file (str): The path to the SQLite checkpoint file.
+        scope (str): The scope, as given to save_checkpoint.
+    """
+    if os.path.exists(checkpoint_file):
+        with closing(_connect(checkpoint_file)) as connection:
+            with connection:
+                connection.execute("DELETE FROM checkpoints WHERE scope = ?", (scope,))
+
+def read_csv_chunks_from_offset(file_path, chunk_rows, file_offset=None):
+    """
+    Read a CSV file in chunks of rows, starting at a byte offset, with the byte range of every chunk.
+
+    Chunks are cut on line boundaries, so every record must be on a single line (no quoted line
+    breaks), which holds for the files written by synthetic_data_generator. Resuming at the end
+    offset of a chunk yields exactly the chunks that follow it.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        chunk_rows (int): Rows per chunk.
+        file_offset (int, optional): Byte offset of the first row to read, defaults to the row after the header.
+    Yields:
+        tuple: (start offset, end offset, pd.DataFrame of the desired columns)
+    """
+    import pandas as pd
+    with open(file_path, 'rb') as src:
+        header = src.readline()
+        if file_offset is not None:
+            src.seek(file_offset)
+        while True:
+            start_offset = src.tell()
+            lines = list(islice(src, chunk_rows))
+            if not lines:
+                return
+            df = pd.read_csv(io.BytesIO(header + b''.join(lines)), usecols=desired_columns)
+            yield start_offset, src.tell(), df[desired_columns]
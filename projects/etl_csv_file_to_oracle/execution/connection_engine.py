@@ -0,0 +1,220 @@
+import os
+import traceback
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import time
+
+"""
+Lifecycle of the pooled connections of a SQLAlchemy engine.
+
+    - ora_connection: context-managed checkout, reused by every read nested in the same block
+      (thread or task), so one job pays for a single checkout however many queries it runs
+    - run_on_connection: runs a whole validation job in one ora_connection block, reporting a
+      failed checkout instead of raising it
+    - attach_liveness_check: a connection idle for longer than a threshold is pinged when it is
+      checked out again, and replaced if dead; recently used connections are handed out without
+      an extra round trip, unlike pool_pre_ping which pings on every checkout
+    - attach_pool_metrics: checkouts, checkins, new connections, invalidations, checkout wait
+      time and pool overflow, plus the connections checked out for too long (leaks) with the
+      stack that checked them out
+"""
+
+_pool_metrics = weakref.WeakKeyDictionary()
+_current_connection = ContextVar('current_connection', default=None)
+
+class OraConnectionError(Exception):
+    """
+    No connection could be checked out of the pool (database unreachable, pool timeout...),
+    as opposed to an error of the query run on the connection.
+    """
+
+def checkout_connection(ora_engine):
+    """
+    Check out a pooled connection, recording the time spent waiting for it.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+    Returns:
+        sqlalchemy.engine.Connection: The connection, to be closed by the caller.
+    Raises:
+        OraConnectionError: If no connection could be checked out.
+    """
+    start = time()
+    try:
+        connection = ora_engine.connect()
+    except Exception as e:
+        raise OraConnectionError(str(e)) from e
+    waited = time() - start
+    metrics = _pool_metrics.get(ora_engine)
+    if metrics is not None:
+        with metrics['lock']:
+            metrics['wait_seconds'] += waited
+            metrics['max_wait_seconds'] = max(metrics['max_wait_seconds'], waited)
+    return connection
+
+def _caller_stack(depth=8):
+    """
+    The innermost frames of the current stack outside SQLAlchemy and this module, where a connection was checked out.
+    """
+    stack = [frame for frame in traceback.extract_stack()
+             if f"{os.sep}sqlalchemy{os.sep}" not in frame.filename and frame.filename != __file__]
+    return stack[-depth:]
+
+def attach_pool_metrics(engine):
+    """
+    Record the pool activity of an engine, see pool_metrics and find_leaked_connections.
+
+    Args:
+        engine: The SQLAlchemy engine.
+    Returns:
+        dict: The live metrics of the engine.
+    """
+    from sqlalchemy import event
+    if engine in _pool_metrics:
+        return _pool_metrics[engine]
+    metrics = {'checkouts': 0, 'checkins': 0, 'connects': 0, 'invalidations': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+               'checked_out': {}, 'lock': Lock()}
+    _pool_metrics[engine] = metrics
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        with metrics['lock']:
+            metrics['connects'] += 1
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with metrics['lock']:
+            metrics['checkouts'] += 1
+            metrics['checked_out'][id(connection_record)] = (time(), _caller_stack())
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        with metrics['lock']:
+            metrics['checkins'] += 1
+            metrics['checked_out'].pop(id(connection_record), None)
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with metrics['lock']:
+            metrics['invalidations'] += 1
+            metrics['checked_out'].pop(id(connection_record), None)
+
+    return metrics
+
+def attach_liveness_check(engine, idle_seconds=60, ping_query='SELECT 1 FROM dual'):
+    """
+    Ping connections idle for longer than 'idle_seconds' when they are checked out, replacing dead ones.
+
+    Args:
+        engine: The SQLAlchemy engine.
+        idle_seconds (float): Idle time after which a connection is pinged before being reused.
+        ping_query (str): Query used when the driver connection has no ping() method.
+    """
+    from sqlalchemy import event, exc
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info['last_used'] = time()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        last_used = connection_record.info.get('last_used')
+        if last_used is None or time() - last_used < idle_seconds:
+            return
+        try:
+            if hasattr(dbapi_connection, 'ping'):
+                dbapi_connection.ping()
+            else:
+                cursor = dbapi_connection.cursor()
+                cursor.execute(ping_query)
+                cursor.close()
+        except Exception as e:
+            # The pool discards this connection and checks out (or opens) another one
+            raise exc.DisconnectionError(f"Connection idle for {time() - last_used:.0f}s failed its liveness check: {e}")
+
+def pool_metrics(engine):
+    """
+    Snapshot of the pool metrics of an engine.
+
+    Args:
+        engine: The SQLAlchemy engine, with attach_pool_metrics applied.
+    Returns:
+        dict: Counters, checkout wait times, and the current pool size, checked out connections and overflow.
+    """
+    metrics = _pool_metrics.get(engine)
+    if metrics is None:
+        return {}
+    with metrics['lock']:
+        snapshot = {key: value for key, value in metrics.items() if key not in ('checked_out', 'lock')}
+        snapshot['checked_out_now'] = len(metrics['checked_out'])
+    pool = engine.pool
+    for name in ('size', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            snapshot[f"pool_{name}"] = getattr(pool, name)()
+    return snapshot
+
+def find_leaked_connections(engine, older_than_seconds=300):
+    """
+    List the connections checked out for longer than a threshold, most likely never closed.
+
+    Args:
+        engine: The SQLAlchemy engine, with attach_pool_metrics applied.
+        older_than_seconds (float): Minimum checkout duration reported.
+    Returns:
+        list: (seconds checked out, formatted stack of the checkout) of every such connection.
+    """
+    metrics = _pool_metrics.get(engine)
+    if metrics is None:
+        return []
+    now = time()
+    with metrics['lock']:
+        checked_out = list(metrics['checked_out'].values())
+    return [(now - checked_out_at, ''.join(traceback.format_list(stack)))
+            for checked_out_at, stack in checked_out if now - checked_out_at >= older_than_seconds]
+
+@contextmanager
+def ora_connection(ora_engine):
+    """
+    Check out a pooled connection for the block, or reuse the one of an enclosing block.
+
+    Every read inside 'with ora_connection(ora_engine):' (pd_read_sql, sql_read_scalar, ...) runs
+    on the same connection, which goes back to the pool when the outermost block exits.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+    Yields:
+        sqlalchemy.engine.Connection: The connection.
+    Raises:
+        OraConnectionError: If no connection could be checked out.
+    """
+    current = _current_connection.get()
+    if current is not None and current.engine is ora_engine and not current.closed:
+        yield current
+        return
+    connection = checkout_connection(ora_engine)
+    token = _current_connection.set(connection)
+    try:
+        yield connection
+    finally:
+        _current_connection.reset(token)
+        connection.close()
+
+def run_on_connection(ora_engine, job):
+    """
+    Run a job with every read on one pooled connection (see ora_connection), reporting a failed checkout.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        job (callable): Function without arguments running the reads.
+    Returns:
+        The result of the job, or None if no connection could be checked out.
+    """
+    try:
+        with ora_connection(ora_engine):
+            return job()
+    except OraConnectionError as e:
+        print(f"Failed to connect to the Oracle database: {e}")
+        print("Unable to read data from Oracle database due to connection issues.")
+        return None
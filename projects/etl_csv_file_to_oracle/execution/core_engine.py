@@ -1,6 +1,7 @@
-import pandas as pd
 from etl_csv_file_to_oracle.conf.proj_conf import get_output_path, timer
-from etl_csv_file_to_oracle.conf.input_file import desired_columns, input_file_path
+from etl_csv_file_to_oracle.conf.input_file import desired_columns, input_file_path, count_gate_tolerance
+from etl_csv_file_to_oracle.execution.connection_engine import ora_connection, checkout_connection, pool_metrics, find_leaked_connections, OraConnectionError
+from etl_csv_file_to_oracle.execution.normalize_engine import normalize_for_compare
 
 #@timer
 def read_csv_data_to_df(file_path):
@@ -10,24 +11,70 @@ def read_csv_data_to_df(file_path):
     Args:
         file_path (str): The path to the CSV file to be read.
         """
+    import pandas as pd
     read_csv_file = pd.read_csv(file_path, usecols=desired_columns)
     return pd.DataFrame(read_csv_file)
 
-def read_csv_row_count(file_path):
+def read_parquet_data_to_df(file_path):
     """
-    Reads a CSV file from the specified file path and returns the number of rows in the DataFrame.
+    Reads a Parquet file, or a directory of Parquet files, and returns the desired columns as a pandas DataFrame.
+    Used for target snapshots unloaded with CustomCxOracle.db_unload_sql_to_file or extract_engine, so a
+    validation can run against a snapshot instead of querying the database again.
+    
+    Args:
+        file_path (str): The path to the Parquet file or dataset directory to be read.
+    Returns:
+        pd.DataFrame: The desired columns, with lowercase column names.
+    """
+    import pyarrow.dataset as ds
+    dataset = ds.dataset(file_path, format='parquet')
+    columns = {name.lower(): name for name in dataset.schema.names}
+    table = dataset.to_table(columns=[columns[column] for column in desired_columns])
+    return table.rename_columns(desired_columns).to_pandas()
+
+def read_csv_row_count(file_path, block_bytes=1 << 20):
+    """
+    Counts the data rows of a CSV file without parsing it.
+    Lines are counted on the raw bytes, block by block, so a count check neither imports pandas
+    nor holds the file in memory. A quoted value may hold a line break, which would be counted as
+    a row, so a file with quotes is counted again as CSV records with the csv module (slower).
     
     Args:
         file_path (str): The path to the CSV file to be read.   
+        block_bytes (int): Number of bytes read at a time.
     Returns:
-        int: The number of rows in the DataFrame.
+        int: The number of rows in the file, header excluded.
     """
-    read_csv_file = pd.read_csv(file_path, usecols=desired_columns)
-    return read_csv_file.shape[0]
+    lines = 0
+    last_byte = b'\n'
+    with open(file_path, 'rb') as src:
+        while block := src.read(block_bytes):
+            if b'"' in block:
+                return read_csv_record_count(file_path)
+            lines += block.count(b'\n')
+            last_byte = block[-1:]
+    if last_byte != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+def read_csv_record_count(file_path):
+    """
+    Counts the data rows of a CSV file as CSV records, so line breaks inside quoted values are not counted as rows.
+    
+    Args:
+        file_path (str): The path to the CSV file to be read.
+    Returns:
+        int: The number of rows in the file, header excluded.
+    """
+    import csv
+    with open(file_path, 'r', newline='', encoding='utf-8', errors='replace') as src:
+        records = sum(1 for _ in csv.reader(src))
+    return max(records - 1, 0)
 
 def check_ora_conn(ora_engine):
     """
     Checks the connection to the Oracle database using the provided SQLAlchemy engine.
+    Inside a 'with ora_connection(ora_engine):' block the connection of the block is checked, no new one is opened.
     
     Args:
         ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
@@ -36,7 +83,7 @@ def check_ora_conn(ora_engine):
         bool: True if the connection is successful, False otherwise.
     """
     try:
-        with ora_engine.connect() as connection:
+        with ora_connection(ora_engine):
             print("Successfully connected to the Oracle database.")
             return True
     except Exception as e:
@@ -46,57 +93,213 @@ def check_ora_conn(ora_engine):
 def close_ora_conn(ora_engine):
     """
     Closes the connection to the Oracle database.
+    Prints the pool metrics and any connection still checked out (a leak) before closing the pool.
     
     Args:
         ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
     """
     try:
+        metrics = pool_metrics(ora_engine)
+        if metrics:
+            print(f"Oracle connection pool: {metrics}")
+        for seconds, stack in find_leaked_connections(ora_engine, older_than_seconds=0):
+            print(f"Connection checked out for {seconds:.1f}s and never returned to the pool, checked out at:\n{stack}")
         ora_engine.dispose()
         print("Oracle database connection closed successfully.")
     except Exception as e:
         print(f"Failed to close the Oracle database connection: {e}")
 
+def _read_sql_chunks(query, connection, params, chunksize):
+    """
+    Yields the DataFrames of a chunked read, returning the connection to the pool once they are all read.
+    """
+    import pandas as pd
+    with connection:
+        yield from pd.read_sql(query, con=connection, params=params, chunksize=chunksize)
+
 #@timer
-def pd_read_sql(query, ora_engine):
+def pd_read_sql(query, ora_engine, params=None, chunksize=None):
     """
     Executes a SQL query and returns the result as a pandas DataFrame.
+    The query runs on the connection of an enclosing 'with ora_connection(ora_engine):' block, or on a
+    pooled connection checked out for this read only, and the connection always goes back to the pool.
     Args:
         query (str): The SQL query to be executed.
-        connection: The database connection object to use for executing the query.
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        params (dict, optional): Bind variables referenced in the query as :name.
+        chunksize (int, optional): When set, return an iterator of DataFrames of this many rows instead.
     Returns:
         pd.DataFrame: A DataFrame containing the results of the SQL query.
     """
-    if check_ora_conn(ora_engine):
-        print("Reading data from Oracle database...")
-        return pd.read_sql(query, con=ora_engine.connect())
+    import pandas as pd
+    try:
+        if chunksize:
+            # The connection stays checked out while the chunks are read, on its own (not the block's) connection
+            return _read_sql_chunks(query, checkout_connection(ora_engine), params, chunksize)
+        with ora_connection(ora_engine) as connection:
+            print("Reading data from Oracle database...")
+            return pd.read_sql(query, con=connection, params=params)
+    except OraConnectionError as e:
+        print(f"Failed to connect to the Oracle database: {e}")
+    return "Unable to read data from Oracle database due to connection issues."
+
+def sql_read_scalar(query, ora_engine, params=None):
+    """
+    Executes a SQL query returning a single value, without going through pandas.
+    Runs on the connection of an enclosing 'with ora_connection(ora_engine):' block, like pd_read_sql.
+    Args:
+        query (str): The SQL query to be executed, for example a count(*).
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        params (dict, optional): Bind variables referenced in the query as :name.
+    Returns:
+        The first column of the first row of the result.
+    """
+    from sqlalchemy import text
+    try:
+        with ora_connection(ora_engine) as connection:
+            print("Reading data from Oracle database...")
+            return connection.execute(text(query), params or {}).scalar()
+    except OraConnectionError as e:
+        print(f"Failed to connect to the Oracle database: {e}")
     return "Unable to read data from Oracle database due to connection issues."
 
 @timer
-def data_compare_dataframes(df1, df2):
+def data_compare_dataframes(df1, df2, normalize=True, sink=None):
     """
     Compares two pandas DataFrames for equality and returns a DataFrame containing the differences.
     Args:
         df1 (pd.DataFrame): The first DataFrame to compare.
         df2 (pd.DataFrame): The second DataFrame to compare.    
+        normalize (bool): Normalize column names and value representations of both sides first (see normalize_engine).
+        sink (DifferenceSink, optional): Stream the differences to the sink (categories source_only and target_only)
+            and return its summary instead of the DataFrame.
     Returns:        pd.DataFrame: A DataFrame containing the differences between the two input DataFrames.  """
+    import pandas as pd
+    if normalize:
+        df1, df2 = normalize_for_compare(df1, df2)
     if df1.equals(df2):
         return "Src File and Target Table are identical"
+    elif sink is not None:
+        differences = pd.concat([df1, df2], keys=['source_only', 'target_only']).drop_duplicates(keep=False)
+        if differences.empty:
+            return "Src File and Target Table are identical"
+        for side in ('source_only', 'target_only'):
+            sink.add(differences.loc[differences.index.get_level_values(0) == side].reset_index(drop=True), side)
+        return sink.summary()
     else:
         # Create a DataFrame to hold the differences
         differences = pd.concat([df1, df2]).drop_duplicates(keep=False)
         return differences
     
+@timer
+def data_compare_dataframes_by_key(df1, df2, key_columns, normalize=True, numeric_tolerance=None, sink=None):
+    """
+    Compares two pandas DataFrames row by row on the given key columns.
+    The DataFrames are hash joined on the keys, so row order does not matter, and every
+    non-key column is compared on whole columns at once.
+    Args:
+        df1 (pd.DataFrame): The source DataFrame to compare.
+        df2 (pd.DataFrame): The target DataFrame to compare.
+        key_columns (list): Columns uniquely identifying a row in both DataFrames.
+        normalize (bool): Normalize column names and value representations of both sides first (see normalize_engine).
+        numeric_tolerance (float, optional): Numeric values differing by at most this much are reported as equal.
+        sink (DifferenceSink, optional): Stream the differences to the sink and return its summary instead of the DataFrame.
+    Returns:
+        str or pd.DataFrame: Confirmation message if identical, otherwise one row per difference with the key columns,
+        'difference' (mismatch, missing, extra, duplicate_key_source or duplicate_key_target), 'column' (the mismatched
+        column, NaN for the other differences), 'source_value' and 'target_value'.
+    """
+    import pandas as pd
+    if normalize:
+        df1, df2 = normalize_for_compare(df1, df2, keys=key_columns)
+        key_columns = [column.lower() for column in key_columns]
+    columns = key_columns + ['difference', 'column', 'source_value', 'target_value']
+    # With a sink every kind of difference is streamed as soon as it is found, never concatenated in to one DataFrame
+    differences, different_rows = [], 0
+    for difference in _key_differences(df1, df2, key_columns, numeric_tolerance):
+        difference = difference.reindex(columns=columns)
+        different_rows += len(difference)
+        if sink is not None:
+            sink.add(difference)
+        else:
+            differences.append(difference)
+    if not different_rows:
+        return "Src File and Target Table are identical"
+    if sink is not None:
+        return sink.summary()
+    return pd.concat(differences, ignore_index=True)
+
+def _key_differences(df1, df2, key_columns, numeric_tolerance):
+    import pandas as pd
+    for side, df in (('source', df1), ('target', df2)):
+        duplicated = df.duplicated(key_columns, keep='first')
+        if duplicated.any():
+            yield df.loc[duplicated, key_columns].assign(difference=f"duplicate_key_{side}")
+    merged = df1.drop_duplicates(key_columns).merge(df2.drop_duplicates(key_columns), on=key_columns, how='outer',
+                                                    suffixes=('_src', '_tgt'), indicator=True)
+    for merge_side, difference in (('left_only', 'missing'), ('right_only', 'extra')):
+        unmatched = merged['_merge'] == merge_side
+        if unmatched.any():
+            yield merged.loc[unmatched, key_columns].assign(difference=difference)
+    both = merged[merged['_merge'] == 'both']
+    for column in [column for column in df1.columns if column not in key_columns]:
+        source_values, target_values = both[f"{column}_src"], both[f"{column}_tgt"]
+        if numeric_tolerance is not None and pd.api.types.is_float_dtype(source_values) and pd.api.types.is_float_dtype(target_values):
+            mismatched = (source_values.isna() != target_values.isna()) | ((source_values - target_values).abs() > numeric_tolerance)
+        else:
+            # Nullable (Int64) columns give NA for a NULL on one side only, which is a mismatch
+            mismatched = (source_values != target_values).fillna(True).astype(bool) & ~(source_values.isna() & target_values.isna())
+        if mismatched.any():
+            yield both.loc[mismatched, key_columns].assign(difference='mismatch', column=column,
+                                                           source_value=source_values[mismatched],
+                                                           target_value=target_values[mismatched])
+
 @timer
 def count_compare_dataframes(df1, df2):
     """
-    Compares two pandas DataFrames for equality and returns a DataFrame containing the differences.
+    Compares the row count of the source file with the row count of the target table.
     Args:
-        df1 (pd.DataFrame): The first DataFrame to compare.
-        df2 (pd.DataFrame): The second DataFrame to compare.    
-    Returns:        pd.DataFrame: A DataFrame containing the differences between the two input DataFrames.  """
-    if df1 == df2.values[0][0]:
+        df1 (int): The row count of the source file.
+        df2 (int or pd.DataFrame): The row count of the target table, as returned by sql_read_scalar or pd_read_sql.
+    Returns:        str or pd.DataFrame: Confirmation message if the counts are equal, otherwise a DataFrame with both counts.  """
+    if isinstance(df2, str):
+        return df2
+    target_count = df2.values[0][0] if hasattr(df2, 'values') else df2
+    if df1 == target_count:
         return "Row Count in File is Equal to Row Count in Target Table"
     else:
+        import pandas as pd
         # Create a DataFrame to hold the differences
-        differences = pd.concat([df1, df2]).drop_duplicates(keep=False)
-        return differences    
\ No newline at end of file
+        differences = pd.DataFrame({'source_row_count': [df1], 'target_row_count': [target_count]})
+        return differences
+
+def build_count_query(query):
+    """
+    Build the query counting the rows of a query, so its rows are counted in the database instead of being fetched.
+
+    Args:
+        query (str): The SQL query.
+    Returns:
+        str: SELECT COUNT(*) over the query.
+    """
+    return f"SELECT COUNT(*) FROM ({query})"
+
+def count_gate(source_count, target_count, tolerance=count_gate_tolerance):
+    """
+    Decide whether a data validation is worth running, from the row counts of both sides.
+    When the counts already differ by more than the tolerance the load is rejected without
+    reading and comparing the data.
+    Args:
+        source_count (int): The row count of the source file.
+        target_count (int or str): The row count of the target, or the message of a failed count.
+        tolerance (int, optional): Row count difference still accepted, None lets every validation run.
+    Returns:
+        None if the data validation should run, otherwise the message of the failed count or a dict
+        with the reason, both row counts and the tolerance.
+    """
+    if isinstance(target_count, str):
+        return target_count
+    if tolerance is None or abs(source_count - int(target_count)) <= tolerance:
+        return None
+    print(f"Row counts differ by more than {tolerance} rows (source {source_count}, target {target_count}), data validation skipped")
+    return {'rejected': 'count_gate', 'source_row_count': source_count, 'target_row_count': int(target_count), 'tolerance': tolerance}
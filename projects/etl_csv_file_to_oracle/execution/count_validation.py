@@ -1,8 +1,16 @@
-from etl_csv_file_to_oracle.execution.core_engine import read_csv_row_count, pd_read_sql, close_ora_conn, input_file_path, count_compare_dataframes
-from etl_csv_file_to_oracle.input.count_validation_target_query import tgt_query
+from etl_csv_file_to_oracle.execution.core_engine import read_csv_row_count, close_ora_conn, input_file_path, count_compare_dataframes
+from etl_csv_file_to_oracle.execution.connection_engine import run_on_connection
+from etl_csv_file_to_oracle.execution.row_count_engine import count_table_rows
+from etl_csv_file_to_oracle.input.count_validation_target_query import tgt_table, count_accuracy
 from etl_csv_file_to_oracle.conf.db_conf import ora_engine
 
 source_df = read_csv_row_count(input_file_path)
-target_df = pd_read_sql(tgt_query, ora_engine)
-print(count_compare_dataframes(source_df, target_df))
+
+def validate():
+    target_count = count_table_rows(ora_engine, tgt_table, accuracy=count_accuracy)
+    print(f"Target row count from the {target_count['strategy']} strategy" + ('' if target_count['exact'] else ' (estimate)'))
+    print(count_compare_dataframes(source_df, target_count['row_count']))
+
+# Every read of the validation runs on one pooled connection, checked out once
+run_on_connection(ora_engine, validate)
 close_ora_conn(ora_engine)
\ No newline at end of file
@@ -1,8 +1,27 @@
-from etl_csv_file_to_oracle.execution.core_engine import read_csv_data_to_df, pd_read_sql, close_ora_conn, input_file_path, data_compare_dataframes
+from etl_csv_file_to_oracle.execution.core_engine import read_csv_data_to_df, read_csv_row_count, pd_read_sql, sql_read_scalar, close_ora_conn, input_file_path, data_compare_dataframes, data_compare_dataframes_by_key, build_count_query, count_gate
+from etl_csv_file_to_oracle.execution.connection_engine import run_on_connection
+from etl_csv_file_to_oracle.execution.difference_engine import DifferenceSink, get_difference_file
+from etl_csv_file_to_oracle.conf.input_file import key_columns, count_gate_tolerance
 from etl_csv_file_to_oracle.input.data_validation_target_query import tgt_query
 from etl_csv_file_to_oracle.conf.db_conf import ora_engine
 
-source_df = read_csv_data_to_df(input_file_path)
-target_df = pd_read_sql(tgt_query, ora_engine)
-print(data_compare_dataframes(source_df, target_df))
+def validate():
+    # When count_gate_tolerance is set, the data is only read and compared when the row counts are within it
+    rejected = None
+    if count_gate_tolerance is not None:
+        rejected = count_gate(read_csv_row_count(input_file_path), sql_read_scalar(build_count_query(tgt_query), ora_engine))
+    if rejected is not None:
+        print(rejected)
+    else:
+        source_df = read_csv_data_to_df(input_file_path)
+        target_df = pd_read_sql(tgt_query, ora_engine)
+        # Differences go to a file, only their summary and a sample are printed
+        with DifferenceSink(get_difference_file('data_validation')) as sink:
+            if key_columns:
+                print(data_compare_dataframes_by_key(source_df, target_df, key_columns, sink=sink))
+            else:
+                print(data_compare_dataframes(source_df, target_df, sink=sink))
+
+# Every read of the validation runs on one pooled connection, checked out once
+run_on_connection(ora_engine, validate)
 close_ora_conn(ora_engine)
\ No newline at end of file
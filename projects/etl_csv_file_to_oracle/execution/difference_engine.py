@@ -0,0 +1,184 @@
+import os
+from etl_csv_file_to_oracle.conf.proj_conf import get_output_path
+
+"""
+Bounded-memory reporting of the differences found by a validation.
+
+A DifferenceSink receives the differing rows batch by batch, appends them to a compressed
+Parquet or CSV file and keeps only counters (per difference category and per mismatched column)
+and a fixed size random sample of the rows (reservoir sampling) in memory. However many rows
+differ, a validation holds at most one batch of differences plus the sample, and prints a
+summary instead of the rows.
+"""
+
+def get_difference_file(name, file_format='parquet'):
+    """
+    Get the default differences file of a validation, in the output directory.
+
+    Args:
+        name (str): The validation (job) name.
+        file_format (str): 'parquet' or 'csv'.
+    Returns:
+        str: The path to the differences file.
+    """
+    extension = 'parquet' if file_format == 'parquet' else 'csv.gz'
+    return f"{get_output_path()}/{name}_differences.{extension}"
+
+class DifferenceSink:
+    """
+    Streams differing rows to a compressed file, keeping counters and a reservoir sample in memory.
+
+    Use as a context manager, or call close() once every difference is added. Nothing is written
+    when no difference is added. Every column is written as text: the same column holds values of
+    different types from one batch to the next (source_value/target_value of several columns, a
+    float column NULL in a whole batch), and the file keeps the schema of its first batch.
+
+    Args:
+        output_file (str): The differences file to create.
+        file_format (str): 'parquet' or 'csv'.
+        compression (str, optional): Parquet codec (default 'zstd') or CSV stream codec (default 'gzip').
+        batch_rows (int): Differences buffered before they are written, one Parquet row group per batch.
+        sample_size (int): Rows kept in the sample.
+        seed (int, optional): Seed of the sample, for reproducible reports.
+    """
+
+    def __init__(self, output_file, file_format='parquet', compression=None, batch_rows=100000, sample_size=20, seed=None):
+        self.output_file = output_file
+        self.file_format = file_format
+        self.compression = compression or ('zstd' if file_format == 'parquet' else 'gzip')
+        self.batch_rows = batch_rows
+        self.sample_size = sample_size
+        self.total_rows = 0
+        self.by_category = {}
+        self.by_column = {}
+        self.sample = []
+        self._seed = seed
+        self._rng = None
+        self._pending = []
+        self._pending_rows = 0
+        self._writer = None
+        self._stream = None
+        self._schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, df, category=None):
+        """
+        Add a DataFrame of differing rows, buffered and written 'batch_rows' rows at a time. Every
+        DataFrame added must have the columns (or some of the columns) of the first one written.
+
+        Args:
+            df (pd.DataFrame): The rows. A 'difference' column gives the category of every row and a
+                'column' column the mismatched column, as returned by data_compare_dataframes_by_key.
+            category (str, optional): Category of every row, stored in a 'difference' column, when df has none.
+        """
+        if df is None or len(df) == 0:
+            return
+        if category is not None:
+            df = df.assign(difference=category)
+        counts = df['difference'].value_counts() if 'difference' in df.columns else {None: len(df)}
+        for key, count in dict(counts).items():
+            self.by_category[key] = self.by_category.get(key, 0) + int(count)
+        if 'column' in df.columns and 'difference' in df.columns:
+            for key, count in df.loc[df['difference'] == 'mismatch', 'column'].value_counts().items():
+                self.by_column[key] = self.by_column.get(key, 0) + int(count)
+        self._sample(df)
+        self.total_rows += len(df)
+        # A large DataFrame is buffered in slices, so a flush never writes more than 'batch_rows' rows at once
+        for start in range(0, len(df), self.batch_rows):
+            piece = df.iloc[start:start + self.batch_rows]
+            self._pending.append(piece)
+            self._pending_rows += len(piece)
+            if self._pending_rows >= self.batch_rows:
+                self.flush()
+
+    def add_rows(self, rows, columns, category):
+        """
+        Add differing rows given as tuples, like the rows of compare_sorted_streams.
+
+        Args:
+            rows (list): Row tuples.
+            columns (list): Column names of the tuples.
+            category (str): Category of every row.
+        """
+        import pandas as pd
+        if rows:
+            self.add(pd.DataFrame(rows, columns=columns), category)
+
+    def _sample(self, df):
+        # Algorithm R over the whole stream: row n (0 based) replaces a random sample slot with probability
+        # sample_size / (n + 1). The slots of a whole batch are drawn at once, and only the few rows entering
+        # the sample are converted to dictionaries
+        import numpy as np
+        if self._rng is None:
+            self._rng = np.random.default_rng(self._seed)
+        seen = self.total_rows
+        fill = max(min(self.sample_size - len(self.sample), len(df)), 0)
+        if fill:
+            self.sample.extend(df.iloc[:fill].to_dict('records'))
+        if fill < len(df):
+            slots = np.floor(self._rng.random(len(df) - fill) * np.arange(seen + fill + 1, seen + len(df) + 1)).astype('int64')
+            for position in np.flatnonzero(slots < self.sample_size):
+                self.sample[slots[position]] = df.iloc[fill + position].to_dict()
+
+    def flush(self):
+        """
+        Write the buffered differences to the file.
+        """
+        import pandas as pd
+        import pyarrow as pa
+        if not self._pending:
+            return
+        df = pd.concat(self._pending, ignore_index=True)
+        self._pending, self._pending_rows = [], 0
+        if self._schema is None:
+            self._schema = pa.schema([(str(column), pa.string()) for column in df.columns])
+            self._open()
+        extra = set(map(str, df.columns)) - set(self._schema.names)
+        if extra:
+            raise ValueError(f"Columns {sorted(extra)} are not in the differences file {self.output_file}")
+        # Columns of the first batch missing from a later batch are written as NULL
+        df = df.rename(columns=str).reindex(columns=self._schema.names)
+        self._writer.write_table(pa.Table.from_pandas(df.astype('string'), schema=self._schema, preserve_index=False))
+
+    def _open(self):
+        import pyarrow as pa
+        import pyarrow.csv as pcsv
+        import pyarrow.parquet as pq
+        os.makedirs(os.path.dirname(self.output_file) or '.', exist_ok=True)
+        if self.file_format == 'parquet':
+            self._writer = pq.ParquetWriter(self.output_file, self._schema, compression=self.compression)
+        else:
+            self._stream = pa.CompressedOutputStream(self.output_file, self.compression)
+            self._writer = pcsv.CSVWriter(self._stream, self._schema)
+
+    def close(self):
+        """
+        Write the remaining differences and close the file.
+        """
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def summary(self):
+        """
+        Summarize the differences added so far.
+
+        Returns:
+            dict: different_rows, differences (rows per category), mismatched_columns (mismatches per column),
+            a sample of the rows and the differences file (None when there was no difference).
+        """
+        return {'different_rows': self.total_rows,
+                'differences': dict(self.by_category),
+                'mismatched_columns': dict(self.by_column),
+                'sample': [{key: (None if value is None or value != value else value if isinstance(value, (int, float, str)) else str(value))
+                            for key, value in row.items()} for row in self.sample],
+                'difference_file': self.output_file if self.total_rows else None}
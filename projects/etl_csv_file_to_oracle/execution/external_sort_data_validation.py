@@ -0,0 +1,23 @@
+from etl_csv_file_to_oracle.execution.core_engine import close_ora_conn, input_file_path, read_csv_row_count, sql_read_scalar, build_count_query, count_gate
+from etl_csv_file_to_oracle.execution.connection_engine import run_on_connection
+from etl_csv_file_to_oracle.execution.external_sort_engine import external_sort_data_validation
+from etl_csv_file_to_oracle.execution.difference_engine import DifferenceSink, get_difference_file
+from etl_csv_file_to_oracle.conf.input_file import count_gate_tolerance
+from etl_csv_file_to_oracle.input.data_validation_target_query import tgt_query
+from etl_csv_file_to_oracle.conf.db_conf import ora_engine
+
+def validate():
+    # When count_gate_tolerance is set, both sides are only sorted and compared when the row counts are within it,
+    # the comparison itself stops early on the fail_fast_* thresholds of the input file configuration
+    rejected = None
+    if count_gate_tolerance is not None:
+        rejected = count_gate(read_csv_row_count(input_file_path), sql_read_scalar(build_count_query(tgt_query), ora_engine))
+    if rejected is not None:
+        print(rejected)
+    else:
+        with DifferenceSink(get_difference_file('external_sort_data_validation')) as sink:
+            print(external_sort_data_validation(input_file_path, tgt_query, ora_engine, sink=sink))
+
+# Every read of the validation runs on one pooled connection, checked out once
+run_on_connection(ora_engine, validate)
+close_ora_conn(ora_engine)
\ No newline at end of file
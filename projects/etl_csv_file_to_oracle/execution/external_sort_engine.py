@@ -0,0 +1,335 @@
+import heapq
+import itertools
+import os
+import shutil
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from etl_csv_file_to_oracle.conf.proj_conf import timer
+from etl_csv_file_to_oracle.conf.input_file import desired_columns, fail_fast_max_mismatches, fail_fast_max_mismatch_rate, fail_fast_window_rows
+from etl_csv_file_to_oracle.execution.core_engine import pd_read_sql
+from etl_csv_file_to_oracle.execution.normalize_engine import normalize_dataframe, normalize_for_compare
+from etl_csv_file_to_oracle.execution.difference_engine import DifferenceSink, get_difference_file
+
+# Rows per record batch in the run files
+run_batch_rows = 65536
+# Rows held in memory by a whole k-way merge: every run being merged reads batches of merge_memory_rows / runs rows,
+# and more than merge_fan_in runs are first merged in to intermediate runs (multi-pass merge), so a single batch
+# never falls below merge_memory_rows / merge_fan_in rows however many runs a side has
+merge_memory_rows = 1000000
+merge_fan_in = 64
+
+def row_sort_key(row):
+    """
+    Sort key of a row tuple matching pandas sort_values(na_position='last').
+
+    NULL/NaN values sort after every other value of the column and compare equal to each other.
+
+    Args:
+        row (tuple): The column values of a row.
+    Returns:
+        tuple: A key ordering rows column by column.
+    """
+    return tuple((1, 0) if value is None or value != value else (0, value) for value in row)
+
+def write_sorted_run(df, run_file):
+    """
+    Sort a chunk on all its columns and write it to an Arrow IPC run file.
+
+    Args:
+        df (pd.DataFrame): The chunk to sort.
+        run_file (str): The path of the run file to create.
+    Returns:
+        str: The path of the run file.
+    """
+    sorted_df = df.sort_values(list(df.columns), na_position='last', kind='stable')
+    table = pa.Table.from_pandas(sorted_df, preserve_index=False)
+    with pa.OSFile(run_file, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=run_batch_rows)
+    return run_file
+
+def read_sorted_run(run_file, batch_rows=run_batch_rows):
+    """
+    Stream the rows of a run file, 'batch_rows' rows in memory at a time.
+
+    The run file is memory mapped, so only the rows of the current slice are converted to Python values.
+
+    Args:
+        run_file (str): The path of the run file.
+        batch_rows (int): Rows converted at a time.
+    Yields:
+        tuple: The column values of each row, in sorted order.
+    """
+    with pa.memory_map(run_file, 'r') as source:
+        reader = ipc.open_file(source)
+        for batch_idx in range(reader.num_record_batches):
+            batch = reader.get_batch(batch_idx)
+            for offset in range(0, batch.num_rows, batch_rows):
+                piece = batch.slice(offset, batch_rows)
+                yield from zip(*[column.to_pylist() for column in piece.columns])
+
+def write_run_rows(rows, schema, run_file):
+    """
+    Write an already sorted row stream to an Arrow IPC run file, one record batch at a time.
+
+    Args:
+        rows (iterator): Sorted row tuples.
+        schema (pa.Schema): The schema of the run file.
+        run_file (str): The path of the run file to create.
+    Returns:
+        str: The path of the run file.
+    """
+    with pa.OSFile(run_file, 'wb') as sink, ipc.new_file(sink, schema) as writer:
+        while True:
+            batch = list(itertools.islice(rows, run_batch_rows))
+            if not batch:
+                break
+            columns = zip(*batch)
+            writer.write_batch(pa.record_batch([pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+    return run_file
+
+def peek_chunk(chunks):
+    """
+    Read the first chunk of a chunked dataset without consuming it.
+
+    Args:
+        chunks (iterable): DataFrames of bounded size.
+    Returns:
+        tuple: (the first chunk or None if there is none, iterator over every chunk including the first)
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    return first, chunks if first is None else itertools.chain([first], chunks)
+
+def compare_schema(source_chunk, target_chunk):
+    """
+    Fix the dtype of every column for all the chunks of both sides, from their first chunks.
+
+    The first chunks are normalized together with normalize_for_compare, so the dtypes are
+    reconciled across the sides (integers against whole floats, NULL only columns...) as they
+    are when two whole DataFrames are compared.
+
+    Args:
+        source_chunk (pd.DataFrame or None): The first source chunk.
+        target_chunk (pd.DataFrame or None): The first target chunk.
+    Returns:
+        dict: Normalized column name -> dtype, empty if both sides are empty.
+    """
+    chunks = [chunk for chunk in (source_chunk, target_chunk) if chunk is not None]
+    if not chunks:
+        return {}
+    if len(chunks) == 1:
+        normalized = normalize_dataframe(chunks[0])
+    else:
+        normalized, _ = normalize_for_compare(source_chunk, target_chunk)
+    return {column: normalized[column].dtype for column in desired_columns}
+
+def conform_to_schema(df, schema):
+    """
+    Cast the columns of a normalized chunk to the dtypes of the schema fixed by compare_schema.
+
+    A column that cannot be cast (decimals in a column that was whole in the first chunks) is
+    kept as it is: its values are still numbers, which compare equal to the same numbers of the
+    other side when the runs are merged.
+
+    Args:
+        df (pd.DataFrame): The normalized chunk, modified in place.
+        schema (dict): Column name -> dtype.
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    for column, dtype in schema.items():
+        if df[column].dtype == dtype:
+            continue
+        try:
+            df[column] = df[column].astype(dtype)
+        except (TypeError, ValueError, OverflowError):
+            continue
+    return df
+
+def spill_sorted_runs(chunks, run_dir, run_prefix, schema=None):
+    """
+    Sort every chunk of a chunked dataset in memory and spill it to its own run file.
+
+    Chunks are normalized first (see normalize_engine) and cast to the column dtypes of 'schema',
+    so both sides sort and compare on the same representation whatever the values of each chunk.
+
+    Args:
+        chunks (iterable): DataFrames of bounded size.
+        run_dir (str): The directory the run files are written to.
+        run_prefix (str): Prefix of the run file names.
+        schema (dict, optional): Column dtypes shared by both sides, see compare_schema.
+    Returns:
+        list: The paths of the run files.
+    """
+    run_files = []
+    for run_idx, chunk in enumerate(chunks):
+        chunk = normalize_dataframe(chunk)[desired_columns]
+        if schema:
+            chunk = conform_to_schema(chunk.copy(), schema)
+        run_files.append(write_sorted_run(chunk, os.path.join(run_dir, f"{run_prefix}_{run_idx:05d}.arrow")))
+    return run_files
+
+def merge_sorted_runs(run_files, memory_rows=merge_memory_rows, fan_in=merge_fan_in):
+    """
+    K-way merge of sorted run files in to a single sorted row stream, within a memory budget.
+
+    Each run is read in batches of memory_rows / number of runs rows. With more than 'fan_in' runs,
+    groups of 'fan_in' runs are first merged in to intermediate run files next to the runs (written
+    batch by batch), until at most 'fan_in' runs are left for the final merge.
+
+    Args:
+        run_files (list): The paths of the run files.
+        memory_rows (int): Rows held in memory by the merge, over all runs.
+        fan_in (int): Runs merged at most at a time.
+    Returns:
+        iterator: Row tuples of all runs in sorted order.
+    """
+    merge_pass = 0
+    while len(run_files) > fan_in:
+        merge_pass += 1
+        merged_runs = []
+        for group_idx in range(0, len(run_files), fan_in):
+            group = run_files[group_idx:group_idx + fan_in]
+            schemas = []
+            for run_file in group:
+                with pa.memory_map(run_file, 'r') as source:
+                    schemas.append(ipc.open_file(source).schema)
+            # Chunks of one side may type a column differently (e.g. all NULL in one chunk), the permissive unified schema holds them all
+            schema = pa.unify_schemas(schemas, promote_options='permissive')
+            root, _ = os.path.splitext(group[0])
+            merged_runs.append(write_run_rows(_merge_runs(group, memory_rows), schema, f"{root}_pass{merge_pass}.arrow"))
+            for run_file in group:
+                os.remove(run_file)
+        run_files = merged_runs
+    return _merge_runs(run_files, memory_rows)
+
+def _merge_runs(run_files, memory_rows):
+    batch_rows = max(memory_rows // max(len(run_files), 1), 1)
+    return heapq.merge(*[read_sorted_run(run_file, batch_rows) for run_file in run_files], key=row_sort_key)
+
+def compare_sorted_streams(source_rows, target_rows, sink=None, columns=None, max_mismatches=None, max_mismatch_rate=None,
+                           window_rows=None):
+    """
+    Compare two sorted row streams in a single sequential pass.
+
+    Identical rows are matched one to one, so duplicates only match as many times as they
+    occur on both sides.
+
+    In fail-fast mode the comparison stops as soon as 'max_mismatches' rows are unmatched, or
+    when more than 'max_mismatch_rate' of the first 'window_rows' rows compared are unmatched
+    (a swapped column, a wrong file), instead of going through every row of a load already known to be bad.
+
+    Args:
+        source_rows (iterator): Sorted source row tuples.
+        target_rows (iterator): Sorted target row tuples.
+        sink (DifferenceSink, optional): Stream the unmatched rows to the sink (categories source_only and
+            target_only) in batches. Without a sink every unmatched row is kept in memory, so only leave it
+            out for small inputs.
+        columns (list, optional): Column names of the rows, needed with a sink.
+        max_mismatches (int, optional): Stop once this many rows are unmatched.
+        max_mismatch_rate (float, optional): Stop when the unmatched share of the first 'window_rows' rows is above it.
+        window_rows (int, optional): Rows (matched pairs and unmatched rows) the mismatch rate is measured on.
+    Returns:
+        tuple: (number of matched rows, list of source only rows, list of target only rows, reason the comparison
+        stopped early or None), with a sink the numbers of source only and target only rows instead of the lists
+    """
+    matched, source_only, target_only = 0, [], []
+    source_count, target_count = 0, 0
+    unmatched, stop_reason = 0, None
+    check_rate = max_mismatch_rate is not None and bool(window_rows)
+    end = object()
+    source_row, target_row = next(source_rows, end), next(target_rows, end)
+    while source_row is not end or target_row is not end:
+        if target_row is end or (source_row is not end and row_sort_key(source_row) < row_sort_key(target_row)):
+            source_only.append(source_row)
+            source_row = next(source_rows, end)
+            unmatched += 1
+        elif source_row is end or row_sort_key(target_row) < row_sort_key(source_row):
+            target_only.append(target_row)
+            target_row = next(target_rows, end)
+            unmatched += 1
+        else:
+            matched += 1
+            source_row, target_row = next(source_rows, end), next(target_rows, end)
+        if sink is not None and len(source_only) + len(target_only) >= sink.batch_rows:
+            source_count, target_count = source_count + len(source_only), target_count + len(target_only)
+            _spill_unmatched(sink, columns, source_only, target_only)
+        if max_mismatches is not None and unmatched >= max_mismatches:
+            stop_reason = f"{unmatched} unmatched rows reached the limit of {max_mismatches}"
+            break
+        # The rate is checked once, when the window is complete
+        if check_rate and matched + unmatched == window_rows:
+            check_rate = False
+            if unmatched / window_rows > max_mismatch_rate:
+                stop_reason = f"{unmatched / window_rows:.1%} of the first {window_rows} rows unmatched, above {max_mismatch_rate:.1%}"
+                break
+    if sink is None:
+        return matched, source_only, target_only, stop_reason
+    source_count, target_count = source_count + len(source_only), target_count + len(target_only)
+    _spill_unmatched(sink, columns, source_only, target_only)
+    return matched, source_count, target_count, stop_reason
+
+def _spill_unmatched(sink, columns, source_only, target_only):
+    sink.add_rows(source_only, columns, 'source_only')
+    sink.add_rows(target_only, columns, 'target_only')
+    source_only.clear()
+    target_only.clear()
+
+@timer
+def external_sort_data_validation(file_path, tgt_query, ora_engine, chunk_rows=1000000, spill_dir=None, sink=None,
+                                  max_mismatches=fail_fast_max_mismatches, max_mismatch_rate=fail_fast_max_mismatch_rate,
+                                  window_rows=fail_fast_window_rows, memory_rows=merge_memory_rows):
+    """
+    Order-insensitive comparison of a CSV file and a query result larger than memory.
+
+    Both sides are read in chunks of 'chunk_rows', each chunk is normalized to column dtypes fixed
+    for both sides from their first chunks (see compare_schema), sorted and spilled to a run
+    file on local disk, and the runs of each side are k-way merged and compared in lockstep.
+    The merge of each side holds at most 'memory_rows' rows (see merge_sorted_runs) and the
+    differing rows are streamed to a DifferenceSink, so memory stays bounded however large the
+    data, the number of runs or the number of differences, and all disk I/O is sequential.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        tgt_query (str): The SQL query returning the target rows.
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        chunk_rows (int): Rows sorted in memory per run file.
+        spill_dir (str, optional): Directory the temporary run files are created in, defaults to the system temp directory.
+        sink (DifferenceSink, optional): The sink the differing rows are streamed to, defaults to one writing
+            the default differences file of 'external_sort_data_validation'.
+        max_mismatches (int, optional): Fail fast once this many rows are unmatched, see compare_sorted_streams.
+        max_mismatch_rate (float, optional): Fail fast when the unmatched share of the first 'window_rows' rows is above it.
+        window_rows (int, optional): Rows the mismatch rate is measured on.
+        memory_rows (int): Rows held in memory by the merge of each side.
+    Returns:
+        str or dict: Confirmation message if identical, otherwise the summary of the sink, the number of
+        matched rows and why the comparison stopped early (if it did).
+    """
+    target_chunks = pd_read_sql(tgt_query, ora_engine, chunksize=chunk_rows)
+    if isinstance(target_chunks, str):
+        return target_chunks
+    own_sink = sink is None
+    if own_sink:
+        sink = DifferenceSink(get_difference_file('external_sort_data_validation'))
+    run_dir = tempfile.mkdtemp(prefix='external_sort_', dir=spill_dir)
+    try:
+        source_chunk, source_chunks = peek_chunk(pd.read_csv(file_path, usecols=desired_columns, chunksize=chunk_rows))
+        target_chunk, target_chunks = peek_chunk(target_chunks)
+        schema = compare_schema(source_chunk, target_chunk)
+        source_runs = spill_sorted_runs(source_chunks, run_dir, 'source', schema)
+        target_runs = spill_sorted_runs(target_chunks, run_dir, 'target', schema)
+        matched, source_only, target_only, stop_reason = compare_sorted_streams(merge_sorted_runs(source_runs, memory_rows),
+                                                                                merge_sorted_runs(target_runs, memory_rows),
+                                                                                sink, desired_columns, max_mismatches, max_mismatch_rate, window_rows)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+        if own_sink:
+            sink.close()
+    print(f"Matched rows: {matched}")
+    if stop_reason:
+        print(f"Comparison stopped early: {stop_reason}")
+    if not source_only and not target_only:
+        return "Src File and Target Table are identical"
+    return dict(sink.summary(), matched_rows=matched, stopped_early=stop_reason)
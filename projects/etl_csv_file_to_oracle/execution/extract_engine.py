@@ -0,0 +1,245 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from etl_csv_file_to_oracle.conf.proj_conf import timer
+
+"""
+Parallel extraction of an Oracle table or query over several pooled connections.
+
+The rows are split in to N partitions, either hash buckets of a key expression
+(ORA_HASH(key, N - 1), works for any query) or ROWID ranges of a table (N ranges of about the
+same number of blocks, derived from the extents of the table like DBMS_PARALLEL_EXECUTE
+chunks, without reading the table or needing the privileges of DBMS_PARALLEL_EXECUTE). Every partition is fetched by its
+own session, up to 'workers' at a time, so extraction throughput grows with the number of
+connections instead of being capped by a single cursor. The partitions of a table are all read
+as of one SCN (flashback query), so together they are a consistent snapshot of the table.
+"""
+
+def is_table_name(source):
+    """
+    Tell a table name ('table' or 'owner.table') from a query.
+    """
+    return ' ' not in source.strip()
+
+def build_hash_partition_query(query, key_expression, partitions, as_of_scn=False):
+    """
+    Build the query of one hash bucket of a query, the bucket number bound as :bucket.
+
+    Args:
+        query (str): The query, or a table name.
+        key_expression (str): Column(s) the rows are bucketed on, like 'pickup_location || pick_up_time'.
+        partitions (int): Number of buckets.
+        as_of_scn (bool): Read a table as of the SCN bound as :scn (a query is read as it is).
+    Returns:
+        str: The query returning the rows of bucket :bucket (0 to partitions - 1).
+    """
+    if not is_table_name(query):
+        source = f"({query})"
+    else:
+        source = f"{query} AS OF SCN :scn" if as_of_scn else query
+    return f"SELECT * FROM {source} src WHERE ORA_HASH({key_expression}, {partitions - 1}) = :bucket"
+
+def build_rowid_ranges_query(partitions):
+    """
+    Build the query splitting a table in to ROWID ranges of about the same number of blocks.
+
+    Only the extents of the table are read (no table data, no sort of its ROWIDs). The extents,
+    in ROWID order, are grouped in to 'partitions' runs of about the same number of blocks, and
+    every run becomes the range from the first row of its first block to the last row of its
+    last block (DBMS_ROWID.ROWID_CREATE). DBA_EXTENTS needs SELECT_CATALOG_ROLE, see
+    build_rowid_ranges_scan_query otherwise.
+
+    Args:
+        partitions (int): Number of ranges.
+    Returns:
+        str: The query returning (low_rid, high_rid) of every range as ROWID text, the table bound as :owner and :table_name.
+    """
+    return ("SELECT ROWIDTOCHAR(MIN(low_rid)) AS low_rid, ROWIDTOCHAR(MAX(high_rid)) AS high_rid FROM "
+            "(SELECT DBMS_ROWID.ROWID_CREATE(1, o.data_object_id, e.relative_fno, e.block_id, 0) AS low_rid, "
+            "DBMS_ROWID.ROWID_CREATE(1, o.data_object_id, e.relative_fno, e.block_id + e.blocks - 1, 32767) AS high_rid, "
+            f"TRUNC((SUM(e.blocks) OVER (ORDER BY o.data_object_id, e.relative_fno, e.block_id) - e.blocks) * {partitions} "
+            "/ SUM(e.blocks) OVER ()) AS chunk "
+            "FROM dba_extents e JOIN all_objects o ON o.owner = e.owner AND o.object_name = e.segment_name "
+            "AND NVL(o.subobject_name, '-') = NVL(e.partition_name, '-') "
+            "WHERE e.owner = NVL(:owner, USER) AND e.segment_name = :table_name "
+            "AND e.segment_type LIKE 'TABLE%' AND o.object_type LIKE 'TABLE%') "
+            "GROUP BY chunk ORDER BY chunk")
+
+def build_rowid_ranges_scan_query(table, partitions, as_of_scn=False):
+    """
+    Build the query splitting a table in to ROWID ranges of about the same number of rows, by sorting its ROWIDs.
+
+    A full scan of the table (ROWIDs only) plus a sort, used when DBA_EXTENTS cannot be read.
+
+    Args:
+        table (str): The table name.
+        partitions (int): Number of ranges.
+        as_of_scn (bool): Read the table as of the SCN bound as :scn.
+    Returns:
+        str: The query returning (low_rid, high_rid) of every range, as ROWID text.
+    """
+    source = f"{table} AS OF SCN :scn" if as_of_scn else table
+    return (f"SELECT ROWIDTOCHAR(MIN(rid)) AS low_rid, ROWIDTOCHAR(MAX(rid)) AS high_rid FROM "
+            f"(SELECT ROWID AS rid, NTILE({partitions}) OVER (ORDER BY ROWID) AS tile FROM {source}) GROUP BY tile ORDER BY tile")
+
+def build_rowid_partition_query(table, columns='*', as_of_scn=False):
+    """
+    Build the query of one ROWID range of a table, bounds bound as :low_rid and :high_rid.
+
+    Args:
+        table (str): The table name.
+        columns (str): The select list.
+        as_of_scn (bool): Read the table as of the SCN bound as :scn.
+    Returns:
+        str: The query returning the rows of the range.
+    """
+    source = f"{table} AS OF SCN :scn" if as_of_scn else table
+    return f"SELECT {columns} FROM {source} WHERE ROWID BETWEEN CHARTOROWID(:low_rid) AND CHARTOROWID(:high_rid)"
+
+def read_current_scn(connection):
+    """
+    Read the current SCN, the point in time every partition of a table is read as of.
+
+    Args:
+        connection: The SQLAlchemy connection.
+    Returns:
+        int or None: The SCN, or None if it could not be read (DBMS_FLASHBACK not granted).
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+    try:
+        return connection.execute(text("SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER FROM dual")).scalar()
+    except DBAPIError as e:
+        print(f"Unable to read the current SCN, partitions are not read as of one point in time: {e}")
+        return None
+
+def plan_partitions(ora_engine, source, partitions, key_expression=None, columns='*'):
+    """
+    Split a table or query in to partition queries.
+
+    The SCN is read before the extents, so every row of the table as of that SCN lies in one of the ranges.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        source (str): A table name, or a query when bucketing on key_expression.
+        partitions (int): Number of partitions.
+        key_expression (str, optional): Hash the rows on this expression; without it 'source' must be a table, split by ROWID.
+        columns (str): Select list of ROWID partitions.
+    Returns:
+        list: (query, bind parameters) of every partition.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+    from etl_csv_file_to_oracle.execution.connection_engine import ora_connection
+    from etl_csv_file_to_oracle.execution.row_count_engine import split_table_name
+    if key_expression and not is_table_name(source):
+        query = build_hash_partition_query(source, key_expression, partitions)
+        return [(query, {'bucket': bucket}) for bucket in range(partitions)]
+    with ora_connection(ora_engine) as connection:
+        scn = read_current_scn(connection)
+        pinned = {} if scn is None else {'scn': scn}
+        if key_expression:
+            query = build_hash_partition_query(source, key_expression, partitions, as_of_scn=scn is not None)
+            return [(query, {'bucket': bucket, **pinned}) for bucket in range(partitions)]
+        owner, table_name = split_table_name(source)
+        try:
+            ranges = connection.execute(text(build_rowid_ranges_query(partitions)),
+                                        {'owner': owner, 'table_name': table_name}).fetchall()
+        except DBAPIError as e:
+            print(f"Unable to read the extents of {source}, its ROWID ranges are planned by scanning it: {e}")
+            ranges = connection.execute(text(build_rowid_ranges_scan_query(source, partitions, as_of_scn=scn is not None)),
+                                        pinned).fetchall()
+    query = build_rowid_partition_query(source, columns, as_of_scn=scn is not None)
+    return [(query, {'low_rid': low_rid, 'high_rid': high_rid, **pinned}) for low_rid, high_rid in ranges]
+
+def fetch_partition_table(ora_engine, query, params, batch_rows=50000):
+    """
+    Fetch one partition on its own pooled connection in to an Arrow table.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        query (str): The partition query.
+        params (dict): Its bind parameters.
+        batch_rows (int): Rows fetched per round trip and per Arrow record batch.
+    Returns:
+        pa.Table: The rows of the partition, lowercase column names.
+    """
+    import pyarrow as pa
+    from sqlalchemy import text
+    tables = []
+    with ora_engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, max_row_buffer=batch_rows).execute(text(query), params)
+        columns = [column.lower() for column in result.keys()]
+        for rows in result.partitions(batch_rows):
+            tables.append(pa.table(dict(zip(columns, (pa.array(values) for values in zip(*rows))))))
+    if not tables:
+        return pa.table({column: pa.array([], pa.null()) for column in columns})
+    # A column NULL in a whole batch is typed null there, promotion gives every batch the same schema
+    return pa.concat_tables(tables, promote_options='permissive')
+
+def _extract(partition_queries, workers, handle_partition):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda job: handle_partition(*job), enumerate(partition_queries)))
+
+@timer
+def parallel_extract_to_arrow(ora_engine, source, partitions=8, workers=4, key_expression=None, columns='*', batch_rows=50000):
+    """
+    Extract a table or query in parallel in to a single Arrow table.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object, its pool should hold at least 'workers' connections.
+        source (str): A table name, or a query when key_expression is given.
+        partitions (int): Number of partitions the rows are split in to.
+        workers (int): Number of partitions fetched concurrently.
+        key_expression (str, optional): Hash bucket the rows on this expression instead of splitting a table by ROWID.
+        columns (str): Select list of ROWID partitions.
+        batch_rows (int): Rows fetched per round trip.
+    Returns:
+        pa.Table: All the rows, in no particular order.
+    """
+    import pyarrow as pa
+    partition_queries = plan_partitions(ora_engine, source, partitions, key_expression, columns)
+    tables = _extract(partition_queries, workers,
+                      lambda idx, partition: fetch_partition_table(ora_engine, *partition, batch_rows=batch_rows))
+    return pa.concat_tables(tables, promote_options='permissive')
+
+@timer
+def parallel_extract_to_parquet(ora_engine, source, output_dir, partitions=8, workers=4, key_expression=None, columns='*',
+                                batch_rows=50000, compression='snappy'):
+    """
+    Extract a table or query in parallel in to one Parquet file per partition.
+
+    Files are written as <output_dir>/partition=<n>/part-00000.parquet, a dataset that
+    pd.read_parquet(output_dir) or pyarrow.dataset read back as a whole. Every worker holds one
+    partition in memory at a time, so choose 'partitions' for the partitions to fit in memory.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object, its pool should hold at least 'workers' connections.
+        source (str): A table name, or a query when key_expression is given.
+        output_dir (str): The directory the dataset is written to.
+        partitions (int): Number of partitions (and files).
+        workers (int): Number of partitions fetched concurrently.
+        key_expression (str, optional): Hash bucket the rows on this expression instead of splitting a table by ROWID.
+        columns (str): Select list of ROWID partitions.
+        batch_rows (int): Rows fetched per round trip and per Parquet row group.
+        compression (str): Parquet codec.
+    Returns:
+        dict: Files written, rows per partition, total rows and seconds.
+    """
+    import pyarrow.parquet as pq
+    start = time()
+    partition_queries = plan_partitions(ora_engine, source, partitions, key_expression, columns)
+
+    def write_partition(idx, partition):
+        table = fetch_partition_table(ora_engine, *partition, batch_rows=batch_rows)
+        partition_dir = os.path.join(output_dir, f"partition={idx}")
+        os.makedirs(partition_dir, exist_ok=True)
+        file_path = os.path.join(partition_dir, 'part-00000.parquet').replace('\\', '/')
+        pq.write_table(table, file_path, row_group_size=batch_rows, compression=compression)
+        return file_path, table.num_rows
+
+    written = _extract(partition_queries, workers, write_partition)
+    return {'files': [file_path for file_path, _ in written],
+            'partition_rows': [rows for _, rows in written],
+            'rows': sum(rows for _, rows in written),
+            'seconds': time() - start}
@@ -0,0 +1,302 @@
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+import pandas as pd
+from etl_csv_file_to_oracle.conf.proj_conf import get_output_path
+from etl_csv_file_to_oracle.conf.input_file import desired_columns
+from etl_csv_file_to_oracle.execution.core_engine import pd_read_sql, data_compare_dataframes
+from etl_csv_file_to_oracle.execution.normalize_engine import normalize_dataframe
+
+# Number of bytes just before the saved file offset used to detect a rewritten (not appended) source file
+tail_checksum_bytes = 65536
+
+def get_watermark_file(file_path):
+    """
+    Retrieve the path of the watermark state file kept for a source file.
+
+    Args:
+        file_path (str): The path to the source CSV file being validated.
+    Returns:
+        str: The absolute path to the watermark JSON file in the project's output directory.
+    """
+    return f"{get_output_path()}/{os.path.basename(file_path)}.watermark.json"
+
+def new_watermark():
+    """
+    Create an empty watermark, meaning nothing has been validated yet.
+
+    Returns:
+        dict: Watermark with a zero file offset, no target high-water value and no partitions.
+    """
+    return {'file_offset': 0, 'file_rows': 0, 'file_tail_checksum': None, 'target_high_water': None, 'partitions': []}
+
+def load_watermark(watermark_file):
+    """
+    Load the watermark persisted by a previous incremental run.
+
+    Args:
+        watermark_file (str): The path to the watermark JSON file.
+    Returns:
+        dict: The saved watermark, or an empty watermark if the file does not exist yet.
+    """
+    if not os.path.exists(watermark_file):
+        return new_watermark()
+    with open(watermark_file, 'r') as state:
+        return json.load(state)
+
+def save_watermark(watermark_file, watermark):
+    """
+    Persist the watermark atomically so an interrupted run never leaves a half written state file.
+
+    Args:
+        watermark_file (str): The path to the watermark JSON file.
+        watermark (dict): The watermark to persist.
+    """
+    os.makedirs(os.path.dirname(watermark_file), exist_ok=True)
+    tmp_file = f"{watermark_file}.tmp"
+    with open(tmp_file, 'w') as state:
+        json.dump(watermark, state, indent=2, default=str)
+    os.replace(tmp_file, watermark_file)
+
+def file_tail_checksum(file_path, file_offset):
+    """
+    Compute a checksum of the bytes just before the given offset of a file.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        file_offset (int): The byte offset validated so far.
+    Returns:
+        int: CRC32 of up to 'tail_checksum_bytes' bytes preceding the offset.
+    """
+    start = max(file_offset - tail_checksum_bytes, 0)
+    with open(file_path, 'rb') as src:
+        src.seek(start)
+        return zlib.crc32(src.read(file_offset - start))
+
+def source_prefix_unchanged(file_path, watermark):
+    """
+    Check that the already validated part of the source file is still the one we validated.
+
+    An append-only feed only ever grows, so a file shorter than the saved offset or with
+    different bytes before the offset has been replaced and must be validated in full again.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        watermark (dict): The watermark loaded from the previous run.
+    Returns:
+        bool: True if the validated prefix is unchanged, False otherwise.
+    """
+    if watermark['file_offset'] == 0:
+        return True
+    if os.path.getsize(file_path) < watermark['file_offset']:
+        return False
+    return file_tail_checksum(file_path, watermark['file_offset']) == watermark['file_tail_checksum']
+
+def read_csv_range_to_df(file_path, start_offset, end_offset):
+    """
+    Reads the rows of a CSV file between two byte offsets, both at the start of a line.
+
+    Args:
+        file_path (str): The path to the CSV file to be read.
+        start_offset (int): Byte offset of the first row (0 for the first row after the header).
+        end_offset (int): Byte offset after the last row.
+    Returns:
+        pd.DataFrame: The rows of the range.
+    """
+    with open(file_path, 'rb') as src:
+        header = src.readline()
+        start = max(start_offset, src.tell())
+        src.seek(start)
+        rows = src.read(max(end_offset - start, 0))
+    return pd.read_csv(io.BytesIO(header + rows), usecols=desired_columns)
+
+def read_csv_delta_to_df(file_path, file_offset):
+    """
+    Reads only the rows appended to a CSV file after the given byte offset.
+
+    A trailing line without a newline is still being written by the feed, so it is left
+    for the next run and the returned offset always points at the start of a full line.
+
+    Args:
+        file_path (str): The path to the CSV file to be read.
+        file_offset (int): Byte offset up to which the file has already been validated.
+    Returns:
+        tuple: (pd.DataFrame with the new rows, int byte offset after the last complete row read)
+    """
+    with open(file_path, 'rb') as src:
+        header = src.readline()
+        start = max(file_offset, src.tell())
+        src.seek(start)
+        delta = src.read()
+    complete = delta.rfind(b'\n') + 1
+    delta_df = pd.read_csv(io.BytesIO(header + delta[:complete]), usecols=desired_columns)
+    return delta_df, start + complete
+
+def build_target_delta_query(tgt_table, watermark_column, high_water):
+    """
+    Build the query returning only the target rows loaded after the saved high-water value.
+
+    Args:
+        tgt_table (str): The target table name.
+        watermark_column (str): Monotonically increasing column on the target table.
+        high_water: Highest watermark column value validated so far, or None on the first run.
+    Returns:
+        str: SQL query selecting the watermark column and the validated columns, bound with :high_water.
+    """
+    query = f"SELECT {watermark_column}, {', '.join(desired_columns)} FROM {tgt_table}"
+    if high_water is not None:
+        query += f" WHERE {watermark_column} > :high_water"
+    return query
+
+def df_fingerprint(df):
+    """
+    Compute an order-insensitive fingerprint of the validated columns of a DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to fingerprint.
+    Returns:
+        int: Sum (modulo 2**64) of the per-row hashes.
+    """
+    return int(pd.util.hash_pandas_object(df[desired_columns], index=False).sum())
+
+def _canonical_text(series):
+    """
+    Text of the values of a normalized column, the same whatever its dtype: whole floats are written
+    like integers, so an Int64 column and a float64 column of the same numbers give the same text.
+    """
+    if pd.api.types.is_float_dtype(series):
+        whole = series.notna() & (series % 1 == 0) & (series.abs() < 2 ** 63)
+        text = series.astype(object).map(repr)
+        text[whole] = series[whole].astype('int64').astype(str)
+    else:
+        text = series.astype(object).map(str)
+    return text.where(series.notna(), None)
+
+def normalized_fingerprint(df):
+    """
+    Compute an order-insensitive fingerprint of the normalized validated columns of a DataFrame.
+
+    The columns are normalized (see normalize_engine) and hashed as canonical text, so the rows of the
+    source file and the same rows read from Oracle get the same fingerprint, and so does a range of the
+    source file read again on a later run.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to fingerprint.
+    Returns:
+        int: Sum (modulo 2**64) of the per-row hashes.
+    """
+    normalized = normalize_dataframe(df[desired_columns])
+    canonical = pd.DataFrame({column: _canonical_text(normalized[column]) for column in normalized.columns})
+    return int(pd.util.hash_pandas_object(canonical, index=False).sum())
+
+def reusable_watermark(file_path, watermark):
+    """
+    Build the watermark of a rewritten source file from the partitions it still holds unchanged.
+
+    The leading partitions are read again over their recorded byte ranges and kept as long as their
+    row count and fingerprint still match, so only the data from the first changed partition on is
+    validated again. The target high-water value goes back to the one recorded with the last kept partition.
+
+    Args:
+        file_path (str): The path to the rewritten source CSV file.
+        watermark (dict): The watermark loaded from the previous run.
+    Returns:
+        dict: Watermark covering the unchanged leading partitions, an empty watermark if there are none.
+    """
+    kept = new_watermark()
+    file_size = os.path.getsize(file_path)
+    for partition in watermark['partitions']:
+        # Partitions recorded before the target high-water value was kept with them cannot be reused
+        if ('target_high_water' not in partition or partition['file_offset_start'] != kept['file_offset']
+                or partition['file_offset_end'] > file_size):
+            break
+        source_df = read_csv_range_to_df(file_path, partition['file_offset_start'], partition['file_offset_end'])
+        if len(source_df) != partition['source_rows'] or normalized_fingerprint(source_df) != partition['source_fingerprint']:
+            break
+        kept['partitions'].append(partition)
+        kept['file_offset'] = partition['file_offset_end']
+        kept['file_rows'] += partition['source_rows']
+        kept['target_high_water'] = partition['target_high_water']
+    if kept['file_offset']:
+        kept['file_tail_checksum'] = file_tail_checksum(file_path, kept['file_offset'])
+    return kept
+
+def _high_water_to_json(value):
+    """
+    Convert a watermark column value fetched from Oracle to a JSON serializable value.
+    """
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return {'type': 'timestamp', 'value': value.isoformat()}
+    if hasattr(value, 'item'):
+        value = value.item()
+    return {'type': 'value', 'value': value}
+
+def _high_water_from_json(high_water):
+    """
+    Convert a saved watermark back to the value bound in the target delta query.
+    """
+    if high_water is None:
+        return None
+    if high_water['type'] == 'timestamp':
+        return pd.Timestamp(high_water['value']).to_pydatetime()
+    return high_water['value']
+
+def incremental_data_validation(file_path, tgt_table, watermark_column, ora_engine, watermark_file=None):
+    """
+    Validates only the rows appended to the source file and loaded to the target since the last run.
+
+    The watermark (source byte offset and row count, target high-water value) is advanced only when
+    the delta matched, and the normalized fingerprints of each validated delta are recorded as a partition,
+    so previously validated data is never read or compared again. A delta with differences leaves the
+    watermark where it was, so the next run compares that range again (with whatever was appended since).
+    When the source file was rewritten, the partitions it still holds unchanged are kept (see
+    reusable_watermark) and only the rest of the file is validated again.
+
+    Args:
+        file_path (str): The path to the append-only source CSV file.
+        tgt_table (str): The target table name.
+        watermark_column (str): Monotonically increasing column on the target table.
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        watermark_file (str, optional): The watermark state file, defaults to one per source file in the output directory.
+    Returns:
+        str or pd.DataFrame: Result of data_compare_dataframes for the delta.
+    """
+    watermark_file = watermark_file or get_watermark_file(file_path)
+    watermark = load_watermark(watermark_file)
+    if not source_prefix_unchanged(file_path, watermark):
+        watermark = reusable_watermark(file_path, watermark)
+        print(f"Source file was rewritten since the last run, {len(watermark['partitions'])} unchanged partitions kept, "
+              f"validating it again from byte {watermark['file_offset']}.")
+    high_water = _high_water_from_json(watermark['target_high_water'])
+    source_df, file_offset = read_csv_delta_to_df(file_path, watermark['file_offset'])
+    target_query = build_target_delta_query(tgt_table, watermark_column, high_water)
+    target_df = pd_read_sql(target_query, ora_engine, params=None if high_water is None else {'high_water': high_water})
+    if isinstance(target_df, str):
+        return target_df
+    target_df.columns = [column.lower() for column in target_df.columns]
+    target_high_water = None if target_df.empty else _high_water_to_json(target_df[watermark_column.lower()].max())
+    target_df = target_df[desired_columns]
+    result = data_compare_dataframes(source_df, target_df)
+    if source_df.empty and target_df.empty:
+        return result
+    if not isinstance(result, str):
+        print("Differences found, the watermark is not advanced so this range is validated again on the next run.")
+        return result
+    if target_high_water is not None:
+        watermark['target_high_water'] = target_high_water
+    watermark['partitions'].append({'validated_at': datetime.now().isoformat(timespec='seconds'),
+                                    'file_offset_start': watermark['file_offset'],
+                                    'file_offset_end': file_offset,
+                                    'source_rows': len(source_df),
+                                    'target_rows': len(target_df),
+                                    'source_fingerprint': normalized_fingerprint(source_df),
+                                    'target_fingerprint': normalized_fingerprint(target_df),
+                                    'target_high_water': watermark['target_high_water'],
+                                    'matched': True})
+    watermark['file_offset'] = file_offset
+    watermark['file_rows'] += len(source_df)
+    watermark['file_tail_checksum'] = file_tail_checksum(file_path, file_offset)
+    save_watermark(watermark_file, watermark)
+    return result
@@ -0,0 +1,10 @@
+from etl_csv_file_to_oracle.execution.core_engine import close_ora_conn, input_file_path
+from etl_csv_file_to_oracle.execution.load_engine import ensure_load_tables, upsert_csv_file
+from etl_csv_file_to_oracle.execution.checkpoint_engine import get_checkpoint_file
+from etl_csv_file_to_oracle.input.load_target_table import tgt_table, stg_table, load_key_columns, load_control_table, load_chunk_rows, stg_table_ddl, load_control_table_ddl
+from etl_csv_file_to_oracle.conf.db_conf import ora_engine
+
+# The staging and control tables are created by the first load of a schema
+ensure_load_tables(ora_engine, {stg_table: stg_table_ddl, load_control_table: load_control_table_ddl})
+print(upsert_csv_file(input_file_path, ora_engine, tgt_table, stg_table, load_key_columns, load_control_table, load_chunk_rows, get_checkpoint_file()))
+close_ora_conn(ora_engine)
\ No newline at end of file
@@ -0,0 +1,227 @@
+import os
+from etl_csv_file_to_oracle.conf.proj_conf import timer
+from etl_csv_file_to_oracle.execution.checkpoint_engine import file_signature, load_checkpoints, save_checkpoint, read_csv_chunks_from_offset
+
+"""
+Idempotent, chunked upsert of a CSV file in to an Oracle table.
+
+Every chunk of the file is array-inserted in to a staging table and merged in to the target
+with a single set-based MERGE on the key columns, and a row recording the chunk (its position
+in the file and a fingerprint of its content) is written to a control table in the same
+transaction. A rerun skips the chunks whose row is already there, so it only touches what a
+failed run did not commit, and a chunk whose content changed since is merged again.
+"""
+
+def build_staging_insert(stg_table, columns):
+    """
+    Build the INSERT statement of the staging table, with a named bind per column.
+
+    Args:
+        stg_table (str): The staging table name.
+        columns (list): The loaded column names.
+    Returns:
+        str: The INSERT statement.
+    """
+    return f"INSERT INTO {stg_table} ({', '.join(columns)}) VALUES ({', '.join(f':{column}' for column in columns)})"
+
+def build_merge_statement(tgt_table, stg_table, columns, key_columns):
+    """
+    Build the MERGE of the staging table in to the target table.
+
+    Rows matching on every key column are updated (when a non-key column changed), the others inserted.
+
+    Args:
+        tgt_table (str): The target table name.
+        stg_table (str): The staging table name.
+        columns (list): The loaded column names.
+        key_columns (list): The columns uniquely identifying a row.
+    Returns:
+        str: The MERGE statement.
+    """
+    value_columns = [column for column in columns if column not in key_columns]
+    merge_query = (f"MERGE INTO {tgt_table} tgt USING {stg_table} stg ON ("
+                   + ' AND '.join(f"tgt.{column} = stg.{column}" for column in key_columns) + ")")
+    if value_columns:
+        merge_query += (" WHEN MATCHED THEN UPDATE SET " + ', '.join(f"tgt.{column} = stg.{column}" for column in value_columns)
+                        + " WHERE " + ' OR '.join(f"DECODE(tgt.{column}, stg.{column}, 0, 1) = 1" for column in value_columns))
+    merge_query += (f" WHEN NOT MATCHED THEN INSERT ({', '.join(columns)})"
+                    f" VALUES ({', '.join(f'stg.{column}' for column in columns)})")
+    return merge_query
+
+def chunk_fingerprint(df):
+    """
+    Fingerprint of the content of a chunk, a changed chunk gets a new fingerprint and is merged again.
+
+    Args:
+        df (pd.DataFrame): The chunk.
+    Returns:
+        str: The fingerprint, as text so it fits the control table whatever the database's integer range.
+    """
+    from etl_csv_file_to_oracle.execution.incremental_engine import df_fingerprint
+    return str(df_fingerprint(df))
+
+def chunk_bind_rows(df):
+    """
+    Rows of a chunk as dictionaries of bind values, NaN becoming NULL.
+
+    Args:
+        df (pd.DataFrame): The chunk.
+    Returns:
+        list: One dictionary per row.
+    """
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def ensure_load_tables(ora_engine, table_ddls):
+    """
+    Create the staging and control tables of the load on first use, when they do not exist yet.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        table_ddls (dict): CREATE statement of every table, by table name (see input/load_target_table.py).
+    Returns:
+        list: The tables created.
+    """
+    from sqlalchemy import text
+    created = []
+    with ora_engine.begin() as connection:
+        for table, ddl in table_ddls.items():
+            exists = connection.execute(text("SELECT COUNT(*) FROM user_tables WHERE table_name = UPPER(:table_name)"),
+                                        {'table_name': table}).scalar()
+            if not exists:
+                connection.execute(text(ddl))
+                created.append(table)
+                print(f"Created table {table}")
+    return created
+
+def load_error_message(error, table):
+    """
+    Message of an error raised by the database while reading or writing a load table, naming its real cause.
+
+    Args:
+        error (sqlalchemy.exc.DBAPIError): The error.
+        table (str): The table being read or written.
+    Returns:
+        str: The message.
+    """
+    from sqlalchemy.exc import OperationalError
+    if 'ORA-00942' in str(error.orig):
+        return f"Table {table} does not exist, create it with ensure_load_tables (see execution/load_csv_file_upsert.py)"
+    if error.connection_invalidated or isinstance(error, OperationalError):
+        return "Unable to read data from Oracle database due to connection issues."
+    return f"Unable to use table {table}: {error.orig}"
+
+def load_done_chunks(ora_engine, control_table, tgt_table, source_file):
+    """
+    Read the chunks of a source file already merged in to the target table.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        control_table (str): The load control table name.
+        tgt_table (str): The target table name.
+        source_file (str): The source file name, as recorded in the control table.
+    Returns:
+        set: (chunk_id, fingerprint) of every committed chunk.
+    """
+    from sqlalchemy import text
+    with ora_engine.connect() as connection:
+        rows = connection.execute(text(f"SELECT chunk_id, fingerprint FROM {control_table} "
+                                       "WHERE target_table = :target_table AND source_file = :source_file"),
+                                  {'target_table': tgt_table, 'source_file': source_file}).fetchall()
+    return {(int(chunk_id), fingerprint) for chunk_id, fingerprint in rows}
+
+def merge_chunk(connection, df, chunk_id, fingerprint, source_file, tgt_table, stg_table, control_table, key_columns):
+    """
+    Stage, merge and record one chunk on an open transaction.
+
+    Args:
+        connection: SQLAlchemy connection with an open transaction, committed by the caller.
+        df (pd.DataFrame): The chunk, without duplicate keys.
+        chunk_id (int): Position of the chunk in the source file.
+        fingerprint (str): Fingerprint of the chunk.
+        source_file (str): The source file name recorded in the control table.
+        tgt_table (str): The target table name.
+        stg_table (str): The staging table name.
+        control_table (str): The load control table name.
+        key_columns (list): The columns uniquely identifying a row.
+    Returns:
+        int: Number of target rows inserted or updated.
+    """
+    from sqlalchemy import text
+    columns = list(df.columns)
+    # A regular (non temporary) staging table may still hold the rows of an interrupted run
+    connection.execute(text(f"DELETE FROM {stg_table}"))
+    connection.execute(text(build_staging_insert(stg_table, columns)), chunk_bind_rows(df))
+    merged = connection.execute(text(build_merge_statement(tgt_table, stg_table, columns, key_columns))).rowcount
+    connection.execute(text(f"INSERT INTO {control_table} (target_table, source_file, chunk_id, chunk_rows, fingerprint) "
+                            "VALUES (:target_table, :source_file, :chunk_id, :chunk_rows, :fingerprint)"),
+                       {'target_table': tgt_table, 'source_file': source_file, 'chunk_id': chunk_id,
+                        'chunk_rows': len(df), 'fingerprint': fingerprint})
+    return merged
+
+@timer
+def upsert_csv_file(file_path, ora_engine, tgt_table, stg_table, key_columns, control_table, chunk_rows=100000, checkpoint_file=None):
+    """
+    Upsert a CSV file in to a table, chunk by chunk, skipping the chunks already loaded.
+
+    Each chunk is staged, merged and recorded in the control table in a single transaction, so a
+    chunk is either fully loaded and recorded or not at all, and rerunning after a failure merges
+    only the missing chunks. The key columns must be a real unique key of the target: within a chunk
+    the last row of a duplicated key wins, and the rows dropped for it are counted and reported.
+
+    With a checkpoint file, the byte offset following every committed chunk is also saved locally,
+    and a rerun seeks straight past the committed chunks instead of reading and fingerprinting
+    them again. A chunk committed in Oracle but not yet checkpointed is still found in the control
+    table, so every chunk is merged exactly once.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        tgt_table (str): The target table name.
+        stg_table (str): The staging table name (a global temporary table with the target's columns).
+        key_columns (list): The columns uniquely identifying a row, required.
+        control_table (str): The load control table name.
+        chunk_rows (int): Rows per chunk; keep it constant across reruns of a file, chunks are identified by position.
+        checkpoint_file (str, optional): SQLite checkpoint file to resume from, see checkpoint_engine.get_checkpoint_file.
+    Returns:
+        dict or str: Chunks loaded and skipped, rows merged and duplicate key rows dropped, or a message if the load could not start.
+    """
+    if not key_columns:
+        return "Unable to upsert without key columns, set load_key_columns in input/load_target_table.py to the unique key of the target table"
+    from sqlalchemy.exc import DBAPIError
+    source_file = os.path.basename(file_path)
+    try:
+        done_chunks = load_done_chunks(ora_engine, control_table, tgt_table, source_file)
+    except DBAPIError as e:
+        print(f"Error reading the load control table: {e}")
+        return load_error_message(e, control_table)
+    summary = {'chunks': 0, 'loaded_chunks': 0, 'skipped_chunks': 0, 'merged_rows': 0, 'duplicate_key_rows': 0}
+    scope = f"load:{tgt_table}:{source_file}"
+    signature = f"{file_signature(file_path)}:{chunk_rows}"
+    checkpoints = load_checkpoints(checkpoint_file, scope, signature) if checkpoint_file else {}
+    file_offset, first_chunk = None, 0
+    if checkpoints:
+        last_chunk = max(checkpoints, key=int)
+        file_offset, first_chunk = checkpoints[last_chunk][0], int(last_chunk) + 1
+        summary['chunks'] = summary['skipped_chunks'] = first_chunk
+        print(f"Resuming the load of {source_file} at chunk {first_chunk}")
+    for chunk_id, (_, end_offset, chunk) in enumerate(read_csv_chunks_from_offset(file_path, chunk_rows, file_offset), start=first_chunk):
+        fingerprint = chunk_fingerprint(chunk)
+        summary['chunks'] += 1
+        if (chunk_id, fingerprint) in done_chunks:
+            summary['skipped_chunks'] += 1
+        else:
+            duplicated = chunk.duplicated(subset=key_columns, keep='last')
+            if duplicated.any():
+                summary['duplicate_key_rows'] += int(duplicated.sum())
+                print(f"Chunk {chunk_id}: {int(duplicated.sum())} rows dropped, their key {key_columns} is repeated later in the chunk "
+                      f"(first keys: {chunk.loc[duplicated, key_columns].head(5).to_dict('records')})")
+                chunk = chunk[~duplicated]
+            with ora_engine.begin() as connection:
+                summary['merged_rows'] += merge_chunk(connection, chunk, chunk_id, fingerprint, source_file,
+                                                      tgt_table, stg_table, control_table, key_columns)
+            summary['loaded_chunks'] += 1
+            print(f"Chunk {chunk_id} merged in to {tgt_table}")
+        # Only checkpointed once the chunk is committed in Oracle
+        if checkpoint_file:
+            save_checkpoint(checkpoint_file, scope, chunk_id, signature, end_offset, {'rows': len(chunk), 'fingerprint': fingerprint})
+    return summary
@@ -0,0 +1,220 @@
+from etl_csv_file_to_oracle.conf.input_file import numeric_columns, time_columns, numeric_decimals, time_format, datetime_format
+
+"""
+Type normalization of the source and target DataFrames before they are compared.
+
+The same data comes back in different representations from a CSV file and from Oracle:
+upper case column names, NUMBER as Decimal objects instead of floats, times as strings on one
+side and DATE/TIMESTAMP on the other, padded strings, '' where Oracle has NULL. Every column is
+normalized to one canonical representation on whole columns (no per row apply):
+
+    - column names: stripped and lower cased
+    - numerics: integers (int columns, Python ints, integral Decimals) as nullable Int64, so ids above
+      2^53 keep every digit; other numbers as float64 rounded to 'numeric_decimals' decimals
+    - key columns: compared exactly, integers as Int64, strings stripped, nothing rounded
+    - times: strings in 'time_format' (declared time columns) or 'datetime_format' (other date/time columns)
+    - strings: stripped, '' turned in to None like Oracle does
+"""
+
+_numeric_kinds = ('decimal', 'integer', 'floating', 'mixed-integer-float')
+_datetime_kinds = ('datetime64', 'datetime', 'date')
+
+def normalize_column_names(df):
+    """
+    Strip and lower case the column names of a DataFrame, in place.
+
+    Args:
+        df (pd.DataFrame): The DataFrame.
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    df.columns = [str(column).strip().lower() for column in df.columns]
+    return df
+
+def normalize_integer(series):
+    """
+    Cast a column of integers to nullable Int64, without going through float.
+
+    Args:
+        series (pd.Series): The column, an integer dtype or Python int / Decimal objects.
+    Returns:
+        pd.Series or None: The Int64 column, None if some value is not an integer (or does not fit in 64 bits).
+    """
+    try:
+        return series.astype('Int64')
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def normalize_numeric(series, decimals=numeric_decimals):
+    """
+    Cast a numeric column to its canonical representation.
+
+    Integers (integer dtypes, Python ints and Decimals without decimals, like Oracle NUMBER(p, 0)) become
+    nullable Int64 and are never rounded. Other values (floats, Decimals with decimals, numeric strings)
+    become float64 rounded to 'decimals'; values that are not numbers become NaN.
+
+    Args:
+        series (pd.Series): The column.
+        decimals (int, optional): Decimals kept on non integer values, None to keep every decimal.
+    Returns:
+        pd.Series: The Int64 or float64 column.
+    """
+    import pandas as pd
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.infer_dtype(series, skipna=True) in ('integer', 'decimal'):
+        integers = normalize_integer(series)
+        if integers is not None:
+            return integers
+    if series.dtype == object or not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    series = series.astype('float64')
+    return series if decimals is None else series.round(decimals)
+
+def normalize_key(series):
+    """
+    Normalize a key column without losing precision: keys are matched exactly, never rounded.
+
+    Args:
+        series (pd.Series): The column.
+    Returns:
+        pd.Series: Int64 for integers, the column as is for other numbers, stripped strings otherwise.
+    """
+    import pandas as pd
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.infer_dtype(series, skipna=True) in ('integer', 'decimal'):
+        integers = normalize_integer(series)
+        return integers if integers is not None else series
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return normalize_string(series)
+
+def normalize_time(series, output_format=time_format):
+    """
+    Canonicalize a date/time column to strings of one format.
+
+    DATE/TIMESTAMP values (datetime64, datetime objects) and strings in any format pandas
+    recognizes are parsed and formatted with 'output_format'. Strings that cannot be parsed are
+    kept (stripped), so they show up as differences instead of silently becoming NULL.
+
+    Args:
+        series (pd.Series): The column.
+        output_format (str): strftime format of the canonical value, e.g. '%H:%M:%S'.
+    Returns:
+        pd.Series: The column as strings (object), None for NULL.
+    """
+    import numpy as np
+    import pandas as pd
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+        original = series.astype(object)
+    else:
+        original = normalize_string(series)
+        # Values already in the canonical format parse in a single vectorized pass, only the others
+        # (other formats, datetime objects) go through the slower per value format inference
+        parsed = pd.to_datetime(original, format=output_format, errors='coerce')
+        unparsed = parsed.isna() & original.notna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(original[unparsed], format='mixed', errors='coerce')
+    # strftime runs per value, so it formats the distinct values only (at most 86400 for a time of day),
+    # NaT has code -1 and picks the None appended last
+    codes, uniques = pd.factorize(parsed)
+    formatted = np.append(np.asarray(uniques.strftime(output_format), dtype=object), None)[codes]
+    formatted = pd.Series(formatted, index=series.index, dtype=object)
+    return formatted.where(parsed.notna(), original.where(original.notna(), None))
+
+def normalize_string(series):
+    """
+    Strip the string values of a column and turn empty strings in to None, as Oracle stores '' as NULL.
+
+    Values that are not strings are left as they are.
+
+    Args:
+        series (pd.Series): The column.
+    Returns:
+        pd.Series: The column as object, None for NULL.
+    """
+    import pandas as pd
+    series = series.astype(object)
+    if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'mixed'):
+        stripped = series.str.strip()
+        series = stripped.where(stripped.notna(), series)
+        series = series.where(series != '', None)
+    return series.where(series.notna(), None)
+
+def normalize_dataframe(df, numeric=None, times=None, decimals=numeric_decimals, keys=None):
+    """
+    Normalize every column of a DataFrame to its canonical representation.
+
+    Declared numeric and time columns are always cast; other columns are cast by the kind of
+    values they hold (numbers, dates/timestamps or strings).
+
+    Args:
+        df (pd.DataFrame): The DataFrame, not modified.
+        numeric (list, optional): Numeric columns, defaults to numeric_columns of the input file configuration.
+        times (list, optional): Time of day columns, defaults to time_columns of the input file configuration.
+        decimals (int, optional): Decimals kept on numeric columns, None to keep every decimal.
+        keys (list, optional): Key columns, normalized with normalize_key.
+    Returns:
+        pd.DataFrame: The normalized DataFrame, lower case column names.
+    """
+    import pandas as pd
+    numeric = set(numeric_columns if numeric is None else numeric)
+    times = set(time_columns if times is None else times)
+    keys = {column.lower() for column in keys or []}
+    df = normalize_column_names(df.copy(deep=False))
+    normalized = {}
+    for column in df.columns:
+        series = df[column]
+        kind = pd.api.types.infer_dtype(series, skipna=True)
+        if column in keys:
+            normalized[column] = normalize_key(series)
+        elif column in numeric:
+            normalized[column] = normalize_numeric(series, decimals)
+        elif column in times:
+            normalized[column] = normalize_time(series, time_format)
+        elif pd.api.types.is_datetime64_any_dtype(series) or kind in _datetime_kinds:
+            normalized[column] = normalize_time(series, datetime_format)
+        elif pd.api.types.is_bool_dtype(series):
+            normalized[column] = series
+        elif pd.api.types.is_numeric_dtype(series) or kind in _numeric_kinds:
+            normalized[column] = normalize_numeric(series, decimals)
+        else:
+            normalized[column] = normalize_string(series)
+    return pd.DataFrame(normalized, index=df.index)
+
+def normalize_for_compare(df1, df2, numeric=None, times=None, decimals=numeric_decimals, keys=None):
+    """
+    Normalize a source and a target DataFrame so they can be compared value by value.
+
+    Both are normalized with normalize_dataframe and the target columns are put in the order of
+    the source columns (target only columns last), so equal data compares equal whatever the
+    representation or column order of each side.
+
+    Args:
+        df1 (pd.DataFrame): The source DataFrame.
+        df2 (pd.DataFrame): The target DataFrame.
+        numeric (list, optional): Numeric columns, see normalize_dataframe.
+        times (list, optional): Time of day columns, see normalize_dataframe.
+        decimals (int, optional): Decimals kept on numeric columns.
+        keys (list, optional): Key columns, compared exactly.
+    Returns:
+        tuple: (normalized source DataFrame, normalized target DataFrame)
+    """
+    import pandas as pd
+    df1 = normalize_dataframe(df1, numeric, times, decimals, keys)
+    df2 = normalize_dataframe(df2, numeric, times, decimals, keys)
+    ordered = [column for column in df1.columns if column in df2.columns]
+    df2 = df2[ordered + [column for column in df2.columns if column not in ordered]]
+    for column in ordered:
+        if df1[column].dtype == df2[column].dtype:
+            continue
+        # Integers on one side and floats on the other (a CSV column with NULLs is read as float): both become
+        # Int64 when the floats are all whole numbers, so no integer is rounded, float64 otherwise
+        integer_side = [pd.api.types.is_integer_dtype(df[column]) for df in (df1, df2)]
+        float_side = [pd.api.types.is_float_dtype(df[column]) for df in (df1, df2)]
+        if any(integer_side) and any(float_side):
+            floats = (df1 if float_side[0] else df2)[column].dropna()
+            dtype = 'Int64' if (floats % 1 == 0).all() else 'float64'
+            df1[column], df2[column] = df1[column].astype(dtype), df2[column].astype(dtype)
+        else:
+            # Numeric columns NaN on one side only are float on that side and object on the other
+            df1[column], df2[column] = df1[column].astype(object), df2[column].astype(object)
+    return df1.reset_index(drop=True), df2.reset_index(drop=True)
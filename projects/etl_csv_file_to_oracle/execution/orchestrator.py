@@ -0,0 +1,256 @@
+import importlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime
+from time import time
+from etl_csv_file_to_oracle.conf.proj_conf import get_output_path, path_roots
+from etl_csv_file_to_oracle.conf.input_file import get_input_file, count_gate_tolerance, fail_fast_max_mismatches, fail_fast_max_mismatch_rate, fail_fast_window_rows
+from etl_csv_file_to_oracle.execution.difference_engine import DifferenceSink, get_difference_file
+from etl_csv_file_to_oracle.execution.connection_engine import ora_connection, OraConnectionError
+from etl_csv_file_to_oracle.execution.checkpoint_engine import file_signature, load_checkpoints, save_checkpoint, clear_checkpoints
+from etl_csv_file_to_oracle.execution.core_engine import read_csv_row_count, read_csv_data_to_df, read_parquet_data_to_df, pd_read_sql, sql_read_scalar, count_compare_dataframes, data_compare_dataframes, data_compare_dataframes_by_key, build_count_query, count_gate
+
+def load_manifest(manifest_path):
+    """
+    Load a validation manifest.
+
+    The manifest is a JSON document with an optional 'name' and 'max_workers' and a list of 'jobs'.
+    Every job has a 'name', a 'mode' (count, data, sorted, profile, sample or incremental), a
+    'source_file' (absolute, or relative to the project's input directory) and the target
+    details its mode needs: 'target_query' (a module exposing tgt_query, or the SQL itself),
+    or for count jobs a 'target_table' counted by row_count_engine (with an optional 'count_accuracy'),
+    'target_table', 'key_columns', 'watermark_column', 'strata_column', 'sample_buckets', 'total_buckets'.
+    A data job may give a 'target_file' (a Parquet snapshot of the target, absolute or relative to the input
+    directory like 'source_file') instead of a 'target_query'.
+    A data job compared by key may give a 'numeric_tolerance' for its numeric columns.
+    Data and sorted jobs write their differing rows to a 'difference_file' (default <output>/<name>_differences.parquet)
+    and report a summary with counts and a sample.
+    Data and sorted jobs given a 'count_gate_tolerance' (default from the input file configuration, off unless set)
+    first compare row counts, and are rejected without comparing data when the counts differ by more than that
+    many rows. Sorted jobs stop early on 'max_mismatches' unmatched rows or a 'max_mismatch_rate' above the limit
+    over the first 'mismatch_window_rows' rows.
+    Optional 'input_root' and 'output_root' replace the project's input and output directories for that job.
+    Job names identify the results, checkpoints and difference files of the jobs, so they must be unique.
+
+    Args:
+        manifest_path (str): The path to the manifest JSON file.
+    Returns:
+        dict: The manifest with every source and target file resolved to an absolute path.
+    Raises:
+        ValueError: If several jobs have the same name.
+    """
+    with open(manifest_path, 'r') as manifest_file:
+        manifest = json.load(manifest_file)
+    names = [job['name'] for job in manifest['jobs']]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(f"Job names {duplicated} are used by several jobs of {manifest_path}, job names must be unique")
+    for job in manifest['jobs']:
+        for file_key in ('source_file', 'target_file'):
+            if job.get(file_key) and not os.path.isabs(job[file_key]):
+                with path_roots(input_root=job.get('input_root')):
+                    job[file_key] = get_input_file(job[file_key])
+    return manifest
+
+def resolve_target_query(target_query):
+    """
+    Resolve the target query of a job.
+
+    Args:
+        target_query (str): Dotted name of a module exposing 'tgt_query' (like the modules in input/), or the SQL query itself.
+    Returns:
+        str: The SQL query.
+    """
+    if target_query.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return target_query
+    return importlib.import_module(target_query).tgt_query
+
+def _run_count_job(job, ora_engine):
+    if job.get('target_table'):
+        from etl_csv_file_to_oracle.execution.row_count_engine import count_table_rows
+        target_count = count_table_rows(ora_engine, job['target_table'], accuracy=job.get('count_accuracy', 'exact'))['row_count']
+    else:
+        target_count = sql_read_scalar(resolve_target_query(job['target_query']), ora_engine)
+    return count_compare_dataframes(read_csv_row_count(job['source_file']), target_count)
+
+def _run_count_gate(job, ora_engine):
+    """
+    Compare the row counts of a data or sorted job before its data, see core_engine.count_gate.
+    The target is counted exactly as it is compared: the rows of the target file, or of the target query.
+    """
+    tolerance = job.get('count_gate_tolerance', count_gate_tolerance)
+    if tolerance is None:
+        return None
+    if job.get('target_file'):
+        import pyarrow.dataset as ds
+        target_count = ds.dataset(job['target_file'], format='parquet').count_rows()
+    else:
+        target_count = sql_read_scalar(build_count_query(resolve_target_query(job['target_query'])), ora_engine)
+    return count_gate(read_csv_row_count(job['source_file']), target_count, tolerance)
+
+def _run_data_job(job, ora_engine):
+    rejected = _run_count_gate(job, ora_engine)
+    if rejected is not None:
+        return rejected
+    source_df = read_csv_data_to_df(job['source_file'])
+    if job.get('target_file'):
+        target_df = read_parquet_data_to_df(job['target_file'])
+    else:
+        target_df = pd_read_sql(resolve_target_query(job['target_query']), ora_engine)
+    with DifferenceSink(job.get('difference_file') or get_difference_file(job['name'])) as sink:
+        if job.get('key_columns'):
+            return data_compare_dataframes_by_key(source_df, target_df, job['key_columns'], numeric_tolerance=job.get('numeric_tolerance'), sink=sink)
+        return data_compare_dataframes(source_df, target_df, sink=sink)
+
+# The validation engines below are imported by the first job needing them, so a manifest of count jobs never loads pandas
+def _run_sorted_job(job, ora_engine):
+    from etl_csv_file_to_oracle.execution.external_sort_engine import external_sort_data_validation
+    rejected = _run_count_gate(job, ora_engine)
+    if rejected is not None:
+        return rejected
+    with DifferenceSink(job.get('difference_file') or get_difference_file(job['name'])) as sink:
+        return external_sort_data_validation(job['source_file'], resolve_target_query(job['target_query']), ora_engine, sink=sink,
+                                             max_mismatches=job.get('max_mismatches', fail_fast_max_mismatches),
+                                             max_mismatch_rate=job.get('max_mismatch_rate', fail_fast_max_mismatch_rate),
+                                             window_rows=job.get('mismatch_window_rows', fail_fast_window_rows))
+
+def _run_profile_job(job, ora_engine):
+    from etl_csv_file_to_oracle.execution.profile_engine import profile_validation
+    return profile_validation(job['source_file'], job['target_table'], ora_engine)
+
+def _run_sample_job(job, ora_engine):
+    from etl_csv_file_to_oracle.execution.sampling_engine import sample_data_validation
+    return sample_data_validation(job['source_file'], job['target_table'], ora_engine, job['key_columns'], job['strata_column'],
+                                  job.get('sample_buckets', 10), job.get('total_buckets', 1000))
+
+def _run_incremental_job(job, ora_engine):
+    from etl_csv_file_to_oracle.execution.incremental_engine import incremental_data_validation
+    return incremental_data_validation(job['source_file'], job['target_table'], job['watermark_column'], ora_engine)
+
+job_runners = {'count': _run_count_job,
+               'data': _run_data_job,
+               'sorted': _run_sorted_job,
+               'profile': _run_profile_job,
+               'sample': _run_sample_job,
+               'incremental': _run_incremental_job}
+
+def summarize_result(result):
+    """
+    Turn the result of a validation in to a status and machine readable details.
+
+    Args:
+        result: The value returned by the validation of a job.
+    Returns:
+        tuple: (status - 'passed', 'failed' or 'error', details - JSON serializable)
+    """
+    if hasattr(result, 'columns'):
+        details = {'different_rows': len(result)}
+        if 'difference' in result.columns:
+            details['differences'] = result['difference'].value_counts().to_dict()
+            details['mismatched_columns'] = result['column'].dropna().value_counts().to_dict()
+        return 'failed', details
+    if isinstance(result, dict):
+        failed = (result.get('source_only_rows', 0) or result.get('target_only_rows', 0) or result.get('different_rows', 0)
+                  or result.get('rejected'))
+        return ('failed' if failed else 'passed'), result
+    if isinstance(result, str) and result.startswith('Unable'):
+        return 'error', result
+    return 'passed', result
+
+def run_validation_job(job, ora_engine):
+    """
+    Run a single validation job and record its outcome.
+
+    The reads of the job run on one pooled connection, checked out for the whole job (see
+    connection_engine.ora_connection), except for a data job comparing a 'target_file', which
+    does not read from Oracle.
+
+    Args:
+        job (dict): The job entry of the manifest.
+        ora_engine: The SQLAlchemy engine object shared by all jobs.
+    Returns:
+        dict: Report entry with the job name, mode, status, timing and details.
+    """
+    started_at = datetime.now()
+    start = time()
+    connection = nullcontext() if job.get('target_file') else ora_connection(ora_engine)
+    try:
+        with path_roots(input_root=job.get('input_root'), output_root=job.get('output_root')), connection:
+            status, details = summarize_result(job_runners[job['mode']](job, ora_engine))
+    except OraConnectionError as e:
+        print(f"Failed to connect to the Oracle database: {e}")
+        status, details = 'error', "Unable to read data from Oracle database due to connection issues."
+    except Exception as e:
+        status, details = 'error', f"{type(e).__name__}: {e}"
+    return {'name': job['name'], 'mode': job['mode'], 'source_file': job['source_file'], 'status': status,
+            'started_at': started_at.isoformat(timespec='seconds'), 'seconds': round(time() - start, 3), 'details': details}
+
+def job_signature(job):
+    """
+    Signature of a job definition and the current content of its source file, for checkpoints.
+
+    Args:
+        job (dict): The job entry of the manifest.
+    Returns:
+        str: The signature.
+    """
+    source = file_signature(job['source_file']) if os.path.exists(job['source_file']) else 'missing'
+    return f"{json.dumps(job, sort_keys=True, default=str)}|{source}"
+
+def run_validation_manifest(manifest, ora_engine, max_workers=None, report_file=None, checkpoint_file=None):
+    """
+    Runs every job of a validation manifest on a bounded pool of worker threads.
+
+    Jobs are submitted largest source file first, so the longest jobs start early and the
+    small ones fill the remaining worker capacity. All jobs share the connection pool of
+    'ora_engine', which should be sized to at least the number of workers.
+
+    With a checkpoint file, the entry of every job that ran to completion (passed or failed) is
+    saved as soon as it finishes, and a rerun of the manifest only runs the jobs that did not
+    complete (errors included), unless their definition or source file changed since. Once every
+    job has completed the checkpoints are cleared, so the next run validates everything again.
+
+    Args:
+        manifest (dict): The manifest returned by load_manifest.
+        ora_engine: The SQLAlchemy engine object shared by all jobs.
+        max_workers (int, optional): Number of jobs run concurrently, defaults to the manifest 'max_workers' or 4.
+        report_file (str, optional): Where to write the consolidated JSON report, defaults to the project's output directory.
+        checkpoint_file (str, optional): SQLite checkpoint file to resume from, see checkpoint_engine.get_checkpoint_file.
+    Returns:
+        dict: The consolidated report, with a summary and one entry per job in manifest order.
+    """
+    max_workers = max_workers or manifest.get('max_workers', 4)
+    jobs = sorted(manifest['jobs'], key=lambda job: os.path.getsize(job['source_file']) if os.path.exists(job['source_file']) else 0, reverse=True)
+    start = time()
+    results = {}
+    scope = f"validation:{manifest.get('name', 'validation_manifest')}"
+    signatures = {job['name']: job_signature(job) for job in jobs} if checkpoint_file else {}
+    for job in list(jobs) if checkpoint_file else []:
+        checkpoint = load_checkpoints(checkpoint_file, scope, signatures[job['name']]).get(job['name'])
+        if checkpoint:
+            results[job['name']] = dict(checkpoint[1], resumed=True)
+            jobs.remove(job)
+            print(f"Validation job {job['name']}: {results[job['name']]['status']} (checkpointed)")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_validation_job, job, ora_engine): job['name'] for job in jobs}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            print(f"Validation job {futures[future]}: {results[futures[future]]['status']}")
+            if checkpoint_file and results[futures[future]]['status'] != 'error':
+                save_checkpoint(checkpoint_file, scope, futures[future], signatures[futures[future]], state=results[futures[future]])
+    entries = [results[job['name']] for job in manifest['jobs']]
+    if checkpoint_file and all(entry['status'] != 'error' for entry in entries):
+        clear_checkpoints(checkpoint_file, scope)
+    report = {'generated_at': datetime.now().isoformat(timespec='seconds'),
+              'seconds': round(time() - start, 3),
+              'max_workers': max_workers,
+              'summary': {status: sum(entry['status'] == status for entry in entries) for status in ('passed', 'failed', 'error')},
+              'jobs': entries}
+    report_file = report_file or f"{get_output_path()}/validation_report_{datetime.now():%Y%m%d_%H%M%S}.json"
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, 'w') as report_out:
+        json.dump(report, report_out, indent=2, default=str)
+    print(f"Validation report written to: {report_file}")
+    return report
@@ -0,0 +1,9 @@
+from etl_csv_file_to_oracle.execution.core_engine import close_ora_conn
+from etl_csv_file_to_oracle.execution.extract_engine import parallel_extract_to_parquet
+from etl_csv_file_to_oracle.input.extract_target_table import tgt_table, extract_partitions, extract_workers
+from etl_csv_file_to_oracle.conf.proj_conf import get_output_path
+from etl_csv_file_to_oracle.conf.db_conf import ora_engine
+
+result = parallel_extract_to_parquet(ora_engine, tgt_table, f"{get_output_path()}/{tgt_table}", extract_partitions, extract_workers)
+print(f"Extracted {result['rows']} rows of {tgt_table} in to {len(result['files'])} Parquet files")
+close_ora_conn(ora_engine)
\ No newline at end of file
@@ -0,0 +1,167 @@
+from math import isclose
+import pandas as pd
+from etl_csv_file_to_oracle.conf.proj_conf import timer
+from etl_csv_file_to_oracle.conf.input_file import desired_columns, numeric_columns, categorical_columns
+from etl_csv_file_to_oracle.execution.core_engine import pd_read_sql
+
+def _category_key(value):
+    """
+    Map a categorical value to a comparable dict key, NULL/NaN on either side becomes None.
+    """
+    return None if pd.isna(value) else str(value)
+
+def new_profile():
+    """
+    Create an empty column profile.
+
+    Returns:
+        dict: Profile with the row count, null counts per column, min/max/sum per numeric
+        column and value counts per categorical column.
+    """
+    return {'row_count': 0,
+            'null_counts': {column: 0 for column in desired_columns},
+            'numeric': {column: {'min': None, 'max': None, 'sum': 0.0} for column in numeric_columns},
+            'categorical': {column: {} for column in categorical_columns}}
+
+@timer
+def profile_csv_file(file_path, chunk_rows=1000000):
+    """
+    Computes the column profile of a CSV file in a single streaming pass.
+
+    Every chunk is reduced with vectorized pandas aggregations and merged in to the running
+    profile, so memory stays bounded by the chunk size whatever the file size.
+
+    Args:
+        file_path (str): The path to the CSV file to be profiled.
+        chunk_rows (int): Number of rows read per chunk.
+    Returns:
+        dict: The column profile of the file, see new_profile.
+    """
+    profile = new_profile()
+    for chunk in pd.read_csv(file_path, usecols=desired_columns, chunksize=chunk_rows):
+        profile['row_count'] += len(chunk)
+        for column, nulls in chunk.isna().sum().items():
+            profile['null_counts'][column] += int(nulls)
+        reduced = chunk[numeric_columns].agg(['min', 'max', 'sum'])
+        for column in numeric_columns:
+            stats = profile['numeric'][column]
+            if pd.notna(reduced.at['min', column]):
+                stats['min'] = float(reduced.at['min', column]) if stats['min'] is None else min(stats['min'], float(reduced.at['min', column]))
+                stats['max'] = float(reduced.at['max', column]) if stats['max'] is None else max(stats['max'], float(reduced.at['max', column]))
+            stats['sum'] += float(reduced.at['sum', column])
+        for column in categorical_columns:
+            counts = profile['categorical'][column]
+            for value, count in chunk[column].value_counts(dropna=False).items():
+                key = _category_key(value)
+                counts[key] = counts.get(key, 0) + int(count)
+    return profile
+
+def build_profile_target_query(tgt_table):
+    """
+    Build the single aggregate query returning the column profile of the target table.
+
+    GROUPING SETS computes the value counts of every categorical column and the grand total
+    (row count, non-null counts, min/max/sum) in one scan of the table.
+
+    Args:
+        tgt_table (str): The target table name.
+    Returns:
+        str: SQL query returning one row per categorical value plus one grand total row.
+    """
+    select_list = [f"GROUPING({column}) AS g_{column}" for column in categorical_columns]
+    select_list += categorical_columns
+    select_list += ["COUNT(*) AS row_cnt"]
+    select_list += [f"COUNT({column}) AS nn_{column}" for column in desired_columns]
+    for column in numeric_columns:
+        select_list += [f"MIN({column}) AS min_{column}", f"MAX({column}) AS max_{column}", f"SUM({column}) AS sum_{column}"]
+    grouping_sets = ', '.join([f"({column})" for column in categorical_columns] + ['()'])
+    return f"SELECT {', '.join(select_list)} FROM {tgt_table} GROUP BY GROUPING SETS ({grouping_sets})"
+
+def profile_from_target_df(target_df):
+    """
+    Convert the result of the profile query in to a column profile.
+
+    Args:
+        target_df (pd.DataFrame): Result of the query built by build_profile_target_query.
+    Returns:
+        dict: The column profile of the target table, see new_profile.
+    """
+    target_df.columns = [column.lower() for column in target_df.columns]
+    profile = new_profile()
+    grouping = target_df[[f"g_{column}" for column in categorical_columns]]
+    grand_total = target_df[(grouping == 1).all(axis=1)].iloc[0]
+    profile['row_count'] = int(grand_total['row_cnt'])
+    for column in desired_columns:
+        profile['null_counts'][column] = profile['row_count'] - int(grand_total[f"nn_{column}"])
+    for column in numeric_columns:
+        for stat in ('min', 'max', 'sum'):
+            value = grand_total[f"{stat}_{column}"]
+            # SUM over no rows is NULL in Oracle but 0 for the file
+            if pd.isna(value):
+                value = 0.0 if stat == 'sum' else None
+            profile['numeric'][column][stat] = None if value is None else float(value)
+    for column in categorical_columns:
+        rows = target_df[target_df[f"g_{column}"] == 0]
+        profile['categorical'][column] = {_category_key(value): int(count) for value, count in zip(rows[column], rows['row_cnt'])}
+    return profile
+
+def compare_profiles(src_profile, tgt_profile, abs_tol=0.01, rel_tol=1e-9):
+    """
+    Compares two column profiles, numeric aggregates within the given tolerances and counts exactly.
+
+    Args:
+        src_profile (dict): The column profile of the source file.
+        tgt_profile (dict): The column profile of the target table.
+        abs_tol (float): Absolute tolerance for numeric aggregates.
+        rel_tol (float): Relative tolerance for numeric aggregates.
+    Returns:
+        list: One dict (check, column, source, target) per difference, empty if the profiles match.
+    """
+    differences = []
+    if src_profile['row_count'] != tgt_profile['row_count']:
+        differences.append({'check': 'row_count', 'column': None, 'source': src_profile['row_count'], 'target': tgt_profile['row_count']})
+    for column, nulls in src_profile['null_counts'].items():
+        if nulls != tgt_profile['null_counts'][column]:
+            differences.append({'check': 'null_count', 'column': column, 'source': nulls, 'target': tgt_profile['null_counts'][column]})
+    for column, stats in src_profile['numeric'].items():
+        for stat, value in stats.items():
+            target_value = tgt_profile['numeric'][column][stat]
+            if value is None or target_value is None:
+                matched = value is None and target_value is None
+            else:
+                matched = isclose(value, target_value, rel_tol=rel_tol, abs_tol=abs_tol)
+            if not matched:
+                differences.append({'check': stat, 'column': column, 'source': value, 'target': target_value})
+    for column, counts in src_profile['categorical'].items():
+        target_counts = tgt_profile['categorical'][column]
+        if len(counts) != len(target_counts):
+            differences.append({'check': 'distinct_count', 'column': column, 'source': len(counts), 'target': len(target_counts)})
+        for value in sorted(set(counts) | set(target_counts), key=str):
+            if counts.get(value, 0) != target_counts.get(value, 0):
+                differences.append({'check': f"count[{value}]", 'column': column, 'source': counts.get(value, 0), 'target': target_counts.get(value, 0)})
+    return differences
+
+def profile_validation(file_path, tgt_table, ora_engine, abs_tol=0.01, rel_tol=1e-9):
+    """
+    Validates the column profile of the source file against the profile of the target table.
+
+    This is a cheap gate to run before any row level comparison: one streaming pass over the
+    file and one aggregate query on the target.
+
+    Args:
+        file_path (str): The path to the source CSV file.
+        tgt_table (str): The target table name.
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        abs_tol (float): Absolute tolerance for numeric aggregates.
+        rel_tol (float): Relative tolerance for numeric aggregates.
+    Returns:
+        str or pd.DataFrame: Confirmation message if the profiles match, otherwise the differences.
+    """
+    src_profile = profile_csv_file(file_path)
+    target_df = pd_read_sql(build_profile_target_query(tgt_table), ora_engine)
+    if isinstance(target_df, str):
+        return target_df
+    differences = compare_profiles(src_profile, profile_from_target_df(target_df), abs_tol, rel_tol)
+    if not differences:
+        return "Src File and Target Table profiles are identical within tolerance"
+    return pd.DataFrame(differences)
@@ -0,0 +1,295 @@
+import json
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from etl_csv_file_to_oracle.conf.proj_conf import get_output_path
+
+"""
+Row counts of Oracle tables, with strategies of different cost and accuracy.
+
+    - cached: an earlier exact count, still valid while ALL_TAB_MODIFICATIONS shows no DML since it
+    - stats: NUM_ROWS of ALL_TAB_STATISTICS plus the inserts minus the deletes recorded since the
+      statistics were gathered (an estimate: statistics may be sampled)
+    - parallel: exact count of every partition on its own pooled connection, summed
+    - exact: a single SELECT COUNT(*)
+
+Table monitoring information (ALL_TAB_MODIFICATIONS) is flushed by Oracle every few minutes, or
+by DBMS_STATS.FLUSH_DATABASE_MONITORING_INFO, so the cached and stats strategies can miss DML of
+the last minutes. An exact count therefore only trusts the cache after a successful flush (it needs
+the ANALYZE ANY privilege, checked once per engine), and counts the table otherwise.
+"""
+
+row_count_cache_name = 'row_count_cache.json'
+# Whether the session of an engine may flush the table monitoring information, checked on first use
+_flush_allowed = weakref.WeakKeyDictionary()
+
+def get_row_count_cache_file():
+    """
+    Get the default row count cache of the project, in the output directory.
+
+    Returns:
+        str: The path to the JSON row count cache.
+    """
+    return f"{get_output_path()}/{row_count_cache_name}"
+
+def split_table_name(table):
+    """
+    Split a table name in to owner and table, upper cased like the data dictionary.
+
+    Args:
+        table (str): 'table' or 'owner.table'.
+    Returns:
+        tuple: (owner or None for the current schema, table name)
+    """
+    owner, _, table_name = table.upper().rpartition('.')
+    return owner or None, table_name
+
+def _fetch_one(ora_engine, query, params=None):
+    from sqlalchemy import text
+    from etl_csv_file_to_oracle.execution.connection_engine import ora_connection
+    with ora_connection(ora_engine) as connection:
+        return connection.execute(text(query), params or {}).fetchone()
+
+def can_flush_monitoring_info(ora_engine):
+    """
+    Check once per engine that its session holds the ANALYZE ANY privilege needed to flush the table monitoring information.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+    Returns:
+        bool: True if the privilege is granted (directly or through a role).
+    """
+    from sqlalchemy.exc import DBAPIError
+    if ora_engine not in _flush_allowed:
+        try:
+            allowed = _fetch_one(ora_engine, "SELECT COUNT(*) FROM session_privs WHERE privilege = 'ANALYZE ANY'")[0] > 0
+            if not allowed:
+                print("No ANALYZE ANY privilege, exact counts do not use the row count cache.")
+        except DBAPIError as e:
+            print(f"Unable to check the ANALYZE ANY privilege, exact counts do not use the row count cache: {e}")
+            allowed = False
+        _flush_allowed[ora_engine] = allowed
+    return _flush_allowed[ora_engine]
+
+def flush_monitoring_info(ora_engine):
+    """
+    Flush the table monitoring information of the database, so ALL_TAB_MODIFICATIONS shows the latest DML.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+    Returns:
+        bool: True if flushed, False without the ANALYZE ANY privilege (see can_flush_monitoring_info) or if it failed.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+    if not can_flush_monitoring_info(ora_engine):
+        return False
+    try:
+        with ora_engine.begin() as connection:
+            connection.execute(text("BEGIN DBMS_STATS.FLUSH_DATABASE_MONITORING_INFO; END;"))
+        return True
+    except DBAPIError as e:
+        # Not tried again for this engine, exact counts fall back to counting the table
+        print(f"Unable to flush the table monitoring information: {e}")
+        _flush_allowed[ora_engine] = False
+        return False
+
+def read_table_modifications(ora_engine, table, flush_monitoring=False):
+    """
+    Read the DML recorded on a table since its statistics were last gathered.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        table (str): 'table' or 'owner.table'.
+        flush_monitoring (bool): Flush the monitoring information of the database first.
+    Returns:
+        dict: inserts, deletes, timestamp of the last recorded DML (None if none) and whether the table was truncated.
+    """
+    from sqlalchemy import text
+    owner, table_name = split_table_name(table)
+    if flush_monitoring:
+        flush_monitoring_info(ora_engine)
+    row = _fetch_one(ora_engine, "SELECT NVL(SUM(inserts), 0), NVL(SUM(deletes), 0), MAX(timestamp), MAX(truncated) "
+                                 "FROM all_tab_modifications WHERE table_owner = NVL(:owner, USER) AND table_name = :table_name "
+                                 "AND partition_name IS NULL", {'owner': owner, 'table_name': table_name})
+    return {'inserts': int(row[0]), 'deletes': int(row[1]), 'timestamp': row[2], 'truncated': row[3] == 'YES'}
+
+def count_rows_exact(ora_engine, table):
+    """
+    Count the rows of a table with a single SELECT COUNT(*).
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        table (str): 'table' or 'owner.table'.
+    Returns:
+        tuple: (row count, database time of the count)
+    """
+    row = _fetch_one(ora_engine, f"SELECT COUNT(*), SYSDATE FROM {table}")
+    return int(row[0]), row[1]
+
+def count_rows_parallel(ora_engine, table, workers=4):
+    """
+    Count the rows of a partitioned table, every partition counted concurrently on its own connection.
+
+    The partitions and the SCN are read on the current connection (see ora_connection), and
+    a table without partitions is left to the exact strategy right away. All the partitions are counted as of one SCN (flashback query), so the total is a consistent
+    count of the table at that point in time even though the sessions run at different times.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object, its pool should hold at least 'workers' connections.
+        table (str): 'table' or 'owner.table'.
+        workers (int): Number of partitions counted at a time.
+    Returns:
+        tuple: (row count, database time of the SCN), or None if the table is not partitioned or no SCN
+        could be read (DBMS_FLASHBACK not granted).
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+    from etl_csv_file_to_oracle.execution.connection_engine import ora_connection
+    owner, table_name = split_table_name(table)
+    with ora_connection(ora_engine) as connection:
+        partitions = [row[0] for row in connection.execute(text("SELECT partition_name FROM all_tab_partitions "
+                                                                "WHERE table_owner = NVL(:owner, USER) AND table_name = :table_name "
+                                                                "ORDER BY partition_position"),
+                                                           {'owner': owner, 'table_name': table_name})]
+        if not partitions:
+            return None
+        try:
+            scn, counted_at = connection.execute(text("SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER, SYSDATE FROM dual")).fetchone()
+        except DBAPIError as e:
+            print(f"Unable to read the current SCN, partitions not counted in parallel: {e}")
+            return None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        counts = executor.map(lambda partition: _fetch_one(ora_engine, f'SELECT COUNT(*) FROM {table} PARTITION ("{partition}") AS OF SCN :scn',
+                                                           {'scn': scn})[0], partitions)
+        return sum(int(count) for count in counts), counted_at
+
+def estimate_rows_from_stats(ora_engine, table, flush_monitoring=False):
+    """
+    Estimate the rows of a table from its optimizer statistics and the DML recorded since.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        table (str): 'table' or 'owner.table'.
+        flush_monitoring (bool): Flush the monitoring information of the database first.
+    Returns:
+        dict: row_count, last_analyzed and stale_stats, or None if the table has no usable statistics.
+    """
+    owner, table_name = split_table_name(table)
+    row = _fetch_one(ora_engine, "SELECT num_rows, last_analyzed, stale_stats FROM all_tab_statistics "
+                                 "WHERE owner = NVL(:owner, USER) AND table_name = :table_name AND partition_name IS NULL",
+                     {'owner': owner, 'table_name': table_name})
+    if row is None or row[0] is None or row[2] == 'YES':
+        return None
+    modifications = read_table_modifications(ora_engine, table, flush_monitoring)
+    if modifications['truncated']:
+        return None
+    return {'row_count': max(int(row[0]) + modifications['inserts'] - modifications['deletes'], 0),
+            'last_analyzed': row[1], 'stale_stats': row[2]}
+
+def load_row_count_cache(cache_file):
+    """
+    Load the cached exact row counts.
+
+    Args:
+        cache_file (str): The path to the JSON row count cache.
+    Returns:
+        dict: 'OWNER.TABLE' -> {'row_count', 'counted_at'}.
+    """
+    if not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, 'r') as cache:
+        return json.load(cache)
+
+def save_row_count_cache(cache_file, row_counts):
+    """
+    Persist the cached row counts atomically.
+
+    Args:
+        cache_file (str): The path to the JSON row count cache.
+        row_counts (dict): The cache returned by load_row_count_cache, updated.
+    """
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = f"{cache_file}.tmp"
+    with open(tmp_file, 'w') as cache:
+        json.dump(row_counts, cache, indent=2, default=str)
+    os.replace(tmp_file, cache_file)
+
+def _cache_key(table):
+    owner, table_name = split_table_name(table)
+    return f"{owner or ''}.{table_name}"
+
+def cached_row_count(ora_engine, table, cache_file, flush_monitoring=False):
+    """
+    Get the cached exact row count of a table, if no DML was recorded on it since it was counted.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        table (str): 'table' or 'owner.table'.
+        cache_file (str): The path to the JSON row count cache.
+        flush_monitoring (bool): Flush the monitoring information of the database first.
+    Returns:
+        int or None: The cached row count, None if there is none or it may be outdated.
+    """
+    from datetime import datetime
+    cached = load_row_count_cache(cache_file).get(_cache_key(table))
+    if cached is None:
+        return None
+    counted_at = datetime.fromisoformat(cached['counted_at'])
+    modifications = read_table_modifications(ora_engine, table, flush_monitoring)
+    if modifications['truncated']:
+        return None
+    if modifications['timestamp'] is not None and modifications['timestamp'] >= counted_at:
+        return None
+    # Gathering statistics resets the recorded DML, so DML before a later gathering is no longer visible
+    owner, table_name = split_table_name(table)
+    last_analyzed = _fetch_one(ora_engine, "SELECT MAX(last_analyzed) FROM all_tab_statistics "
+                                           "WHERE owner = NVL(:owner, USER) AND table_name = :table_name",
+                               {'owner': owner, 'table_name': table_name})[0]
+    if last_analyzed is not None and last_analyzed >= counted_at:
+        return None
+    return cached['row_count']
+
+def count_table_rows(ora_engine, table, accuracy='exact', cache_file=None, workers=4, flush_monitoring=False):
+    """
+    Count the rows of a table with the cheapest strategy meeting the accuracy requirement.
+
+    Strategies are tried from cheapest to most expensive: cached, stats (only when an estimate is
+    acceptable), parallel (exact, partitioned tables) and exact. An exact count only uses the cache
+    after the table monitoring information was flushed, otherwise DML of the last minutes could be
+    missed; with accuracy 'estimate' the cache is used without flushing and reported as not exact.
+    Every exact count is cached for the next call.
+
+    Args:
+        ora_engine: The SQLAlchemy engine object used to connect to the Oracle database.
+        table (str): 'table' or 'owner.table'.
+        accuracy (str): 'exact', or 'estimate' to accept the optimizer statistics.
+        cache_file (str, optional): JSON row count cache, defaults to get_row_count_cache_file(); set to False to disable.
+        workers (int): Partitions counted at a time by the parallel strategy.
+        flush_monitoring (bool): Flush the monitoring information of the database before relying on it for an estimate.
+    Returns:
+        dict: row_count, the strategy used and whether the count is exact.
+    """
+    cache_file = get_row_count_cache_file() if cache_file is None else cache_file
+    flushed = False
+    if cache_file or flush_monitoring:
+        flushed = flush_monitoring_info(ora_engine) if (flush_monitoring or accuracy == 'exact') else False
+    if cache_file and (flushed or accuracy == 'estimate'):
+        row_count = cached_row_count(ora_engine, table, cache_file)
+        if row_count is not None:
+            return {'row_count': row_count, 'strategy': 'cached', 'exact': flushed}
+    if accuracy == 'estimate':
+        estimate = estimate_rows_from_stats(ora_engine, table)
+        if estimate is not None:
+            return {'row_count': estimate['row_count'], 'strategy': 'stats', 'exact': False}
+    counted = count_rows_parallel(ora_engine, table, workers)
+    strategy = 'parallel'
+    if counted is None:
+        counted = count_rows_exact(ora_engine, table)
+        strategy = 'exact'
+    row_count, counted_at = counted
+    if cache_file:
+        row_counts = load_row_count_cache(cache_file)
+        row_counts[_cache_key(table)] = {'row_count': row_count, 'counted_at': counted_at.isoformat()}
+        save_row_count_cache(cache_file, row_counts)
+    return {'row_count': row_count, 'strategy': strategy, 'exact': True}
@@ -0,0 +1,11 @@
+from etl_csv_file_to_oracle.execution.core_engine import close_ora_conn
+from etl_csv_file_to_oracle.execution.orchestrator import load_manifest, run_validation_manifest
+from etl_csv_file_to_oracle.execution.checkpoint_engine import get_checkpoint_file
+from etl_csv_file_to_oracle.conf.input_file import get_input_file
+from etl_csv_file_to_oracle.conf.db_conf import ora_engine
+
+manifest = load_manifest(get_input_file('validation_manifest.json'))
+# Jobs completed by an earlier, interrupted run are taken from the checkpoint file instead of being run again
+report = run_validation_manifest(manifest, ora_engine, checkpoint_file=get_checkpoint_file())
+print(report['summary'])
+close_ora_conn(ora_engine)
\ No newline at end of file
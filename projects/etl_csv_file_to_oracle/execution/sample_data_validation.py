@@ -0,0 +1,9 @@
+from etl_csv_file_to_oracle.execution.core_engine import close_ora_conn, input_file_path
+from etl_csv_file_to_oracle.execution.connection_engine import run_on_connection
+from etl_csv_file_to_oracle.execution.sampling_engine import sample_data_validation
+from etl_csv_file_to_oracle.input.sample_validation_target_query import tgt_table, sample_key_columns, sample_strata_column, sample_buckets, total_buckets
+from etl_csv_file_to_oracle.conf.db_conf import ora_engine
+
+# Every read of the validation runs on one pooled connection, checked out once
+run_on_connection(ora_engine, lambda: print(sample_data_validation(input_file_path, tgt_table, ora_engine, sample_key_columns, sample_strata_column, sample_buckets, total_buckets)))
+close_ora_conn(ora_engine)
\ No newline at end of file
@@ -1,3 +1,7 @@
 # This module contains the SQL query to fetch row count from the Oracle database.
 # Note: Do not include ";" at the end of the query string as it may cause issues when executing the query."
-tgt_query = """SELECT count(*) FROM taxi_trips_data_5"""
\ No newline at end of file
+tgt_query = """SELECT count(*) FROM taxi_trips_data_5"""
+# Table counted by count_validation.py through execution/row_count_engine.py, which picks the cheapest counting strategy
+tgt_table = 'taxi_trips_data_5'
+# 'exact' for a validation, 'estimate' accepts the optimizer statistics (a quick sanity check only)
+count_accuracy = 'exact'
\ No newline at end of file
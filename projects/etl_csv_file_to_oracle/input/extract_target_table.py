@@ -0,0 +1,5 @@
+# This module contains the target table details for the parallel extraction (see execution/extract_engine.py).
+# Note: The number of workers should not exceed the connection pool of the engine (ora_pool_size + ora_max_overflow in conf/db_conf.py).
+tgt_table = 'taxi_trips_data_5'
+extract_partitions = 16
+extract_workers = 8
@@ -0,0 +1,4 @@
+# This module contains the target table details for incremental (watermark-based) data validation.
+# Note: The watermark column must only ever increase for newly loaded rows (load batch id, sequence key or load timestamp).
+tgt_table = 'taxi_trips_data_5'
+tgt_watermark_column = 'load_batch_id'
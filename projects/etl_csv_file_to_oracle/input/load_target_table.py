@@ -0,0 +1,24 @@
+# This module contains the target, staging and control table details for the upsert load (see execution/load_engine.py).
+# Note: The staging table is a global temporary table, so every load session only sees (and merges) its own chunk.
+tgt_table = 'taxi_trips_data_5'
+stg_table = 'taxi_trips_data_5_stg'
+load_control_table = 'etl_load_chunks'
+# Columns uniquely identifying a row of the target table (its primary or a unique key), the MERGE matches on them.
+# The taxi trip file has no such key, so none is set and the upsert refuses to run until the key of the target is configured
+load_key_columns = []
+# Rows loaded, merged and committed together
+load_chunk_rows = 100000
+
+stg_table_ddl = f"""CREATE GLOBAL TEMPORARY TABLE {stg_table}
+ON COMMIT DELETE ROWS
+AS SELECT * FROM {tgt_table} WHERE 1 = 0"""
+
+load_control_table_ddl = f"""CREATE TABLE {load_control_table} (
+    target_table VARCHAR2(128) NOT NULL,
+    source_file VARCHAR2(512) NOT NULL,
+    chunk_id NUMBER NOT NULL,
+    chunk_rows NUMBER NOT NULL,
+    fingerprint VARCHAR2(20) NOT NULL,
+    loaded_at TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT {load_control_table}_pk PRIMARY KEY (target_table, source_file, chunk_id, fingerprint)
+)"""
@@ -0,0 +1,3 @@
+# This module contains the target table details for column-level profile validation.
+# Note: The profile query itself is generated from the numeric and categorical columns in conf/input_file.py
+tgt_table = 'taxi_trips_data_5'
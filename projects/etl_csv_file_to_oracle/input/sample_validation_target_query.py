@@ -0,0 +1,8 @@
+# This module contains the target table details for sampling-based statistical data validation.
+# Note: Sample key columns should be character columns, so Oracle and the CSV file hash the very same text.
+tgt_table = 'taxi_trips_data_5'
+sample_key_columns = ['pick_up_time', 'drop_off_time', 'pickup_location', 'dropoff_location']
+sample_strata_column = 'pickup_zone'
+# Fraction of the table validated on each run, expressed as sampled buckets out of total buckets
+sample_buckets = 10
+total_buckets = 1000
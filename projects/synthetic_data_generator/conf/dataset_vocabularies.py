@@ -0,0 +1,29 @@
+"""
+Vocabularies and distribution parameters of the synthetic datasets, used by the dataset specs
+in synthetic_data_generator.execution.dataset_specs.
+
+Constants:
+    suburbs (list): List of 195 NYC neighborhoods and locations for pickup/dropoff, busiest first
+"""
+suburbs = ['Lenox Hill West', 'Upper West Side South', 'Alphabet City', 'Hudson Sq', 'Midtown East', 'Times Sq/Theatre District', 'Battery Park City', 'Murray Hill', 'East Harlem South', 'Lincoln Square East', 'LaGuardia Airport', 'Lincoln Square West', 'Financial District North', 'Upper West Side North', 'East Chelsea', 'Midtown Center', 'Gramercy', 'Penn Station/Madison Sq West', 'Sutton Place/Turtle Bay North', 'West Chelsea/Hudson Yards', 'Clinton East', 'Clinton West', 'UN/Turtle Bay South', 'Midtown South', 'Midtown North', 'Garment District', 'Lenox Hill East', 'Flatiron', 'TriBeCa/Civic Center', 'Upper East Side North', 'West Village', 'Greenwich Village South', 'JFK Airport', 'East Village', 'Union Sq', 'Yorkville West', 'Central Park', 'Meatpacking/West Village West', 'Kips Bay', 'Morningside Heights', 'Astoria', 'East Tremont', 'Upper East Side South', 'Financial District South', 'Bloomingdale', 'Queensboro Hill', 'SoHo', 'Brooklyn Heights', 'Yorkville East', 'Manhattan Valley', 'DUMBO/Vinegar Hill', 'Little Italy/NoLiTa', 'Mott Haven/Port Morris', 'Greenwich Village North', 'Stuyvesant Heights', 'Lower East Side', 'East Harlem North', 'Chinatown', 'Fort Greene', 'Steinway', 'Central Harlem', 'Crown Heights North', 'Seaport', 'Two Bridges/Seward Park', 'Boerum Hill', 'Williamsburg (South Side)', 'Rosedale', 'Flushing', 'Old Astoria', 'Soundview/Castle Hill', 'Stuy Town/Peter Cooper Village', 'World Trade Center', 'Sunnyside', 'Washington Heights South', 'Prospect Heights', 'East New York', 'Hamilton Heights', 'Cobble Hill', 'Long Island City/Queens Plaza', 'Central Harlem North', 'Manhattanville', 'East Flatbush/Farragut', 'Elmhurst', 'East Concourse/Concourse Village', 'Park Slope', 'Greenpoint', 'Williamsburg (North Side)', 'Long Island City/Hunters Point', 'South Ozone Park', 'Ridgewood', 'Downtown Brooklyn/MetroTech', 'Queensbridge/Ravenswood', 'Williamsbridge/Olinville', 'Bedford', 'Gowanus', 'Jackson Heights', 'South Jamaica', 'Bushwick North', 'West Concourse', 'Queens Village', 'Windsor Terrace', 'Flatlands', 'Van Cortlandt Village', 'Woodside', 'East Williamsburg', 'Fordham South', 'East Elmhurst', 'Kew Gardens', 'Flushing Meadows-Corona Park', 'Marine Park/Mill Basin', 'Carroll Gardens', 'Canarsie', 'East Flatbush/Remsen Village', 'Jamaica', 'Marble Hill', 'Bushwick South', 'Erasmus', 'Claremont/Bathgate', 'Pelham Bay', 'Soundview/Bruckner', 'South Williamsburg', 'Battery Park', 'Forest Hills', 'Maspeth', 'Bronx Park', 'Starrett City', 'Brighton Beach', 'Brownsville', 'Highbridge Park', 'Bensonhurst East', 'Mount Hope', 'Prospect-Lefferts Gardens', 'Bayside', 'Douglaston', 'Midwood', 'North Corona', 'Homecrest', 'Westchester Village/Unionport', 'University Heights/Morris Heights', 'Inwood', 'Washington Heights North', 'Flatbush/Ditmas Park', 'Rego Park', 'Riverdale/North Riverdale/Fieldston', 'Jamaica Estates', 'Borough Park', 'Sunset Park West', 'Belmont', 'Auburndale', 'Schuylerville/Edgewater Park', 'Co-Op City', 'Crown Heights South', 'Spuyten Duyvil/Kingsbridge', 'Morrisania/Melrose', 'Hollis', 'Parkchester', 'Coney Island', 'East Flushing', 'Richmond Hill', 'Bedford Park', 'Highbridge', 'Clinton Hill', 'Sheepshead Bay', 'Madison', 'Dyker Heights', 'Cambria Heights', 'Pelham Parkway', 'Hunts Point', 'Melrose South', 'Springfield Gardens North', 'Bay Ridge', 'Elmhurst/Maspeth', 'Crotona Park East', 'Bronxdale', 'Briarwood/Jamaica Hills', 'Van Nest/Morris Park', 'Murray Hill-Queens', 'Kingsbridge Heights', 'Whitestone', 'Saint Albans', 'Allerton/Pelham Gardens', 'Howard Beach', 'Norwood', 'Bensonhurst West', 'Columbia Street', 'Middle Village', 'Prospect Park', 'Ozone Park', 'Gravesend', 'Glendale', 'Kew Gardens Hills', 'Woodlawn/Wakefield', 'West Farms/Bronx River', 'Hillcrest/Pomonok']
+
+payment_methods = ['cash', 'debit_card', 'mobile_payment', 'credit_card', 'transit_card', 'Venmo']
+cab_colors = ['yellow', 'green', 'black', 'white', 'blue']
+zones = ['airport', 'business_district', 'entertainment_district', 'residential', 'train_station']
+
+# Zone of every location in 'suburbs', locations not listed here are residential
+zone_locations = {'airport': ['LaGuardia Airport', 'JFK Airport'],
+                  'train_station': ['Penn Station/Madison Sq West', 'Jamaica', 'Long Island City/Queens Plaza'],
+                  'business_district': ['Midtown East', 'Midtown Center', 'Midtown North', 'Midtown South', 'Financial District North',
+                                        'Financial District South', 'World Trade Center', 'Battery Park City', 'Hudson Sq', 'Flatiron',
+                                        'Garment District', 'Murray Hill', 'UN/Turtle Bay South', 'Sutton Place/Turtle Bay North',
+                                        'TriBeCa/Civic Center', 'Downtown Brooklyn/MetroTech', 'Long Island City/Hunters Point'],
+                  'entertainment_district': ['Times Sq/Theatre District', 'Lincoln Square East', 'Lincoln Square West', 'East Village',
+                                             'West Village', 'Greenwich Village North', 'Greenwich Village South', 'Meatpacking/West Village West',
+                                             'SoHo', 'Little Italy/NoLiTa', 'Lower East Side', 'Union Sq', 'Chinatown', 'Seaport',
+                                             'Williamsburg (North Side)', 'Williamsburg (South Side)', 'Central Park', 'Coney Island']}
+location_zone = {location: zone for zone, locations in zone_locations.items() for location in locations}
+
+# Location popularity follows a Zipf law on the rank in 'suburbs'
+location_zipf_exponent = 1.1
+max_trip_seconds = 6 * 3600
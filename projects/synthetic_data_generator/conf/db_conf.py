@@ -0,0 +1,54 @@
+from threading import Lock
+
+ora_db_conf = {'host': 'localhost', 'port': 1521, 'service_name': 'ORCLPDB'}
+# One pooled connection per loader thread (see execution/db_writers.py)
+ora_pool_min = 1
+ora_pool_max = 8
+ora_pool_increment = 1
+
+# Target table of the generated taxi trips, created with taxi_trips_table_ddl
+taxi_trips_table = 'taxi_trips_synthetic'
+taxi_trips_table_ddl = f"""CREATE TABLE {taxi_trips_table} (
+    pick_up_date DATE,
+    pick_up_time VARCHAR2(8),
+    drop_off_time VARCHAR2(8),
+    trip_distance NUMBER(6,2),
+    trip_fare NUMBER(8,2),
+    payment_method VARCHAR2(20),
+    cab_color VARCHAR2(10),
+    pickup_location VARCHAR2(50),
+    pickup_zone VARCHAR2(30),
+    dropoff_location VARCHAR2(50),
+    dropoff_zone VARCHAR2(30)
+)"""
+
+# oracledb and the credentials are only loaded when the pool is first used
+_ora_pool = None
+_ora_pool_lock = Lock()
+
+def get_ora_pool():
+    """
+    Get the oracledb connection pool of the Oracle database, creating it on first use.
+
+    Returns:
+        oracledb.ConnectionPool: The pool shared by the whole process.
+    """
+    global _ora_pool
+    if _ora_pool is None:
+        with _ora_pool_lock:
+            if _ora_pool is None:
+                import oracledb
+                from secret_vault.db_credentials import ora_db_local
+                ora_db_dsn = oracledb.makedsn(ora_db_conf['host'], ora_db_conf['port'], service_name=ora_db_conf['service_name'])
+                _ora_pool = oracledb.create_pool(user=ora_db_local['username'], password=ora_db_local['password'], dsn=ora_db_dsn,
+                                                 min=ora_pool_min, max=ora_pool_max, increment=ora_pool_increment)
+    return _ora_pool
+
+def get_ora_connection():
+    """
+    Acquire a connection from the pool, closing it returns it to the pool.
+
+    Returns:
+        oracledb.Connection: A pooled connection.
+    """
+    return get_ora_pool().acquire()
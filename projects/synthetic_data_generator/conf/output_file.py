@@ -1,6 +1,42 @@
 import os
+from dataclasses import dataclass
 from synthetic_data_generator.conf.proj_conf import get_output_path
 
+# File name suffix of each CSV stream compression codec
+csv_compression_extensions = {None: '', 'gzip': '.gz', 'zstd': '.zst', 'lz4': '.lz4', 'bz2': '.bz2'}
+
+@dataclass(frozen=True)
+class OutputLayout:
+    """
+    How a generated dataset is laid out on disk.
+
+    Attributes:
+        file_format (str): 'csv' or 'parquet'.
+        compression (str): CSV stream codec (gzip, zstd, lz4, bz2) or Parquet codec (snappy, zstd, lz4, gzip, brotli), None for none.
+        compression_level (int): Codec specific compression level, None for the codec default.
+        partition_by (tuple): Columns the data is Hive-style partitioned by (directories like pick_up_date=2024-01-31).
+        row_group_rows (int): Maximum rows per Parquet row group.
+        max_file_bytes (int): Roll over to a new part file once a file reaches this size, None for no limit.
+        max_open_files (int): Maximum partition files kept open at once, the least recently written ones are closed first.
+    """
+    file_format: str = 'csv'
+    compression: str = None
+    compression_level: int = None
+    partition_by: tuple = ()
+    row_group_rows: int = 1000000
+    max_file_bytes: int = None
+    max_open_files: int = 256
+
+    @property
+    def multi_file(self):
+        return bool(self.partition_by) or self.max_file_bytes is not None
+
+    @property
+    def extension(self):
+        if self.file_format == 'parquet':
+            return '.parquet'
+        return '.csv' + csv_compression_extensions[self.compression]
+
 def get_output_file(output_filename):
     """
     Retrieve the full file path for the output CSV file.
@@ -15,4 +51,12 @@ def get_output_file(output_filename):
     return complete_name
 
 taxi_trips_data_output_filename = 'taxi_trip_data.csv'
-out_file = get_output_file(taxi_trips_data_output_filename)
\ No newline at end of file
+out_file = get_output_file(taxi_trips_data_output_filename)
+out_file_csv = out_file
+out_file_parquet = get_output_file('taxi_trip_data.parquet')
+
+# Output layouts matching what the production readers expect, written by execution/output_writers.py
+csv_layout = OutputLayout(file_format='csv')
+csv_gzip_layout = OutputLayout(file_format='csv', compression='gzip')
+parquet_layout = OutputLayout(file_format='parquet', compression='snappy')
+parquet_partitioned_layout = OutputLayout(file_format='parquet', compression='zstd', partition_by=('pick_up_date',), row_group_rows=128000)
\ No newline at end of file
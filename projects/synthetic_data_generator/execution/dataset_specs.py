@@ -0,0 +1,38 @@
+from datetime import date
+from synthetic_data_generator.conf.dataset_vocabularies import (suburbs, payment_methods, cab_colors, location_zone,
+                                                                location_zipf_exponent, max_trip_seconds)
+from synthetic_data_generator.execution.spec_engine import (DatasetSpec, Column, Choice, LogNormal, Gamma, DateRange, Linear,
+                                                            BoundedInteger, TimeOfDay, Lookup, seconds_per_day)
+
+"""
+Specs of the synthetic datasets, built from the vocabularies of conf/dataset_vocabularies.py.
+A new dataset is a new DatasetSpec here, it is generated by spec_engine.generate_batches.
+"""
+
+"""
+Taxi trips, with columns correlated the way real trips are:
+    - trip_distance: Log-normal, median 2.5 miles, clipped to 0.1 - 100.0
+    - drop_off_time: pick_up_time plus distance * pace (log-normal, median 11 mph) plus pickup and dropoff
+      overhead; trips do not cross midnight, so it is never before pick_up_time
+    - trip_fare: 3.00 base + 2.50 per mile + 0.50 per minute plus normal noise, at least 3.00
+    - pickup_location / dropoff_location: Zipf-skewed over 'suburbs', zones looked up from the location
+pick_up_date is uniform between 2023-01-01 and 2025-12-31, payment_method and cab_color are uniform.
+"""
+taxi_trips_spec = DatasetSpec(name='taxi_trips', columns=(
+    Column('pick_up_date', DateRange(start=date(2023, 1, 1), end=date(2025, 12, 31))),
+    Column('pick_up_time', TimeOfDay(sources=('pick_up_seconds',))),
+    Column('drop_off_time', TimeOfDay(sources=('pick_up_seconds', 'trip_seconds'))),
+    Column('trip_distance', LogNormal(median=2.5, sigma=0.9, low=0.1, high=100.0, decimals=2)),
+    Column('trip_fare', Linear(terms={'trip_distance': 2.5, 'trip_seconds': 0.5 / 60}, intercept=3.0, noise_sd=1.5, low=3.0, decimals=2)),
+    Column('payment_method', Choice(values=tuple(payment_methods))),
+    Column('cab_color', Choice(values=tuple(cab_colors))),
+    Column('pickup_location', Choice(values=tuple(suburbs), zipf_exponent=location_zipf_exponent)),
+    Column('pickup_zone', Lookup(source='pickup_location', mapping=location_zone, default='residential')),
+    Column('dropoff_location', Choice(values=tuple(suburbs), zipf_exponent=location_zipf_exponent)),
+    Column('dropoff_zone', Lookup(source='dropoff_location', mapping=location_zone, default='residential')),
+    Column('pace_seconds_per_mile', LogNormal(median=3600 / 11, sigma=0.35, low=80, high=1200), output=False),
+    Column('overhead_seconds', Gamma(shape=2.0, scale=60.0), output=False),
+    Column('trip_seconds', Linear(terms={('trip_distance', 'pace_seconds_per_mile'): 1.0, 'overhead_seconds': 1.0},
+                                  low=60, high=max_trip_seconds, integer=True), output=False),
+    Column('pick_up_seconds', BoundedInteger(low=0, high=seconds_per_day, minus='trip_seconds'), output=False),
+))
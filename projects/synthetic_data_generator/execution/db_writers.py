@@ -0,0 +1,184 @@
+import queue
+import threading
+from time import time
+import numpy as np
+
+"""
+Streams generated batches straight in to a database table, without a file in between.
+
+Producer threads generate DataFrame batches and put them on a bounded queue; consumer threads
+each hold one connection and insert the batches they take with array-bound executemany calls.
+When the database falls behind the queue fills up and the producers block, so memory stays at
+about 'queue_batches' batches whatever the number of rows.
+
+Connections come from 'connection_factory', any callable returning a DB-API 2.0 connection,
+like synthetic_data_generator.conf.db_conf.get_ora_connection (pooled Oracle connections) or
+a local stand-in such as lambda: sqlite3.connect(path, check_same_thread=False).
+"""
+
+# Bind placeholder of the n-th column (0 based) for each DB-API paramstyle
+placeholder_styles = {'numeric': lambda n: f":{n + 1}",
+                      'qmark': lambda n: '?',
+                      'format': lambda n: '%s'}
+
+_end_of_stream = object()
+
+def build_insert_statement(table, columns, paramstyle='numeric'):
+    """
+    Build the INSERT statement of a table for array binding.
+
+    Args:
+        table (str): The target table name.
+        columns (list): The column names, in bind order.
+        paramstyle (str): 'numeric' (:1, :2 - Oracle), 'qmark' (? - sqlite3) or 'format' (%s).
+    Returns:
+        str: The INSERT statement.
+    """
+    placeholder = placeholder_styles[paramstyle]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholder(n) for n in range(len(columns)))})"
+
+def batch_rows(batch):
+    """
+    Convert a DataFrame batch to a list of row tuples of plain Python values for executemany.
+
+    Dates become datetime.datetime, NumPy scalars become int/float, and NaN/NaT become None.
+
+    Args:
+        batch (pd.DataFrame): The batch.
+    Returns:
+        list: One tuple per row.
+    """
+    columns = []
+    for name in batch.columns:
+        values = batch[name]
+        if values.dtype.kind == 'M':
+            columns.append(values.to_numpy().astype('datetime64[us]').tolist())
+        elif values.dtype.kind == 'f' and values.isna().any():
+            columns.append([None if value != value else value for value in values.tolist()])
+        else:
+            columns.append(values.tolist())
+    return list(zip(*columns))
+
+def _put(work_queue, item, stop):
+    """
+    Put an item on the bounded queue, blocking while it is full, unless the stream is stopped.
+    """
+    while not stop.is_set():
+        try:
+            work_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _consume(work_queue, stop, connection_factory, insert_statement, array_size, input_sizes, stats, stats_lock, errors):
+    connection = None
+    try:
+        connection = connection_factory()
+        cursor = connection.cursor()
+        while not stop.is_set():
+            try:
+                batch = work_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if batch is _end_of_stream:
+                break
+            start = time()
+            rows = batch_rows(batch)
+            for chunk_start in range(0, len(rows), array_size):
+                if input_sizes:
+                    cursor.setinputsizes(*input_sizes)
+                cursor.executemany(insert_statement, rows[chunk_start:chunk_start + array_size])
+            connection.commit()
+            with stats_lock:
+                stats['rows'] += len(rows)
+                stats['batches'] += 1
+                stats['insert_seconds'] += time() - start
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        if connection is not None:
+            connection.close()
+
+def write_database(batch_streams, table, connection_factory, workers=4, queue_batches=8, array_size=10000,
+                   paramstyle='numeric', input_sizes=None):
+    """
+    Insert DataFrame batches in to a table with parallel producers and consumers.
+
+    Every stream of 'batch_streams' is generated by its own producer thread, and 'workers'
+    consumer threads insert the batches on their own connection, committing once per batch.
+    The first error stops every thread and is raised once they have all finished.
+
+    Args:
+        batch_streams (list): Iterables of DataFrames with the table's columns, one per producer thread.
+        table (str): The target table, which must already exist.
+        connection_factory (callable): Returns a new DB-API connection, called once per consumer thread.
+        workers (int): Number of consumer threads (and connections).
+        queue_batches (int): Maximum batches waiting to be inserted, producers block beyond it.
+        array_size (int): Rows bound per executemany call.
+        paramstyle (str): Bind placeholder style of the driver, see placeholder_styles.
+        input_sizes (list, optional): Passed to cursor.setinputsizes before each executemany, e.g. the maximum
+            string lengths, so the driver allocates the bind buffers once.
+    Returns:
+        dict: Rows and batches inserted, summed insert seconds and elapsed seconds.
+    Raises:
+        Exception: The first error raised by a producer or consumer.
+    """
+    work_queue = queue.Queue(maxsize=queue_batches)
+    stop = threading.Event()
+    stats = {'rows': 0, 'batches': 0, 'insert_seconds': 0.0}
+    stats_lock = threading.Lock()
+    errors = []
+    insert_statement = None
+    start = time()
+
+    def produce(batches):
+        nonlocal insert_statement
+        try:
+            for batch in batches:
+                if insert_statement is None:
+                    insert_statement = build_insert_statement(table, list(batch.columns), paramstyle)
+                    consumers_ready.set()
+                if not _put(work_queue, batch, stop):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    # Consumers are started once the first batch gives the column names of the INSERT statement
+    consumers_ready = threading.Event()
+    producers = [threading.Thread(target=produce, args=(batches,), name=f"producer-{n}") for n, batches in enumerate(batch_streams)]
+    for producer in producers:
+        producer.start()
+    while not consumers_ready.is_set() and any(producer.is_alive() for producer in producers):
+        consumers_ready.wait(timeout=0.1)
+    consumers = []
+    if consumers_ready.is_set():
+        consumers = [threading.Thread(target=_consume, name=f"consumer-{n}",
+                                      args=(work_queue, stop, connection_factory, insert_statement, array_size, input_sizes,
+                                            stats, stats_lock, errors)) for n in range(workers)]
+        for consumer in consumers:
+            consumer.start()
+    for producer in producers:
+        producer.join()
+    for _ in consumers:
+        _put(work_queue, _end_of_stream, stop)
+    for consumer in consumers:
+        consumer.join()
+    if errors:
+        raise errors[0]
+    stats['seconds'] = time() - start
+    return stats
+
+def seed_streams(seed, producers):
+    """
+    Independent random seeds for parallel producers, reproducible from a single seed.
+
+    Args:
+        seed (int, optional): The seed of the whole dataset.
+        producers (int): Number of producer threads.
+    Returns:
+        list: One np.random.SeedSequence per producer.
+    """
+    return np.random.SeedSequence(seed).spawn(producers)
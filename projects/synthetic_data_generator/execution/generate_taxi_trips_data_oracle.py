@@ -0,0 +1,6 @@
+from synthetic_data_generator.execution.core_engine import trip_statistics_data_database
+from synthetic_data_generator.conf.db_conf import taxi_trips_table, get_ora_connection
+
+size = 1000000  # Specify the number of records to generate
+result = trip_statistics_data_database(size, taxi_trips_table, get_ora_connection)
+print(result)
\ No newline at end of file
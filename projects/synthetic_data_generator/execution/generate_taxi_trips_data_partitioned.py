@@ -0,0 +1,6 @@
+from synthetic_data_generator.execution.core_engine import trip_statistics_data_parquet
+from synthetic_data_generator.conf.output_file import parquet_partitioned_layout
+
+size = 1000000  # Specify the number of records to generate
+result = trip_statistics_data_parquet(size, layout=parquet_partitioned_layout)
+print(result)
\ No newline at end of file
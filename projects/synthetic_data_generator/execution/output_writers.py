@@ -0,0 +1,147 @@
+import os
+from collections import OrderedDict
+from urllib.parse import quote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from synthetic_data_generator.conf.output_file import OutputLayout, csv_compression_extensions
+
+class _PartWriter:
+    """
+    Writes the batches of one output directory (or single file) to one or more rolling part files.
+    """
+    def __init__(self, layout, directory=None, file_path=None):
+        self.layout = layout
+        self.directory = directory
+        self.file_path = file_path
+        self.files = []
+        self.rows = 0
+        self.bytes = 0
+        self._raw = None
+        self._stream = None
+        self._writer = None
+
+    def _open(self, schema):
+        if self.file_path is not None:
+            path = self.file_path
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"part-{len(self.files):05d}{self.layout.extension}").replace('\\', '/')
+        self._raw = pa.OSFile(path, 'wb')
+        if self.layout.file_format == 'parquet':
+            self._writer = pq.ParquetWriter(self._raw, schema, compression=self.layout.compression or 'none',
+                                            compression_level=self.layout.compression_level)
+        elif self.layout.compression:
+            self._stream = pa.CompressedOutputStream(self._raw, self.layout.compression)
+        else:
+            self._stream = self._raw
+        self.files.append(path)
+
+    def write(self, batch):
+        new_file = self._raw is None
+        if new_file:
+            self._open(pa.Schema.from_pandas(batch, preserve_index=False) if self.layout.file_format == 'parquet' else None)
+        if self.layout.file_format == 'parquet':
+            self._writer.write_table(pa.Table.from_pandas(batch, preserve_index=False), row_group_size=self.layout.row_group_rows)
+        else:
+            self._stream.write(batch.to_csv(index=False, header=new_file).encode('utf-8'))
+        self.rows += len(batch)
+        if self.layout.max_file_bytes is not None and self._raw.tell() >= self.layout.max_file_bytes:
+            self.close()
+
+    def close(self):
+        if self._raw is None:
+            return
+        if self._writer is not None:
+            self._writer.close()
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.close()
+        if not self._raw.closed:
+            self._raw.close()
+        self.bytes += os.path.getsize(self.files[-1])
+        self._raw = self._stream = self._writer = None
+
+def _partition_directory(root, columns, values):
+    """
+    Hive-style directory of a partition, dates written as YYYY-MM-DD.
+    """
+    parts = []
+    for column, value in zip(columns, values):
+        if isinstance(value, pd.Timestamp) and value == value.normalize():
+            value = value.date()
+        parts.append(f"{column}={quote(str(value), safe='')}")
+    return os.path.join(root, *parts)
+
+def write_dataset(batches, output_path, layout=OutputLayout()):
+    """
+    Write DataFrame batches with the given output layout.
+
+    A single file layout writes 'output_path' (plus the compression suffix for CSV, like .csv.gz).
+    Partitioned or size-split layouts write part files under the directory 'output_path' without
+    its extension, in Hive-style partition sub directories when partition_by is set.
+
+    Args:
+        batches (iterable): DataFrames with the same columns, as yielded by spec_engine.generate_batches.
+        output_path (str): The output file path.
+        layout (OutputLayout): The output layout.
+    Returns:
+        dict: The files written, and the total rows and bytes written.
+    """
+    root = os.path.splitext(output_path)[0]
+    if not layout.multi_file:
+        if layout.file_format == 'csv':
+            output_path += csv_compression_extensions[layout.compression]
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        writers = {(): _PartWriter(layout, file_path=output_path)}
+    else:
+        writers = {}
+    open_writers = OrderedDict()
+    closed_writers = []
+    try:
+        for batch in batches:
+            if not layout.partition_by:
+                groups = [((), batch)]
+            else:
+                groups = batch.groupby(list(layout.partition_by), sort=False)
+            for values, group in groups:
+                values = values if isinstance(values, tuple) else (values,)
+                if values not in writers:
+                    writers[values] = _PartWriter(layout, directory=_partition_directory(root, layout.partition_by, values))
+                writer = writers[values]
+                writer.write(group.drop(columns=list(layout.partition_by)) if layout.partition_by else group)
+                open_writers.pop(values, None)
+                open_writers[values] = writer
+                if len(open_writers) > layout.max_open_files:
+                    _, idle = open_writers.popitem(last=False)
+                    idle.close()
+    finally:
+        for writer in writers.values():
+            writer.close()
+            closed_writers.append(writer)
+    return {'files': [path for writer in closed_writers for path in writer.files],
+            'rows': sum(writer.rows for writer in closed_writers),
+            'bytes': sum(writer.bytes for writer in closed_writers)}
+
+def write_csv(batches, file_path):
+    """
+    Write DataFrame batches to a single uncompressed CSV file.
+
+    Args:
+        batches (iterable): DataFrames with the same columns, as yielded by spec_engine.generate_batches.
+        file_path (str): The path of the CSV file to create.
+    Returns:
+        int: The number of rows written.
+    """
+    return write_dataset(batches, file_path, OutputLayout(file_format='csv'))['rows']
+
+def write_parquet(batches, file_path):
+    """
+    Write DataFrame batches to a single Parquet file with default settings.
+
+    Args:
+        batches (iterable): DataFrames with the same columns, as yielded by spec_engine.generate_batches.
+        file_path (str): The path of the Parquet file to create.
+    Returns:
+        int: The number of rows written.
+    """
+    return write_dataset(batches, file_path, OutputLayout(file_format='parquet', compression='snappy'))['rows']
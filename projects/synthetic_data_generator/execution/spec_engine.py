@@ -0,0 +1,275 @@
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+"""
+Declarative synthetic dataset specs.
+
+A DatasetSpec is an ordered list of Column(name, generator). Generators are small frozen
+dataclasses describing a distribution, a vocabulary or a correlation with other columns
+(by name). compile_spec orders the columns by their dependencies once, and generate_batches
+runs that plan batch by batch, every generator drawing a whole column with one NumPy call.
+Columns with output=False (helper values such as a trip duration) feed other columns but
+are not written.
+"""
+
+seconds_per_day = 86400
+
+@lru_cache(maxsize=None)
+def time_of_day_labels():
+    """
+    'HH:MM:SS' label of every second of a day, indexed by the second, built on first use.
+    Formatting a whole column of times is then a single vectorized lookup.
+    """
+    return np.array([f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}" for second in range(seconds_per_day)], dtype=object)
+
+def _finish(values, low=None, high=None, decimals=None):
+    """
+    Clip and round a generated numeric column.
+    """
+    if low is not None or high is not None:
+        values = np.clip(values, low, high)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    return values
+
+@dataclass(frozen=True)
+class Choice:
+    """
+    Values drawn from a vocabulary, uniformly, with explicit weights, or Zipf-skewed on the vocabulary order.
+    """
+    values: tuple
+    weights: tuple = None
+    zipf_exponent: float = None
+    depends_on = ()
+
+    def probabilities(self):
+        if self.zipf_exponent is not None:
+            weights = 1.0 / np.arange(1, len(self.values) + 1) ** self.zipf_exponent
+        elif self.weights is not None:
+            weights = np.asarray(self.weights, dtype=float)
+        else:
+            return None
+        return weights / weights.sum()
+
+    def generate(self, rng, size, columns, codes):
+        idx = rng.choice(len(self.values), size=size, p=self.probabilities())
+        return np.array(self.values, dtype=object)[idx], idx
+
+@dataclass(frozen=True)
+class Uniform:
+    """
+    Floats drawn uniformly from [low, high).
+    """
+    low: float
+    high: float
+    decimals: int = None
+    depends_on = ()
+
+    def generate(self, rng, size, columns, codes):
+        return _finish(rng.uniform(self.low, self.high, size=size), decimals=self.decimals), None
+
+@dataclass(frozen=True)
+class LogNormal:
+    """
+    Log-normal floats given by their median and the sigma of the underlying normal, optionally clipped and rounded.
+    """
+    median: float
+    sigma: float
+    low: float = None
+    high: float = None
+    decimals: int = None
+    depends_on = ()
+
+    def generate(self, rng, size, columns, codes):
+        return _finish(rng.lognormal(np.log(self.median), self.sigma, size=size), self.low, self.high, self.decimals), None
+
+@dataclass(frozen=True)
+class Gamma:
+    """
+    Gamma distributed floats, optionally clipped and rounded.
+    """
+    shape: float
+    scale: float
+    low: float = None
+    high: float = None
+    decimals: int = None
+    depends_on = ()
+
+    def generate(self, rng, size, columns, codes):
+        return _finish(rng.gamma(self.shape, self.scale, size=size), self.low, self.high, self.decimals), None
+
+@dataclass(frozen=True)
+class DateRange:
+    """
+    Dates drawn uniformly between start and end, both included.
+    """
+    start: date
+    end: date
+    depends_on = ()
+
+    def generate(self, rng, size, columns, codes):
+        dates = pd.date_range(start=self.start, end=self.end).values
+        return dates[rng.integers(0, len(dates), size=size)], None
+
+@dataclass(frozen=True)
+class Linear:
+    """
+    intercept + sum(coefficient * term) + normal noise, optionally clipped, rounded and cast to integers.
+    A term is a column name, or a tuple of column names whose product is used.
+    """
+    terms: dict
+    intercept: float = 0.0
+    noise_sd: float = 0.0
+    low: float = None
+    high: float = None
+    decimals: int = None
+    integer: bool = False
+
+    @property
+    def depends_on(self):
+        return tuple(name for term in self.terms for name in ((term,) if isinstance(term, str) else term))
+
+    def generate(self, rng, size, columns, codes):
+        values = np.full(size, float(self.intercept))
+        for term, coefficient in self.terms.items():
+            product = columns[term] if isinstance(term, str) else np.prod([columns[name] for name in term], axis=0)
+            values += coefficient * product
+        if self.noise_sd:
+            values += rng.normal(0.0, self.noise_sd, size=size)
+        values = _finish(values, self.low, self.high, self.decimals)
+        return (values.astype(np.int64) if self.integer else values), None
+
+@dataclass(frozen=True)
+class BoundedInteger:
+    """
+    Integers drawn uniformly from [low, high - column), so that adding 'column' stays below high.
+    """
+    low: int
+    high: int
+    minus: str = None
+
+    @property
+    def depends_on(self):
+        return (self.minus,) if self.minus else ()
+
+    def generate(self, rng, size, columns, codes):
+        high = self.high - columns[self.minus] if self.minus else self.high
+        return rng.integers(self.low, high, size=size), None
+
+@dataclass(frozen=True)
+class TimeOfDay:
+    """
+    'HH:MM:SS' text of the sum of the given columns, in seconds since midnight.
+    """
+    sources: tuple
+
+    @property
+    def depends_on(self):
+        return tuple(self.sources)
+
+    def generate(self, rng, size, columns, codes):
+        seconds = np.sum([columns[name] for name in self.sources], axis=0).astype(np.int64) % seconds_per_day
+        return time_of_day_labels()[seconds], None
+
+@dataclass(frozen=True)
+class Lookup:
+    """
+    Value mapped from another column through a dict, 'default' for values missing from the mapping.
+    Mapping a Choice column is a single array lookup on its vocabulary codes.
+    """
+    source: str
+    mapping: dict
+    default: object = None
+
+    @property
+    def depends_on(self):
+        return (self.source,)
+
+    def generate(self, rng, size, columns, codes):
+        if self.source in codes:
+            vocabulary, idx = codes[self.source]
+            return np.array([self.mapping.get(value, self.default) for value in vocabulary], dtype=object)[idx], None
+        return pd.Series(columns[self.source]).map(lambda value: self.mapping.get(value, self.default)).to_numpy(dtype=object), None
+
+@dataclass(frozen=True)
+class Column:
+    """
+    A named column of a dataset, written to the output unless output is False.
+    """
+    name: str
+    generator: object
+    output: bool = True
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    A synthetic dataset: its name and its columns, in output order.
+    """
+    name: str
+    columns: tuple = field(default_factory=tuple)
+
+def compile_spec(spec):
+    """
+    Compile a dataset spec in to a generation plan, columns ordered so every dependency is generated first.
+
+    Args:
+        spec (DatasetSpec): The dataset spec.
+    Returns:
+        tuple: (list of Column in generation order, list of output column names in spec order)
+    Raises:
+        ValueError: If a column depends on an unknown column or the dependencies are cyclic.
+    """
+    columns = {column.name: column for column in spec.columns}
+    for column in spec.columns:
+        unknown = [name for name in column.generator.depends_on if name not in columns]
+        if unknown:
+            raise ValueError(f"Column {column.name} of {spec.name} depends on unknown columns {unknown}")
+    plan, done = [], set()
+    while len(plan) < len(columns):
+        ready = [column for column in spec.columns if column.name not in done and set(column.generator.depends_on) <= done]
+        if not ready:
+            raise ValueError(f"Cyclic column dependencies in {spec.name}: {sorted(set(columns) - done)}")
+        plan.extend(ready)
+        done.update(column.name for column in ready)
+    return plan, [column.name for column in spec.columns if column.output]
+
+def generate_batches(spec, size, batch_rows=1000000, seed=None):
+    """
+    Generate a dataset batch by batch, from its compiled spec.
+
+    Args:
+        spec (DatasetSpec): The dataset spec.
+        size (int): Total number of rows to generate.
+        batch_rows (int): Maximum number of rows per batch, bounding memory whatever the size.
+        seed (int, optional): Seed of the random generator, for reproducible datasets.
+    Yields:
+        pd.DataFrame: The output columns of each batch.
+    """
+    plan, output_columns = compile_spec(spec)
+    rng = np.random.default_rng(seed)
+    for batch_start in range(0, size, batch_rows):
+        batch_size = min(batch_rows, size - batch_start)
+        columns, codes = {}, {}
+        for column in plan:
+            values, idx = column.generator.generate(rng, batch_size, columns, codes)
+            columns[column.name] = values
+            if idx is not None:
+                codes[column.name] = (column.generator.values, idx)
+        yield pd.DataFrame({name: columns[name] for name in output_columns})
+
+def generate_dataframe(spec, size, seed=None):
+    """
+    Generate a whole dataset in memory as a single DataFrame.
+
+    Args:
+        spec (DatasetSpec): The dataset spec.
+        size (int): Number of rows to generate.
+        seed (int, optional): Seed of the random generator.
+    Returns:
+        pd.DataFrame: The generated dataset.
+    """
+    empty = pd.DataFrame(columns=compile_spec(spec)[1])
+    return next(generate_batches(spec, size, batch_rows=max(size, 1), seed=seed), empty)
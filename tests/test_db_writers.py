@@ -0,0 +1,86 @@
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import pandas as pd
+import pytest
+
+"""
+write_database streaming producer batches in to sqlite3, the local stand-in for Oracle
+(paramstyle='qmark', one connection per consumer thread on the same database file).
+"""
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'projects'))
+
+from synthetic_data_generator.execution.db_writers import write_database
+
+table = 'taxi_trips'
+columns = ['trip_id', 'pickup_location', 'fare', 'pick_up_time']
+
+def make_batch(producer, batch, rows=25):
+    """
+    DataFrame batch with an integer, a text, a float (NaN in every 5th row) and a datetime column.
+    """
+    first = (producer * 1000 + batch) * rows
+    return pd.DataFrame({'trip_id': range(first, first + rows),
+                         'pickup_location': [f"zone-{n % 7}" for n in range(rows)],
+                         'fare': [None if n % 5 == 0 else n * 1.5 for n in range(rows)],
+                         'pick_up_time': pd.date_range('2024-01-01', periods=rows, freq='min')})
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'synthetic.db')
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"CREATE TABLE {table} (trip_id INTEGER PRIMARY KEY, pickup_location TEXT, fare REAL, pick_up_time TEXT)")
+    return path
+
+def connection_factory(path):
+    return lambda: sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+def run_with_timeout(function, seconds=20):
+    """
+    Run a function in a thread, failing the test if it is still running after 'seconds' (a hung writer).
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = function()
+        except Exception as e:
+            outcome['error'] = e
+    runner = threading.Thread(target=run, daemon=True)
+    runner.start()
+    runner.join(seconds)
+    assert not runner.is_alive(), f"write_database still running after {seconds}s"
+    return outcome
+
+def test_batches_of_every_producer_are_inserted(database):
+    streams = [[make_batch(producer, batch) for batch in range(4)] for producer in range(3)]
+    stats = write_database(streams, table, connection_factory(database), workers=2, queue_batches=2, array_size=10,
+                           paramstyle='qmark')
+    assert (stats['rows'], stats['batches']) == (300, 12)
+    with sqlite3.connect(database) as connection:
+        assert connection.execute(f"SELECT COUNT(*), COUNT(DISTINCT trip_id), COUNT(fare) FROM {table}").fetchone() == (300, 300, 240)
+
+def test_consumer_error_is_raised(database):
+    # Every producer sends trip_id 0, the second insert of it violates the primary key
+    streams = [[make_batch(0, 0)] for _ in range(2)]
+    outcome = run_with_timeout(lambda: write_database(streams, table, connection_factory(database), workers=1, paramstyle='qmark'))
+    assert isinstance(outcome.get('error'), sqlite3.IntegrityError)
+
+def test_producers_stop_when_the_stream_is_stopped(database):
+    produced = itertools.count()
+
+    def endless_batches(producer):
+        for batch in itertools.count():
+            next(produced)
+            yield make_batch(producer, batch)
+
+    # The missing table fails the first insert, which must stop the endless producers too
+    outcome = run_with_timeout(lambda: write_database([endless_batches(0), endless_batches(1)], 'missing_table',
+                                                      connection_factory(database), workers=2, queue_batches=4,
+                                                      paramstyle='qmark'))
+    assert isinstance(outcome.get('error'), sqlite3.OperationalError)
+    # At most the queued batches, one taken by every consumer and one blocked in every producer
+    assert next(produced) <= 4 + 2 + 2
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+"""
+Import-time budget of the ETL entry points.
+
+Short-lived count checks spend most of their runtime starting up, so importing the engines and
+the database configuration must not load pandas, numpy, pyarrow, SQLAlchemy or the Oracle driver
+(they are imported on first use), and the cold import must stay under a fixed budget.
+"""
+
+projects_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'projects')
+
+# Modules imported by a count check before it does any work
+entry_modules = ['etl_csv_file_to_oracle.execution.core_engine',
+                 'etl_csv_file_to_oracle.execution.row_count_engine',
+                 'etl_csv_file_to_oracle.execution.orchestrator',
+                 'etl_csv_file_to_oracle.conf.db_conf']
+heavy_modules = ['pandas', 'numpy', 'pyarrow', 'sqlalchemy', 'oracledb', 'cx_Oracle']
+# Cumulative import time of the entry modules, in microseconds
+import_budget_us = 250000
+
+def run_import(code):
+    """
+    Run code in a fresh interpreter with -X importtime, from the projects directory.
+
+    Args:
+        code (str): The code to run.
+    Returns:
+        subprocess.CompletedProcess: The finished process, stdout and stderr as text.
+    """
+    env = dict(os.environ, PYTHONPATH=projects_path, PYTHONDONTWRITEBYTECODE='1')
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=projects_path, env=env,
+                          capture_output=True, text=True, check=True)
+
+def test_entry_modules_do_not_load_heavy_dependencies():
+    result = run_import(f"import sys\nimport {', '.join(entry_modules)}\n"
+                        f"print(','.join(m for m in {heavy_modules!r} if m in sys.modules))")
+    assert result.stdout.strip() == ''
+
+def test_entry_modules_import_within_budget():
+    result = run_import(f"import {', '.join(entry_modules)}")
+    # Lines are 'import time: self | cumulative | name', top level imports have a name without indentation
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit() and not name[1:].startswith(' '):
+            total_us += int(cumulative)
+    assert 0 < total_us < import_budget_us, f"cold import took {total_us / 1000:.0f} ms, budget {import_budget_us / 1000:.0f} ms"
@@ -0,0 +1,183 @@
+import os
+import sys
+from types import SimpleNamespace
+import pytest
+
+"""
+ResilientOracleConnection against a fake driver raising injected ORA codes.
+
+The fake driver stands in for cx_oracle: connect() and the connections it returns fail with the
+scripted errors, and every connect, statement, commit and rollback is recorded. Sleeps are
+recorded instead of waited for, and jitter is disabled, so the backoff delays are exact.
+"""
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'classes'))
+
+from oracle_resilience import ResilientOracleConnection, RetryPolicy
+
+class FakeDatabaseError(Exception):
+    pass
+
+def ora_error(code):
+    """
+    Driver error carrying an error object with the ORA code, like cx_oracle errors.
+    """
+    return FakeDatabaseError(SimpleNamespace(code=code, message=f"ORA-{code:05d}"))
+
+class FakeConnection:
+    def __init__(self, driver, dsn):
+        self.driver = driver
+        self.dsn = dsn
+        self.pending = []
+
+    def cursor(self):
+        driver = self.driver
+
+        class FakeCursor:
+            def execute(self, query, parameters):
+                driver.statements.append(query)
+                if driver.execute_errors:
+                    error = driver.execute_errors.pop(0)
+                    if error is not None:
+                        raise error
+
+            def fetchall(self):
+                return [(1,), (2,)]
+
+            def close(self):
+                pass
+        return FakeCursor()
+
+    def commit(self):
+        self.driver.committed.extend(self.pending)
+        self.pending = []
+        if self.driver.commit_errors:
+            error = self.driver.commit_errors.pop(0)
+            if error is not None:
+                raise error
+
+    def rollback(self):
+        self.driver.rollbacks += 1
+        self.pending = []
+
+    def close(self):
+        self.driver.closed += 1
+
+class FakeDriver:
+    """
+    Fake cx_oracle module, every list holds the outcome of the next calls (None succeeds, an error is raised).
+    """
+    DatabaseError = FakeDatabaseError
+
+    def __init__(self, connect_errors=(), execute_errors=(), commit_errors=()):
+        self.connect_errors = list(connect_errors)
+        self.execute_errors = list(execute_errors)
+        self.commit_errors = list(commit_errors)
+        self.connects = []
+        self.statements = []
+        self.committed = []
+        self.rollbacks = 0
+        self.closed = 0
+
+    def connect(self, user, password, dsn):
+        self.connects.append(dsn)
+        if self.connect_errors:
+            error = self.connect_errors.pop(0)
+            if error is not None:
+                raise error
+        return FakeConnection(self, dsn)
+
+def resilient_connection(driver, dsn_list='db1', **policy):
+    """
+    ResilientOracleConnection on the fake driver, its sleeps recorded in the returned list.
+    """
+    sleeps = []
+    policy = dict(dict(max_attempts=5, base_delay=1.0, max_delay=30.0, multiplier=2.0, jitter=0.0), **policy)
+    connection = ResilientOracleConnection('user', 'password', dsn_list, driver=driver, retry_policy=RetryPolicy(**policy),
+                                           sleep=sleeps.append)
+    return connection, sleeps
+
+def load_rows(connection, chunk):
+    connection.pending.append(chunk)
+
+def test_transient_errors_are_retried_with_exponential_backoff():
+    driver = FakeDriver(connect_errors=[ora_error(12541), ora_error(3113), ora_error(12170)])
+    connection, sleeps = resilient_connection(driver)
+    assert connection.fetch_all('SELECT 1 FROM dual') == [(1,), (2,)]
+    assert sleeps == [1.0, 2.0, 4.0]
+    metrics = connection.metrics_snapshot()
+    assert (metrics['operations'], metrics['attempts'], metrics['retries'], metrics['failed_operations']) == (1, 4, 3, 0)
+    assert metrics['errors_by_code'] == {12541: 1, 3113: 1, 12170: 1}
+    assert metrics['backoff_seconds'] == 7.0
+
+def test_backoff_is_capped_and_the_last_error_raised_after_max_attempts():
+    driver = FakeDriver(connect_errors=[ora_error(12541)] * 10)
+    connection, sleeps = resilient_connection(driver, max_attempts=4, max_delay=3.0)
+    with pytest.raises(FakeDatabaseError) as raised:
+        connection.connect()
+    assert raised.value.args[0].code == 12541
+    assert sleeps == [1.0, 2.0, 3.0]
+    assert len(driver.connects) == 4
+    metrics = connection.metrics_snapshot()
+    assert (metrics['attempts'], metrics['retries'], metrics['failed_operations']) == (4, 3, 1)
+
+def test_transient_errors_fail_over_across_the_dsn_list():
+    driver = FakeDriver(connect_errors=[ora_error(12541), ora_error(12514), ora_error(12541), None])
+    connection, sleeps = resilient_connection(driver, dsn_list=['db1', 'db2', 'db3'])
+    connection.connect()
+    # Every retry moves on to the next DSN, wrapping around to the first one
+    assert driver.connects == ['db1', 'db2', 'db3', 'db1']
+    assert connection.current_dsn == 'db1'
+    assert connection.metrics_snapshot()['failovers'] == 3
+
+def test_a_lost_session_reconnects_on_the_next_dsn():
+    driver = FakeDriver(execute_errors=[ora_error(3113), None])
+    connection, sleeps = resilient_connection(driver, dsn_list=['db1', 'db2'])
+    assert connection.fetch_all('SELECT 1 FROM dual') == [(1,), (2,)]
+    assert driver.connects == ['db1', 'db2']
+    assert driver.closed == 1
+    assert connection.connection.dsn == 'db2'
+
+@pytest.mark.parametrize('code', [942, 1, 12154])
+def test_non_transient_errors_are_not_retried(code):
+    driver = FakeDriver(execute_errors=[ora_error(code)])
+    connection, sleeps = resilient_connection(driver, dsn_list=['db1', 'db2'])
+    with pytest.raises(FakeDatabaseError):
+        connection.fetch_all('SELECT * FROM missing_table')
+    assert sleeps == []
+    assert driver.connects == ['db1']
+    metrics = connection.metrics_snapshot()
+    assert (metrics['attempts'], metrics['retries'], metrics['failovers'], metrics['failed_operations']) == (1, 0, 0, 1)
+
+def test_load_chunks_retries_only_the_failed_chunk():
+    driver = FakeDriver()
+    connection, sleeps = resilient_connection(driver)
+    failures = {'chunk-2': [ora_error(3135)]}
+
+    def load_chunk(ora_connection, chunk):
+        if failures.get(chunk):
+            raise failures[chunk].pop()
+        load_rows(ora_connection, chunk)
+
+    assert connection.run_load_chunks(['chunk-1', 'chunk-2', 'chunk-3'], load_chunk) == 3
+    assert driver.committed == ['chunk-1', 'chunk-2', 'chunk-3']
+    assert driver.rollbacks == 1
+    assert sleeps == [1.0]
+
+def test_load_chunks_skips_a_chunk_committed_before_the_connection_was_lost():
+    # The commit of the second chunk reaches the database, but the session dies before it is acknowledged
+    driver = FakeDriver(commit_errors=[None, ora_error(3113)])
+    connection, sleeps = resilient_connection(driver)
+    loads = []
+
+    def load_chunk(ora_connection, chunk):
+        loads.append(chunk)
+        load_rows(ora_connection, chunk)
+
+    def is_chunk_committed(ora_connection, chunk_idx):
+        return ['chunk-1', 'chunk-2', 'chunk-3'][chunk_idx] in driver.committed
+
+    assert connection.run_load_chunks(['chunk-1', 'chunk-2', 'chunk-3'], load_chunk, is_chunk_committed) == 3
+    assert loads == ['chunk-1', 'chunk-2', 'chunk-3']
+    assert driver.committed == ['chunk-1', 'chunk-2', 'chunk-3']
+    assert driver.connects == ['db1', 'db1']